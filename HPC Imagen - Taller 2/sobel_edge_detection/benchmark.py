@@ -4,23 +4,32 @@ Prueba el algoritmo con diferentes configuraciones y genera visualizaciones
 """
 import sys
 import os
-import time
-import numpy as np
-import matplotlib.pyplot as plt
+import json
+import argparse
 from multiprocessing import cpu_count
 
 sys.path.insert(0, os.path.dirname(__file__))
 
 from src.utils import load_image, rgb_to_grayscale
-from src.sobel_sequential import apply_sobel_sequential
-from src.sobel_parallel import apply_sobel_parallel
+from src.sobel_sequential import ENGINES
+from src.sobel_parallel import BACKENDS
+from src.benchmarking import (time_case, run_suite, save_results, compare_results,
+                              environment_info, benchmark_case, DEFAULT_SIZES)
 
 
-def benchmark_scalability():
+def benchmark_scalability(engine="loops", backend="processes", repeats=5, warmup=1):
     """
     Mide el rendimiento variando el numero de procesos
     Genera graficas de speedup y eficiencia
+
+    Args:
+        engine: motor de calculo (secuencial y workers)
+        backend: 'processes' (SobelExecutor) o 'threads' (apply_sobel_threaded)
+        repeats: repeticiones medidas por configuracion
+        warmup: repeticiones de calentamiento sin medir
     """
+    import matplotlib.pyplot as plt
+
     print("\n" + "="*70)
     print("=" + "  BENCHMARK DE ESCALABILIDAD  ".center(68) + "=")
     print("="*70 + "\n")
@@ -47,25 +56,19 @@ def benchmark_scalability():
     if max_cores > 8:
         num_processes_list.append(max_cores)
 
-    print(f"Probando con: {num_processes_list} procesos\n")
+    print(f"Probando con: {num_processes_list} procesos")
+    print(f"Motor: {engine} | Backend: {backend}\n")
 
     # Medir tiempo secuencial (referencia)
     print("=" * 70)
     print("BASELINE: Ejecucion secuencial")
     print("=" * 70)
 
-    times_seq = []
-    for i in range(3):  # 3 repeticiones
-        print(f"  Iteracion {i+1}/3...", end=" ")
-        start = time.time()
-        _ = apply_sobel_sequential(gray_image)
-        elapsed = time.time() - start
-        times_seq.append(elapsed)
-        print(f"{elapsed:.4f} seg")
-
-    time_sequential = np.mean(times_seq)
-    std_sequential = np.std(times_seq)
-    print(f"\nPromedio: {time_sequential:.4f} seg (± {std_sequential:.4f} seg)\n")
+    setup, compute, teardown = benchmark_case(gray_image, engine, "sequential", 1)
+    baseline = time_case(setup, compute, teardown, repeats=repeats, warmup=warmup)
+    time_sequential = baseline['compute']['median']
+    iqr_sequential = baseline['compute']['iqr']
+    print(f"\nMediana: {time_sequential:.4f} seg (IQR {iqr_sequential:.4f} seg)\n")
 
     # Medir tiempos paralelos
     results = []
@@ -75,29 +78,28 @@ def benchmark_scalability():
         print(f"Probando con {num_proc} procesos")
         print("=" * 70)
 
-        times = []
-        for i in range(3):  # 3 repeticiones
-            print(f"  Iteracion {i+1}/3...", end=" ")
-            start = time.time()
-            _ = apply_sobel_parallel(gray_image, num_processes=num_proc)
-            elapsed = time.time() - start
-            times.append(elapsed)
-            print(f"{elapsed:.4f} seg")
-
-        avg_time = np.mean(times)
-        std_time = np.std(times)
-        speedup = time_sequential / avg_time
+        # El arranque y cierre del pool se miden aparte (setup/teardown),
+        # asi el tiempo de calculo no incluye la creacion de procesos
+        setup, compute, teardown = benchmark_case(gray_image, engine, backend, num_proc)
+        case = time_case(setup, compute, teardown, repeats=repeats, warmup=warmup)
+
+        median_time = case['compute']['median']
+        iqr_time = case['compute']['iqr']
+        speedup = time_sequential / median_time
         efficiency = (speedup / num_proc) * 100
 
         results.append({
             'num_processes': num_proc,
-            'time': avg_time,
-            'std': std_time,
+            'time': median_time,
+            'iqr': iqr_time,
+            'setup': case['setup'],
+            'teardown': case['teardown'],
             'speedup': speedup,
             'efficiency': efficiency
         })
 
-        print(f"\nPromedio: {avg_time:.4f} seg (± {std_time:.4f} seg)")
+        print(f"\nMediana: {median_time:.4f} seg (IQR {iqr_time:.4f} seg)")
+        print(f"Arranque: {case['setup']:.4f} seg | Cierre: {case['teardown']:.4f} seg")
         print(f"Speedup:  {speedup:.2f}x")
         print(f"Eficiencia: {efficiency:.2f}%\n")
 
@@ -108,9 +110,10 @@ def benchmark_scalability():
     plt.figure(figsize=(10, 6))
     num_procs = [r['num_processes'] for r in results]
     times = [r['time'] for r in results]
-    stds = [r['std'] for r in results]
+    # Barras de error: rango intercuartil alrededor de la mediana
+    iqrs = [r['iqr'] / 2 for r in results]
 
-    plt.errorbar(num_procs, times, yerr=stds, marker='o', linewidth=2,
+    plt.errorbar(num_procs, times, yerr=iqrs, marker='o', linewidth=2,
                  markersize=8, capsize=5, label='Tiempo paralelo')
     plt.axhline(y=time_sequential, color='r', linestyle='--',
                 linewidth=2, label='Tiempo secuencial')
@@ -206,13 +209,14 @@ def benchmark_scalability():
 
         f.write(f"Imagen: {test_image}\n")
         f.write(f"Dimensiones: {gray_image.shape}\n")
-        f.write(f"Cores disponibles: {max_cores}\n\n")
+        f.write(f"Cores disponibles: {max_cores}\n")
+        f.write(f"Motor: {engine} | Backend: {backend}\n\n")
 
         f.write("-"*70 + "\n")
         f.write("TIEMPO SECUENCIAL (BASELINE)\n")
         f.write("-"*70 + "\n")
-        f.write(f"Promedio: {time_sequential:.4f} seg\n")
-        f.write(f"Desv. Est.: {std_sequential:.4f} seg\n\n")
+        f.write(f"Mediana: {time_sequential:.4f} seg\n")
+        f.write(f"IQR: {iqr_sequential:.4f} seg\n\n")
 
         f.write("-"*70 + "\n")
         f.write("RESULTADOS PARALELOS\n")
@@ -235,10 +239,97 @@ def benchmark_scalability():
     print("="*70 + "\n")
 
 
+def benchmark_suite(args):
+    """
+    Barrido motor x tamaño x procesos con imagenes sinteticas
+
+    Escribe los resultados en <output>.json (con metadatos del entorno y
+    del commit) y <output>.csv. Con --compare se comparan las medianas
+    contra un JSON anterior y se marcan las regresiones.
+    """
+    print("\n" + "="*70)
+    print("=" + "  BENCHMARK SUITE  ".center(68) + "=")
+    print("="*70 + "\n")
+
+    metadata = environment_info()
+    metadata.update({
+        'engines': args.engines,
+        'sizes': args.sizes,
+        'backend': args.backend,
+    })
+    print(f"Commit: {metadata['commit']} | Cores: {metadata['cpu_count']}")
+    print(f"Motores: {args.engines} | Tamaños: {args.sizes} | Backend: {args.backend}")
+    print(f"Repeticiones: {args.repeats} (+{args.warmup} de calentamiento)\n")
+
+    rows = run_suite(args.engines, args.sizes, args.processes, args.backend,
+                     repeats=args.repeats, warmup=args.warmup)
+
+    json_path = f"{args.output}.json"
+    csv_path = f"{args.output}.csv"
+    save_results(rows, json_path, csv_path, metadata)
+    print(f"\n[OK] Resultados guardados: {json_path} y {csv_path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline_rows = json.load(f)['results']
+
+        comparison = compare_results(baseline_rows, rows, args.threshold)
+        regressions = [c for c in comparison if c['regression']]
+
+        print(f"\nComparacion contra {args.compare} (umbral {args.threshold:.0%}):")
+        print(f"{'CASO':<40} {'ANTES (s)':>12} {'AHORA (s)':>12} {'RATIO':>8}")
+        print("-" * 76)
+        for c in comparison:
+            engine, backend, size, num = c['case']
+            label = f"{engine} {backend} {size}^2 p={num}"
+            mark = "  <-- REGRESION" if c['regression'] else ""
+            print(f"{label:<40} {c['baseline_s']:>12.4f} {c['current_s']:>12.4f} "
+                  f"{c['ratio']:>8.2f}{mark}")
+        print(f"\nRegresiones: {len(regressions)} de {len(comparison)} casos")
+        return not regressions
+
+    return True
+
+
+def parse_args():
+    """Lee las opciones de linea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmark de escalabilidad Sobel")
+    parser.add_argument("--engine", choices=ENGINES, default="loops",
+                        help="Motor de calculo")
+    parser.add_argument("--backend", choices=BACKENDS, default="processes",
+                        help="Paralelismo: procesos o hilos")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="Repeticiones medidas por caso")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="Repeticiones de calentamiento sin medir")
+    parser.add_argument("--suite", action="store_true",
+                        help="Barrido motor x tamaño x procesos con imagenes sinteticas")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES,
+                        default=["vectorized", "separable"],
+                        help="Motores del barrido --suite")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help="Lados de las imagenes sinteticas del barrido --suite")
+    parser.add_argument("--processes", nargs="+", type=int, default=None,
+                        help="Numeros de procesos del barrido --suite "
+                             "(por defecto potencias de 2 hasta los cores disponibles)")
+    parser.add_argument("--output", default="results/benchmark_suite",
+                        help="Prefijo de los archivos .json y .csv del barrido --suite")
+    parser.add_argument("--compare", metavar="JSON",
+                        help="JSON de un barrido anterior contra el que comparar")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Cambio relativo que cuenta como regresion en --compare")
+    return parser.parse_args()
+
+
 def main():
     """Ejecuta el benchmark"""
+    args = parse_args()
     try:
-        benchmark_scalability()
+        if args.suite:
+            if not benchmark_suite(args):
+                sys.exit(1)
+        else:
+            benchmark_scalability(args.engine, args.backend, args.repeats, args.warmup)
     except Exception as e:
         print(f"\n[ERROR] Error durante benchmark: {e}")
         import traceback
@@ -4,16 +4,184 @@ Deteccion de Bordes Sobel: Secuencial vs Paralelo (Multicore)
 """
 import os
 import sys
+import argparse
+import numpy as np
 from multiprocessing import cpu_count
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-from src.sobel_sequential import sobel_edge_detection_sequential
-from src.sobel_parallel import sobel_edge_detection_parallel
+from src.sobel_sequential import (sobel_edge_detection_sequential, apply_sobel_sequential,
+                                  ENGINES)
+from src.sobel_parallel import sobel_edge_detection_parallel, BACKENDS
+from src.sobel_streaming import sobel_edge_detection_streaming
+from src.sobel_fused import fused_sobel_edges
+from src.batch import sobel_edge_detection_batch
+from src.cache import SobelCache
+from src.kernels import edge_detection_multi_kernel, KERNELS
+from src.sobel_integer import sobel_edge_detection_integer, MAGNITUDES
+from src.pyramid import sobel_edge_detection_pyramid
+from src.instrumentation import Tracer, tracing, print_summary
+from src.utils import (load_image, rgb_to_grayscale, normalize_image, save_image,
+                       format_bytes, PeakMemory, Timer)
 
 
-def main():
+def parse_args():
+    """Lee las opciones de linea de comandos"""
+    parser = argparse.ArgumentParser(description="Deteccion de bordes Sobel")
+    parser.add_argument("--engine", choices=ENGINES, default=None,
+                        help="Motor de calculo. Por defecto cada modo usa el suyo: loops en "
+                             "la comparacion y --fused, vectorized en --stream y "
+                             "separable en --batch y --pyramid")
+    parser.add_argument("--backend", choices=BACKENDS, default="processes",
+                        help="Paralelismo de la version paralela: procesos o hilos")
+    parser.add_argument("--stream", nargs=2, metavar=("ENTRADA", "SALIDA"),
+                        help="Procesa ENTRADA por bandas y escribe SALIDA (.npy o raw) "
+                             "sin cargar la imagen completa")
+    parser.add_argument("--band-rows", type=int, default=None,
+                        help="Filas por banda en modos --stream (256), --fused (64) "
+                             "y --kernels (32)")
+    parser.add_argument("--fused", action="store_true",
+                        help="Compara tiempo y memoria pico del pipeline secuencial "
+                             "contra el pipeline fusionado")
+    parser.add_argument("--kernels", nargs="+", choices=list(KERNELS), metavar="KERNEL",
+                        help="Calcula varios operadores en una pasada y guarda un "
+                             f"resultado por operador ({', '.join(KERNELS)})")
+    parser.add_argument("--integer", choices=MAGNITUDES, metavar="MAGNITUD",
+                        help="Ejecuta el camino entero (int16) con magnitud "
+                             f"{' o '.join(MAGNITUDES)}")
+    parser.add_argument("--pyramid", type=int, metavar="LADO",
+                        help="Bordes de grueso a fino: vista previa con lado mayor <= LADO "
+                             "y despues resolucion completa sin volver a decodificar")
+    parser.add_argument("--gray-decode", action="store_true",
+                        help="En --batch y --pyramid decodifica directamente a grises "
+                             "(JPEG: solo el canal Y) en lugar de RGB + conversion")
+    parser.add_argument("--memory", action="store_true",
+                        help="Reporta la memoria pico junto a los tiempos")
+    parser.add_argument("--batch", metavar="ORIGEN",
+                        help="Procesa todas las imagenes de un directorio o patron glob")
+    parser.add_argument("--output-dir", default="images/output/batch",
+                        help="Directorio de salida del modo --batch")
+    parser.add_argument("--decode-workers", type=int, default=2,
+                        help="Hilos de decodificacion en modo --batch")
+    parser.add_argument("--compute-workers", type=int, default=cpu_count(),
+                        help="Hilos de calculo en modo --batch")
+    parser.add_argument("--encode-workers", type=int, default=2,
+                        help="Hilos de codificacion en modo --batch")
+    parser.add_argument("--queue-size", type=int, default=8,
+                        help="Capacidad de las colas entre etapas en modo --batch")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Directorio de cache de resultados del modo --batch; las "
+                             "entradas repetidas se leen de disco en lugar de recalcularse. "
+                             "La comparacion secuencial vs paralelo no la usa")
+    parser.add_argument("--cache-max-mb", type=int, default=1024,
+                        help="Tamaño maximo de la cache en MB (se expulsan las menos usadas)")
+    parser.add_argument("--trace", metavar="ARCHIVO",
+                        help="Registra spans por etapa y por worker y los guarda en ARCHIVO")
+    parser.add_argument("--trace-format", choices=("chrome", "json"), default="chrome",
+                        help="Formato de --trace: chrome (chrome://tracing, Perfetto) o json")
+    return parser.parse_args()
+
+
+def compare_fused(args):
+    """Compara tiempo y memoria pico del camino por etapas y el fusionado"""
+    input_image = "images/input/pikachu.jpg"
+    output_fused = "images/output/pikachu_edges_fused.jpg"
+
+    os.makedirs("images/output", exist_ok=True)
+
+    if not os.path.exists(input_image):
+        print(f"[ERROR] No se encuentra la imagen {input_image}")
+        return
+
+    print("\n" + "="*70)
+    print("  POR ETAPAS vs FUSIONADO  ".center(70))
+    print("="*70 + "\n")
+
+    rgb_image = load_image(input_image)
+    print(f"Imagen: {input_image} ({rgb_image.shape[0]}x{rgb_image.shape[1]})")
+    print(f"Motor: {args.engine}\n")
+
+    with PeakMemory("Por etapas") as memory_staged:
+        with Timer("Por etapas") as timer_staged:
+            gray_image = rgb_to_grayscale(rgb_image)
+            edges_staged = normalize_image(apply_sobel_sequential(gray_image, args.engine))
+    del gray_image
+
+    with PeakMemory("Fusionado") as memory_fused:
+        with Timer("Fusionado") as timer_fused:
+            edges_fused = fused_sobel_edges(rgb_image, band_rows=args.band_rows or 64,
+                                            engine=args.engine)
+
+    save_image(edges_fused, output_fused)
+
+    print(f"\n{'PIPELINE':<20} {'TIEMPO (seg)':>15} {'MEMORIA PICO':>20}")
+    print("-" * 70)
+    print(f"{'Por etapas':<20} {timer_staged.elapsed:>15.4f} "
+          f"{format_bytes(memory_staged.peak):>20}")
+    print(f"{'Fusionado':<20} {timer_fused.elapsed:>15.4f} "
+          f"{format_bytes(memory_fused.peak):>20}")
+    print("-" * 70)
+    print("Memoria pico (tracemalloc) de RGB -> bordes uint8, sin carga ni guardado.")
+    identical = np.array_equal(edges_staged, edges_fused)
+    print(f"Resultados identicos: {'si' if identical else 'NO'}")
+    print(f"Resultado guardado en: {output_fused}\n")
+
+
+def run(args):
     """Ejecuta implementaciones secuencial y paralela, compara resultados"""
+    # Los modos --stream, --batch y --pyramid conservan su propio motor por
+    # defecto; solo se les pasa el de la linea de comandos si se dio
+    engine_kwargs = {"engine": args.engine} if args.engine else {}
+
+    if args.stream:
+        input_path, output_path = args.stream
+        sobel_edge_detection_streaming(input_path, output_path, args.band_rows or 256,
+                                       **engine_kwargs)
+        return
+
+    # La comparacion secuencial vs paralelo y --fused usan el motor de referencia
+    if args.engine is None:
+        args.engine = "loops"
+
+    if args.fused:
+        compare_fused(args)
+        return
+
+    if args.integer:
+        os.makedirs("images/output", exist_ok=True)
+        sobel_edge_detection_integer("images/input/pikachu.jpg",
+                                     f"images/output/pikachu_edges_{args.integer}.jpg",
+                                     args.integer)
+        return
+
+    if args.pyramid:
+        os.makedirs("images/output", exist_ok=True)
+        sobel_edge_detection_pyramid("images/input/pikachu.jpg",
+                                     "images/output/pikachu_edges_level{level}.jpg",
+                                     args.pyramid,
+                                     decode_mode="L" if args.gray_decode else "RGB",
+                                     **engine_kwargs)
+        return
+
+    if args.kernels:
+        os.makedirs("images/output", exist_ok=True)
+        edge_detection_multi_kernel("images/input/pikachu.jpg",
+                                    "images/output/pikachu_edges_{kernel}.jpg",
+                                    args.kernels, args.band_rows or 32)
+        return
+
+    if args.batch:
+        cache = None
+        if args.cache_dir:
+            cache = SobelCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024**2)
+        sobel_edge_detection_batch(args.batch, args.output_dir,
+                                   decode_workers=args.decode_workers,
+                                   compute_workers=args.compute_workers,
+                                   encode_workers=args.encode_workers,
+                                   queue_size=args.queue_size,
+                                   decode_mode="L" if args.gray_decode else "RGB",
+                                   cache=cache, **engine_kwargs)
+        return
 
     input_image = "images/input/pikachu.jpg"
     output_seq = "images/output/pikachu_edges_sequential.jpg"
@@ -30,7 +198,14 @@ def main():
 
     cores_disponibles = cpu_count()
     print(f"Cores CPU disponibles: {cores_disponibles}")
-    print(f"Imagen de entrada: {input_image}\n")
+    print(f"Imagen de entrada: {input_image}")
+    print(f"Motor de calculo: {args.engine}")
+    print(f"Backend paralelo: {args.backend}")
+    if args.cache_dir:
+        # Ambas ejecuciones tienen la misma clave: la paralela leeria el
+        # resultado de la secuencial y el speedup no mediria el calculo
+        print(f"[AVISO] --cache-dir se ignora en la comparacion secuencial vs paralelo")
+    print()
 
     if not os.path.exists(input_image):
         print(f"[ERROR] No se encuentra la imagen {input_image}")
@@ -43,7 +218,9 @@ def main():
     print(">"*70)
 
     try:
-        time_sequential = sobel_edge_detection_sequential(input_image, output_seq)
+        time_sequential = sobel_edge_detection_sequential(input_image, output_seq,
+                                                          engine=args.engine,
+                                                          measure_memory=args.memory)
     except Exception as e:
         print(f"\n[ERROR] Fallo en ejecucion secuencial: {e}\n")
         return
@@ -57,7 +234,10 @@ def main():
         time_parallel = sobel_edge_detection_parallel(
             input_image,
             output_par,
-            num_processes=cores_disponibles
+            num_processes=cores_disponibles,
+            engine=args.engine,
+            backend=args.backend,
+            measure_memory=args.memory
         )
     except Exception as e:
         print(f"\n[ERROR] Fallo en ejecucion paralela: {e}\n")
@@ -141,5 +321,21 @@ def main():
     print("\n" + "="*70 + "\n")
 
 
+def main():
+    """Lee las opciones y ejecuta, con traza si se pidio --trace"""
+    args = parse_args()
+
+    if not args.trace:
+        run(args)
+        return
+
+    with tracing(Tracer()) as tracer:
+        run(args)
+
+    tracer.save(args.trace, format=args.trace_format)
+    print_summary(tracer)
+    print(f"Traza guardada en: {args.trace} (formato {args.trace_format})\n")
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,111 @@
+"""
+Servicio HTTP de deteccion de bordes Sobel y prueba de carga local
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+from multiprocessing import cpu_count
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.sobel_sequential import ENGINES
+from src.sobel_parallel import BACKENDS
+from src.service import SobelService, load_test, http_request, OUTPUT_FORMATS
+
+
+def parse_args():
+    """Lee las opciones de linea de comandos"""
+    parser = argparse.ArgumentParser(description="Servicio HTTP de deteccion de bordes Sobel")
+    parser.add_argument("--host", default="127.0.0.1", help="Direccion de escucha")
+    parser.add_argument("--port", type=int, default=8080, help="Puerto (0 = uno libre)")
+    parser.add_argument("--engine", choices=ENGINES, default="separable",
+                        help="Motor de calculo")
+    parser.add_argument("--backend", choices=BACKENDS, default="processes",
+                        help="Pool de calculo: procesos (SobelExecutor) o hilos")
+    parser.add_argument("--workers", type=int, default=cpu_count(),
+                        help="Procesos o hilos del pool de calculo")
+    parser.add_argument("--max-batch", type=int, default=8,
+                        help="Imagenes del mismo tamaño por llamada al pool")
+    parser.add_argument("--batch-window-ms", type=float, default=5.0,
+                        help="Espera maxima de un lote incompleto")
+    parser.add_argument("--max-pending", type=int, default=64,
+                        help="Peticiones en curso a partir de las cuales se responde 503")
+    parser.add_argument("--io-threads", type=int, default=4,
+                        help="Hilos de decodificacion y codificacion")
+    parser.add_argument("--gray-decode", action="store_true",
+                        help="Decodifica directamente a grises (ver load_image)")
+    parser.add_argument("--load-test", action="store_true",
+                        help="Arranca el servicio en un puerto libre, lo somete a carga "
+                             "y muestra el reporte y /metrics")
+    parser.add_argument("--image", default="images/input/pikachu.jpg",
+                        help="Imagen que envia la prueba de carga")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Peticiones totales de la prueba de carga")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Conexiones simultaneas de la prueba de carga")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="png",
+                        help="Formato de respuesta pedido en la prueba de carga")
+    return parser.parse_args()
+
+
+def build_service(args):
+    """Crea el SobelService con las opciones de linea de comandos"""
+    return SobelService(engine=args.engine, workers=args.workers, backend=args.backend,
+                        max_batch=args.max_batch, batch_window=args.batch_window_ms / 1e3,
+                        max_pending=args.max_pending, io_threads=args.io_threads,
+                        decode_mode="L" if args.gray_decode else "RGB")
+
+
+async def run_load_test(args):
+    """Servicio y clientes en el mismo proceso, sin servicios externos"""
+    with open(args.image, "rb") as f:
+        payload = f.read()
+
+    service = build_service(args)
+    await service.start(args.host, 0)
+
+    print("\n" + "="*60)
+    print("PRUEBA DE CARGA - SERVICIO SOBEL")
+    print(f"Servicio: http://{service.host}:{service.port} | Motor: {args.engine} "
+          f"({args.backend}, {args.workers} workers)")
+    print(f"Peticiones: {args.requests} | Concurrencia: {args.concurrency} | "
+          f"Imagen: {args.image} ({len(payload):,} bytes)")
+    print("="*60)
+
+    try:
+        report = await load_test(service.host, service.port, payload,
+                                 args.requests, args.concurrency, args.format)
+
+        reader, writer = await asyncio.open_connection(service.host, service.port)
+        _, _, metrics = await http_request(reader, writer, "GET", "/metrics")
+        writer.close()
+    finally:
+        await service.close()
+
+    latency = report['latency_ms']
+    print(f"\nRespuestas: {report['statuses']}")
+    print(f"Throughput: {report['requests_per_second']:.2f} peticiones/segundo")
+    print(f"Latencia (ms): p50 {latency['p50']:.1f} | p90 {latency['p90']:.1f} | "
+          f"p99 {latency['p99']:.1f} | max {latency['max']:.1f}")
+    print("\n/metrics:")
+    print(json.dumps(json.loads(metrics), indent=2))
+
+
+def main():
+    """Arranca el servicio o la prueba de carga"""
+    args = parse_args()
+
+    if args.load_test:
+        asyncio.run(run_load_test(args))
+        return
+
+    try:
+        asyncio.run(build_service(args).serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nServicio detenido")
+
+
+if __name__ == "__main__":
+    main()
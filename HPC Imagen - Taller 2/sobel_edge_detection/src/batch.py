@@ -0,0 +1,253 @@
+"""
+Procesamiento por lotes de directorios de imagenes
+Las etapas de decodificacion, calculo y codificacion corren solapadas,
+conectadas por colas acotadas y con su propio numero de workers cada una
+"""
+import os
+import glob
+import queue
+import threading
+import time
+
+# Manejar imports relativos y absolutos
+try:
+    from .utils import load_image, save_image, DECODE_MODES
+    from .sobel_fused import fused_sobel_edges
+    from .sobel_sequential import ENGINES
+except ImportError:
+    from utils import load_image, save_image, DECODE_MODES
+    from sobel_fused import fused_sobel_edges
+    from sobel_sequential import ENGINES
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".ppm", ".pgm")
+
+# Marca de fin de trabajo que cada etapa pasa a la siguiente
+_END = object()
+
+
+def find_images(source):
+    """
+    Lista las imagenes de un directorio o de un patron glob
+
+    Args:
+        source: directorio (se toman los archivos con extension de imagen)
+                o patron glob, por ejemplo 'fotos/**/*.jpg'
+
+    Returns:
+        lista ordenada de rutas
+    """
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+        paths = [p for p in paths if p.lower().endswith(IMAGE_EXTENSIONS)]
+    else:
+        paths = glob.glob(source, recursive=True)
+
+    return sorted(p for p in paths if os.path.isfile(p))
+
+
+def _output_paths(paths, output_dir, suffix):
+    """
+    Rutas de salida: mismo nombre con sufijo, en output_dir
+
+    Se conservan los subdirectorios relativos al directorio comun de las
+    entradas, asi que 'a/x.jpg' y 'b/x.jpg' (patron 'fotos/**/*.jpg') no
+    escriben el mismo archivo.
+
+    Returns:
+        lista de rutas de salida, en el orden de paths
+
+    Raises:
+        ValueError: si dos entradas producen la misma salida
+    """
+    if not paths:
+        return []
+
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+    outputs = []
+    for path in paths:
+        name, ext = os.path.splitext(os.path.relpath(os.path.abspath(path), root))
+        outputs.append(os.path.join(output_dir, f"{name}{suffix}{ext}"))
+
+    if len(set(outputs)) < len(outputs):
+        repeated = sorted({out for out in outputs if outputs.count(out) > 1})
+        raise ValueError(f"Entradas con la misma ruta de salida: {', '.join(repeated)}")
+    return outputs
+
+
+def _run_stage(worker, in_queue, out_queue, num_workers, errors):
+    """
+    Arranca num_workers hilos que consumen in_queue y producen en out_queue
+
+    Cuando todos los hilos de la etapa terminan se envia una unica marca
+    de fin a la etapa siguiente.
+
+    Returns:
+        lista de hilos arrancados
+    """
+    remaining = [num_workers]
+    lock = threading.Lock()
+
+    def loop():
+        while True:
+            item = in_queue.get()
+            if item is _END:
+                # Reenviar la marca a los demas hilos de la misma etapa
+                in_queue.put(_END)
+                break
+            try:
+                result = worker(item)
+            except Exception as e:
+                errors.append((item[0], e))
+                continue
+            if out_queue is not None:
+                out_queue.put(result)
+
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and out_queue is not None:
+            out_queue.put(_END)
+
+    threads = [threading.Thread(target=loop, daemon=True) for _ in range(num_workers)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def run_batch(paths, output_dir, decode_workers=2, compute_workers=2,
+              encode_workers=2, queue_size=8, engine="separable", suffix="_edges",
+              decode_mode="RGB", cache=None):
+    """
+    Aplica Sobel a una lista de imagenes con etapas solapadas
+
+    decode (load_image) -> compute (fused_sobel_edges) -> encode (save_image)
+
+    Cada etapa tiene su propio grupo de hilos; la decodificacion y
+    codificacion de PIL y los motores vectorizados de NumPy liberan el
+    GIL, asi que las tres etapas avanzan en paralelo. Las colas acotadas
+    (queue_size) frenan a las etapas rapidas para no acumular imagenes
+    decodificadas en memoria.
+
+    Args:
+        paths: lista de rutas de entrada
+        output_dir: directorio donde guardar los bordes
+        decode_workers, compute_workers, encode_workers: hilos por etapa
+        queue_size: capacidad de cada cola entre etapas
+        engine: motor de calculo
+        suffix: sufijo del nombre de los archivos de salida
+        decode_mode: 'RGB' o 'L' (decodificar directamente a grises, ver load_image)
+        cache: SobelCache donde buscar/guardar los bordes (None = sin cache)
+
+    Returns:
+        dict con images, failed, errors, elapsed e images_per_second
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Motor desconocido: {engine}. Opciones: {', '.join(ENGINES)}")
+
+    if decode_mode not in DECODE_MODES:
+        raise ValueError(f"Modo desconocido: {decode_mode}. Opciones: {', '.join(DECODE_MODES)}")
+
+    for name, value in (("decode_workers", decode_workers),
+                        ("compute_workers", compute_workers),
+                        ("encode_workers", encode_workers),
+                        ("queue_size", queue_size)):
+        if value < 1:
+            raise ValueError(f"{name} debe ser positivo. Recibido: {value}")
+
+    outputs = dict(zip(paths, _output_paths(paths, output_dir, suffix)))
+    os.makedirs(output_dir, exist_ok=True)
+
+    path_queue = queue.Queue()
+    decoded_queue = queue.Queue(maxsize=queue_size)
+    computed_queue = queue.Queue(maxsize=queue_size)
+    errors = []
+    saved = []
+
+    def decode(item):
+        path, = item
+        return path, load_image(path, mode=decode_mode)
+
+    def compute(item):
+        path, image = item
+        if cache is None:
+            return path, fused_sobel_edges(image, engine=engine)
+        return path, cache.get_or_compute(image, lambda: fused_sobel_edges(image, engine=engine),
+                                          operator="fused", engine=engine)
+
+    def encode(item):
+        path, edges = item
+        output_path = outputs[path]
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        save_image(edges, output_path)
+        saved.append(path)
+
+    start = time.perf_counter()
+
+    threads = []
+    threads += _run_stage(decode, path_queue, decoded_queue, decode_workers, errors)
+    threads += _run_stage(compute, decoded_queue, computed_queue, compute_workers, errors)
+    threads += _run_stage(encode, computed_queue, None, encode_workers, errors)
+
+    for path in paths:
+        path_queue.put((path,))
+    path_queue.put(_END)
+
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        'images': len(saved),
+        'failed': len(errors),
+        'errors': errors,
+        'elapsed': elapsed,
+        'images_per_second': len(saved) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def sobel_edge_detection_batch(source, output_dir, decode_workers=2, compute_workers=2,
+                               encode_workers=2, queue_size=8, engine="separable",
+                               decode_mode="RGB", cache=None):
+    """
+    Pipeline de deteccion de bordes para un directorio o patron glob
+
+    Args:
+        source: directorio o patron glob de entrada
+        output_dir: directorio de salida
+        decode_workers, compute_workers, encode_workers: hilos por etapa
+        queue_size: capacidad de cada cola entre etapas
+        engine: motor de calculo
+        decode_mode: 'RGB' o 'L' (decodificar directamente a grises)
+        cache: SobelCache donde buscar/guardar los bordes (None = sin cache)
+
+    Returns:
+        dict con las estadisticas de run_batch
+    """
+    paths = find_images(source)
+
+    print("\n" + "="*60)
+    print("SOBEL EDGE DETECTION - MODO LOTE")
+    print(f"Motor: {engine} | Decodificacion: {decode_mode}")
+    print(f"Workers: decode={decode_workers} compute={compute_workers} "
+          f"encode={encode_workers} | Cola: {queue_size}")
+    print("="*60)
+
+    print(f"\nImagenes encontradas: {len(paths)} en {source}")
+    stats = run_batch(paths, output_dir, decode_workers, compute_workers,
+                      encode_workers, queue_size, engine, decode_mode=decode_mode,
+                      cache=cache)
+
+    for path, error in stats['errors']:
+        print(f"[ERROR] {path}: {error}")
+
+    print("\n" + "="*60)
+    print(f"PROCESAMIENTO COMPLETADO")
+    print(f"Imagenes procesadas: {stats['images']} (fallidas: {stats['failed']})")
+    print(f"Tiempo: {stats['elapsed']:.4f} segundos")
+    print(f"Throughput: {stats['images_per_second']:.2f} imagenes/segundo")
+    if cache is not None:
+        print(f"Cache: {cache.hits} aciertos, {cache.misses} fallos")
+    print("="*60 + "\n")
+
+    return stats
@@ -0,0 +1,308 @@
+"""
+Utilidades de medicion para los benchmarks
+Tiempos con perf_counter, iteraciones de calentamiento, mediana/IQR y
+exportacion de resultados a JSON/CSV para comparar entre commits
+"""
+import os
+import sys
+import csv
+import json
+import time
+import platform
+import subprocess
+import numpy as np
+from multiprocessing import cpu_count
+
+# Manejar imports relativos y absolutos
+try:
+    from .sobel_sequential import apply_sobel_sequential, prepare_output, SobelBuffers
+    from .sobel_parallel import SobelExecutor, apply_sobel_threaded
+    from .sobel_numba import compile_numba
+except ImportError:
+    from sobel_sequential import apply_sobel_sequential, prepare_output, SobelBuffers
+    from sobel_parallel import SobelExecutor, apply_sobel_threaded
+    from sobel_numba import compile_numba
+
+DEFAULT_SIZES = (256, 512, 1024, 2048, 4096, 8192)
+
+# El motor 'loops' es Python puro; por encima de este lado tardaria minutos
+LOOPS_MAX_SIZE = 512
+
+CSV_FIELDS = ("engine", "backend", "size", "processes", "repeats", "warmup",
+              "setup_s", "compute_median_s", "compute_q1_s", "compute_q3_s",
+              "compute_iqr_s", "compute_min_s", "compute_max_s", "teardown_s",
+              "megapixels_per_s", "speedup")
+
+
+def summarize(times):
+    """
+    Estadisticas robustas de una lista de tiempos
+
+    Returns:
+        dict con median, q1, q3, iqr, min, max y n
+    """
+    times = np.asarray(times, dtype=np.float64)
+    q1, median, q3 = np.percentile(times, [25, 50, 75])
+    return {
+        'median': float(median),
+        'q1': float(q1),
+        'q3': float(q3),
+        'iqr': float(q3 - q1),
+        'min': float(times.min()),
+        'max': float(times.max()),
+        'n': int(times.size),
+    }
+
+
+def time_case(setup, compute, teardown=None, repeats=5, warmup=1):
+    """
+    Mide un caso separando preparacion, calculo y liberacion
+
+    setup() se ejecuta una vez y devuelve el estado (pool, buffers...),
+    compute(state) se ejecuta warmup veces sin medir y luego repeats
+    veces midiendo cada una, y teardown(state) libera el estado.
+
+    Returns:
+        dict con setup (seg), compute (summarize) y teardown (seg)
+    """
+    if repeats < 1:
+        raise ValueError(f"repeats debe ser positivo. Recibido: {repeats}")
+
+    start = time.perf_counter()
+    state = setup()
+    setup_time = time.perf_counter() - start
+
+    try:
+        for _ in range(warmup):
+            compute(state)
+
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            compute(state)
+            times.append(time.perf_counter() - start)
+    finally:
+        start = time.perf_counter()
+        if teardown is not None:
+            teardown(state)
+        teardown_time = time.perf_counter() - start
+
+    return {
+        'setup': setup_time,
+        'compute': summarize(times),
+        'teardown': teardown_time,
+    }
+
+
+def synthetic_image(size, seed=0):
+    """Imagen en grises uint8 (size, size) reproducible, como la de rgb_to_grayscale"""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (size, size), dtype=np.uint8)
+
+
+def benchmark_case(gray_image, engine, backend, processes):
+    """
+    Devuelve (setup, compute, teardown) de un caso del barrido
+
+    Con engine='numba' la compilacion (o carga desde la cache en disco)
+    del proceso principal queda en setup.
+    """
+    if backend == "sequential":
+        def setup():
+            if engine == "numba":
+                compile_numba()
+            buffers = SobelBuffers(gray_image.shape) if engine == "separable" else None
+            return prepare_output(gray_image.shape), buffers
+
+        def compute(state):
+            out, buffers = state
+            apply_sobel_sequential(gray_image, engine, out=out, buffers=buffers)
+
+        return setup, compute, None
+
+    if backend == "threads":
+        # El ThreadPoolExecutor se crea dentro de cada llamada; su arranque
+        # es de microsegundos y queda incluido en el calculo
+        def setup():
+            if engine == "numba":
+                compile_numba()
+            return prepare_output(gray_image.shape)
+
+        def compute(out):
+            apply_sobel_threaded(gray_image, processes, engine, out=out)
+
+        return setup, compute, None
+
+    def setup():
+        return SobelExecutor(num_processes=processes, engine=engine), \
+            prepare_output(gray_image.shape)
+
+    def compute(state):
+        executor, out = state
+        executor.apply(gray_image, out=out)
+
+    def teardown(state):
+        state[0].close()
+
+    return setup, compute, teardown
+
+
+def run_suite(engines, sizes=DEFAULT_SIZES, processes=None, backend="processes",
+              repeats=5, warmup=1, verbose=True):
+    """
+    Barre motor x tamaño x numero de procesos
+
+    Para cada motor y tamaño se mide primero la version secuencial, que
+    sirve de referencia para el speedup, y despues la version paralela
+    con cada numero de procesos. El arranque del pool queda en setup_s y
+    su cierre en teardown_s, fuera del tiempo de calculo.
+
+    Args:
+        engines: lista de motores
+        sizes: lados de las imagenes sinteticas cuadradas
+        processes: lista de numeros de procesos (None = 1, 2, 4... hasta cpu_count)
+        backend: 'processes' o 'threads' para la version paralela
+        repeats: repeticiones medidas por caso
+        warmup: repeticiones de calentamiento sin medir
+        verbose: imprimir cada caso
+
+    Returns:
+        lista de dicts, una fila por caso (campos de CSV_FIELDS)
+    """
+    if processes is None:
+        processes = [1]
+        while processes[-1] * 2 <= cpu_count():
+            processes.append(processes[-1] * 2)
+        if processes[-1] != cpu_count():
+            processes.append(cpu_count())
+
+    rows = []
+    for size in sizes:
+        gray_image = synthetic_image(size)
+        megapixels = gray_image.size / 1e6
+
+        for engine in engines:
+            if engine == "loops" and size > LOOPS_MAX_SIZE:
+                if verbose:
+                    print(f"  [SKIP] loops {size}x{size} (limite {LOOPS_MAX_SIZE})")
+                continue
+
+            cases = [("sequential", 1)] + [(backend, n) for n in processes]
+            baseline = None
+            for case_backend, num in cases:
+                setup, compute, teardown = benchmark_case(gray_image, engine,
+                                                          case_backend, num)
+                result = time_case(setup, compute, teardown, repeats, warmup)
+                stats = result['compute']
+                if baseline is None:
+                    baseline = stats['median']
+
+                row = {
+                    'engine': engine,
+                    'backend': case_backend,
+                    'size': size,
+                    'processes': num,
+                    'repeats': repeats,
+                    'warmup': warmup,
+                    'setup_s': result['setup'],
+                    'compute_median_s': stats['median'],
+                    'compute_q1_s': stats['q1'],
+                    'compute_q3_s': stats['q3'],
+                    'compute_iqr_s': stats['iqr'],
+                    'compute_min_s': stats['min'],
+                    'compute_max_s': stats['max'],
+                    'teardown_s': result['teardown'],
+                    'megapixels_per_s': megapixels / stats['median'],
+                    'speedup': baseline / stats['median'],
+                }
+                rows.append(row)
+
+                if verbose:
+                    print(f"  {engine:<11} {case_backend:<10} {size:>5}^2 p={num:<3} "
+                          f"mediana {stats['median']:.4f}s (IQR {stats['iqr']:.4f}) "
+                          f"setup {result['setup']:.4f}s speedup {row['speedup']:.2f}x")
+
+    return rows
+
+
+def _git_commit():
+    """Commit actual del repositorio, o None si no se puede obtener"""
+    try:
+        output = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+                                timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def environment_info():
+    """Metadatos de la maquina para interpretar y comparar resultados"""
+    return {
+        'commit': _git_commit(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': cpu_count(),
+    }
+
+
+def save_results(rows, json_path=None, csv_path=None, metadata=None):
+    """
+    Guarda las filas del barrido en JSON (con metadatos) y/o CSV
+
+    Args:
+        rows: filas devueltas por run_suite
+        json_path: ruta del JSON (None = no escribir)
+        csv_path: ruta del CSV (None = no escribir)
+        metadata: dict extra para el JSON (por defecto environment_info())
+    """
+    if metadata is None:
+        metadata = environment_info()
+
+    if json_path:
+        os.makedirs(os.path.dirname(json_path) or ".", exist_ok=True)
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({'metadata': metadata, 'results': rows}, f, indent=2)
+
+    if csv_path:
+        os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({field: row[field] for field in CSV_FIELDS})
+
+
+def compare_results(baseline_rows, current_rows, threshold=0.10):
+    """
+    Compara dos barridos caso a caso por la mediana de calculo
+
+    Args:
+        baseline_rows, current_rows: filas de run_suite (o del JSON guardado)
+        threshold: cambio relativo a partir del cual se marca una regresion
+
+    Returns:
+        lista de dicts con la clave del caso, ambas medianas, ratio y
+        regression (True si current es mas lento que baseline * (1 + threshold))
+    """
+    def key(row):
+        return (row['engine'], row['backend'], int(row['size']), int(row['processes']))
+
+    baseline = {key(row): float(row['compute_median_s']) for row in baseline_rows}
+    comparison = []
+    for row in current_rows:
+        if key(row) not in baseline:
+            continue
+        old = baseline[key(row)]
+        new = float(row['compute_median_s'])
+        ratio = new / old if old > 0 else float("inf")
+        comparison.append({
+            'case': key(row),
+            'baseline_s': old,
+            'current_s': new,
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        })
+    return comparison
@@ -0,0 +1,166 @@
+"""
+Cache en disco de resultados Sobel direccionado por contenido
+La clave es un hash de los pixeles de entrada mas los parametros del algoritmo
+"""
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+
+# Version del formato de las entradas; cambiarla invalida la cache existente
+CACHE_VERSION = 1
+
+
+class SobelCache:
+    """
+    Cache LRU de mapas de bordes en un directorio, con tamaño maximo
+
+    Cada resultado se guarda como <clave>.npy. Los aciertos se devuelven
+    como arrays de solo lectura mapeados en memoria (np.load con
+    mmap_mode='r'), sin leer ni decodificar el archivo completo. La fecha
+    de modificacion de cada archivo marca su ultimo uso, y al superar
+    max_bytes se borran primero los menos usados.
+
+    Uso:
+        cache = SobelCache("results/cache", max_bytes=512 * 1024**2)
+        edges = cache.get_or_compute(gray_image,
+                                     lambda: apply_sobel_sequential(gray_image, "separable"),
+                                     engine="separable")
+    """
+    def __init__(self, cache_dir, max_bytes=1024**3):
+        """
+        Args:
+            cache_dir: directorio de la cache (se crea si no existe)
+            max_bytes: tamaño maximo total de los resultados guardados
+        """
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes debe ser positivo. Recibido: {max_bytes}")
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, image, **params):
+        """
+        Calcula la clave de una imagen y unos parametros
+
+        Args:
+            image: numpy array de entrada
+            **params: parametros del algoritmo (motor, kernel...), serializables a JSON
+
+        Returns:
+            str hexadecimal
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        header = {
+            'version': CACHE_VERSION,
+            'shape': list(image.shape),
+            'dtype': image.dtype.str,
+            'params': params,
+        }
+        digest.update(json.dumps(header, sort_keys=True).encode("utf-8"))
+        digest.update(memoryview(np.ascontiguousarray(image)).cast("B"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def get(self, key):
+        """
+        Busca un resultado en la cache
+
+        Returns:
+            numpy memmap de solo lectura, o None si no esta
+        """
+        path = self._path(key)
+        try:
+            result = np.load(path, mmap_mode='r')
+            os.utime(path)
+        except (FileNotFoundError, ValueError, OSError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        """
+        Guarda un resultado y aplica la politica de expulsion LRU
+
+        La escritura es atomica (archivo temporal + os.replace), asi que
+        varios procesos e hilos pueden compartir el directorio.
+
+        Returns:
+            numpy memmap de solo lectura con el resultado guardado
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, result)
+        os.replace(tmp_path, path)
+
+        self._evict(keep=path)
+        return np.load(path, mmap_mode='r')
+
+    def get_or_compute(self, image, compute, **params):
+        """
+        Devuelve el resultado guardado o lo calcula y lo guarda
+
+        Args:
+            image: numpy array de entrada (define la clave junto con params)
+            compute: funcion sin argumentos que calcula el resultado
+            **params: parametros del algoritmo que forman parte de la clave
+
+        Returns:
+            numpy array con el resultado (memmap de solo lectura)
+        """
+        key = self.key(image, **params)
+        result = self.get(key)
+        if result is None:
+            result = self.put(key, compute())
+        return result
+
+    def _entries(self):
+        """Lista (mtime, tamaño, ruta) de los resultados guardados"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npy"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        """Tamaño total en bytes de los resultados guardados"""
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self, keep=None):
+        """Borra los resultados menos usados hasta quedar bajo max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Borra todos los resultados de la cache"""
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
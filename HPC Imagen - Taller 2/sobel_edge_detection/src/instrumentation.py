@@ -0,0 +1,255 @@
+"""
+Instrumentacion del pipeline Sobel
+Registra intervalos (spans) por etapa y por worker y los exporta a JSON o
+al formato de trazas de Chrome (chrome://tracing, Perfetto)
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Manejar imports relativos y absolutos
+try:
+    from .utils import format_bytes
+except ImportError:
+    from utils import format_bytes
+
+
+class _NullSpan:
+    """Span que no hace nada; se devuelve cuando la traza esta desactivada"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Intervalo medido con perf_counter que se registra en su Tracer al cerrarse"""
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.tracer.add(self.name, self.start, time.perf_counter(), self.cat, **self.args)
+
+    def set(self, **args):
+        """Agrega argumentos (bytes, filas...) que se conocen dentro del bloque"""
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    Colector de spans por etapa y por worker
+
+    Los tiempos son de time.perf_counter, que en Linux, macOS y Windows es
+    un reloj monotono del sistema, asi que los spans medidos dentro de los
+    workers de multiprocessing se pueden mezclar con los del proceso
+    principal. Con enabled=False span() devuelve un objeto compartido que
+    no hace nada y add() retorna de inmediato.
+
+    Uso:
+        tracer = Tracer()
+        with tracing(tracer):
+            apply_sobel_parallel(gray_image, 4)
+        tracer.save("results/trace.json", format="chrome")
+    """
+    def __init__(self, enabled=True):
+        """
+        Args:
+            enabled: Si es False no se registra nada
+        """
+        self.enabled = enabled
+        self.spans = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def span(self, name, cat="stage", **args):
+        """
+        Context manager que mide un bloque
+
+        Args:
+            name: nombre de la etapa ('load', 'dispatch', 'gather'...)
+            cat: categoria ('stage', 'worker', 'transfer', 'pool')
+            **args: datos adicionales del span (bytes, filas...)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, cat, args)
+
+    def add(self, name, start, end, cat="stage", pid=None, tid=None, **args):
+        """
+        Registra un span ya medido (por ejemplo, dentro de un worker)
+
+        Args:
+            name: nombre del span
+            start, end: instantes de perf_counter
+            cat: categoria
+            pid, tid: proceso e hilo que lo ejecutaron (None = los actuales)
+            **args: datos adicionales
+        """
+        if not self.enabled:
+            return
+        record = {
+            'name': name,
+            'cat': cat,
+            'start': start,
+            'end': end,
+            'pid': pid if pid is not None else os.getpid(),
+            'tid': tid if tid is not None else threading.get_native_id(),
+            'args': args,
+        }
+        with self._lock:
+            self.spans.append(record)
+
+    def clear(self):
+        """Descarta los spans registrados"""
+        with self._lock:
+            self.spans = []
+
+    def summary(self):
+        """
+        Agrega los spans por nombre
+
+        Returns:
+            dict nombre -> {count, total_s, mean_s, max_s, bytes}
+        """
+        result = {}
+        for record in self.spans:
+            duration = record['end'] - record['start']
+            stats = result.setdefault(record['name'], {
+                'count': 0, 'total_s': 0.0, 'max_s': 0.0, 'bytes': 0,
+            })
+            stats['count'] += 1
+            stats['total_s'] += duration
+            stats['max_s'] = max(stats['max_s'], duration)
+            stats['bytes'] += record['args'].get('bytes', 0)
+
+        for stats in result.values():
+            stats['mean_s'] = stats['total_s'] / stats['count']
+        return result
+
+    def to_dict(self):
+        """Spans con tiempos relativos al inicio de la traza, mas el resumen"""
+        spans = []
+        for record in sorted(self.spans, key=lambda r: r['start']):
+            spans.append({
+                'name': record['name'],
+                'cat': record['cat'],
+                'start_s': record['start'] - self._origin,
+                'duration_s': record['end'] - record['start'],
+                'pid': record['pid'],
+                'tid': record['tid'],
+                'args': record['args'],
+            })
+        return {'spans': spans, 'summary': self.summary()}
+
+    def to_chrome_trace(self):
+        """Eventos completos ('X') del formato Trace Event de Chrome, en microsegundos"""
+        events = []
+        for record in self.spans:
+            events.append({
+                'name': record['name'],
+                'cat': record['cat'],
+                'ph': 'X',
+                'ts': (record['start'] - self._origin) * 1e6,
+                'dur': (record['end'] - record['start']) * 1e6,
+                'pid': record['pid'],
+                'tid': record['tid'],
+                'args': record['args'],
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save(self, path, format="json"):
+        """
+        Guarda la traza en disco
+
+        Args:
+            path: ruta del archivo
+            format: 'json' (spans + resumen) o 'chrome' (Trace Event Format)
+
+        Raises:
+            ValueError: Si el formato no existe
+        """
+        if format == "json":
+            data = self.to_dict()
+        elif format == "chrome":
+            data = self.to_chrome_trace()
+        else:
+            raise ValueError(f"Formato desconocido: {format}. Opciones: json, chrome")
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+
+
+# Tracer activo del proceso; por defecto uno desactivado
+NULL_TRACER = Tracer(enabled=False)
+_active_tracer = NULL_TRACER
+
+
+def get_tracer():
+    """Devuelve el Tracer activo (NULL_TRACER si no hay traza en curso)"""
+    return _active_tracer
+
+
+@contextmanager
+def tracing(tracer=None):
+    """
+    Activa un Tracer durante un bloque
+
+    Args:
+        tracer: Tracer a activar (None = crear uno nuevo)
+
+    Yields:
+        el Tracer activo
+    """
+    global _active_tracer
+    if tracer is None:
+        tracer = Tracer()
+    previous = _active_tracer
+    _active_tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _active_tracer = previous
+
+
+def traced_call(function, args):
+    """
+    Ejecuta una funcion worker midiendo su intervalo
+
+    Se usa con functools.partial en Pool.map para que cada tarea devuelva
+    su resultado junto con (pid, tid, start, end) medidos en el worker.
+    """
+    start = time.perf_counter()
+    result = function(args)
+    end = time.perf_counter()
+    return result, (os.getpid(), threading.get_native_id(), start, end)
+
+
+def print_summary(tracer):
+    """Imprime el resumen de una traza como tabla"""
+    print(f"\n{'ETAPA':<20} {'LLAMADAS':>9} {'TOTAL (seg)':>12} "
+          f"{'MEDIA (seg)':>12} {'MAX (seg)':>10} {'BYTES':>12}")
+    print("-" * 80)
+    for name, stats in tracer.summary().items():
+        print(f"{name:<20} {stats['count']:>9} {stats['total_s']:>12.4f} "
+              f"{stats['mean_s']:>12.4f} {stats['max_s']:>10.4f} {format_bytes(stats['bytes']):>12}")
+    print("-" * 80)
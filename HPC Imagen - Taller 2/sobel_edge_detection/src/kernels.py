@@ -0,0 +1,229 @@
+"""
+Registro de operadores de gradiente (Sobel 3x3 y 5x5, Scharr, Prewitt)
+y motor que calcula varios operadores en una sola pasada por bandas
+"""
+import numpy as np
+
+# Manejar imports relativos y absolutos
+try:
+    from .utils import Timer, normalize_image
+    from .sobel_sequential import SOBEL_SMOOTH, SOBEL_DIFF
+except ImportError:
+    from utils import Timer, normalize_image
+    from sobel_sequential import SOBEL_SMOOTH, SOBEL_DIFF
+
+
+class GradientKernel:
+    """
+    Operador de gradiente separable
+
+    Kx = smooth^T * diff (suavizado vertical, derivada horizontal)
+    Ky = diff^T * smooth (derivada vertical, suavizado horizontal)
+    """
+    def __init__(self, name, smooth, diff):
+        """
+        Args:
+            name: nombre del operador
+            smooth: coeficientes 1-D de suavizado (longitud impar)
+            diff: coeficientes 1-D de derivada (misma longitud que smooth)
+        """
+        smooth = np.asarray(smooth, dtype=np.float32)
+        diff = np.asarray(diff, dtype=np.float32)
+
+        if smooth.ndim != 1 or smooth.shape != diff.shape or smooth.size % 2 == 0:
+            raise ValueError(f"smooth y diff deben ser 1-D, de igual longitud impar. "
+                             f"Recibido: {smooth.shape} y {diff.shape}")
+
+        self.name = name
+        self.smooth = smooth
+        self.diff = diff
+        self.radius = smooth.size // 2
+
+    @property
+    def kx(self):
+        """Kernel 2-D del gradiente horizontal"""
+        return np.outer(self.smooth, self.diff)
+
+    @property
+    def ky(self):
+        """Kernel 2-D del gradiente vertical"""
+        return np.outer(self.diff, self.smooth)
+
+
+KERNELS = {}
+
+
+def register_kernel(name, smooth, diff):
+    """
+    Agrega (o reemplaza) un operador en el registro
+
+    Returns:
+        GradientKernel registrado
+    """
+    kernel = GradientKernel(name, smooth, diff)
+    KERNELS[name] = kernel
+    return kernel
+
+
+def get_kernel(name):
+    """
+    Busca un operador por nombre
+
+    Raises:
+        ValueError: Si el operador no esta registrado
+    """
+    if name not in KERNELS:
+        raise ValueError(f"Kernel desconocido: {name}. Opciones: {', '.join(KERNELS)}")
+    return KERNELS[name]
+
+
+register_kernel("sobel3", SOBEL_SMOOTH, SOBEL_DIFF)
+register_kernel("scharr", [3, 10, 3], [-1, 0, 1])
+register_kernel("prewitt", [1, 1, 1], [-1, 0, 1])
+register_kernel("sobel5", [1, 4, 6, 4, 1], [-1, -2, 0, 2, 1])
+
+
+def _correlate_1d(src, taps, axis):
+    """
+    Correlacion 'valid' 1-D a lo largo de un eje con slices desplazados
+
+    Args:
+        src: numpy array float32 (h, w)
+        taps: coeficientes 1-D
+        axis: 0 (vertical) o 1 (horizontal)
+
+    Returns:
+        numpy array float32 con len(taps)-1 filas o columnas menos
+    """
+    size = src.shape[axis] - taps.size + 1
+    result = None
+    for k, weight in enumerate(taps):
+        if weight == 0:
+            continue
+        shifted = src[k:k + size] if axis == 0 else src[:, k:k + size]
+        if result is None:
+            result = weight * shifted
+        else:
+            result += weight * shifted
+    return result
+
+
+def compute_gradients(gray_image, kernels=("sobel3",), band_rows=32):
+    """
+    Calcula la magnitud del gradiente de varios operadores en una pasada
+
+    La imagen se recorre por bandas de filas. Cada banda (con el halo del
+    operador mas grande) se lee y convierte a float32 una sola vez y la
+    comparten todos los operadores. Ademas, los operadores con la misma
+    derivada (Sobel 3x3, Scharr y Prewitt usan [-1, 0, 1]) comparten las
+    derivadas horizontal y vertical de la banda; cada uno solo aplica su
+    propio suavizado.
+
+    Como en apply_sobel_sequential, los pixeles a menos de radius del
+    borde (1 para 3x3, 2 para 5x5) quedan en cero.
+
+    Args:
+        gray_image: numpy array (height, width) en escala de grises
+        kernels: nombres de operadores registrados en KERNELS
+        band_rows: filas por banda
+
+    Returns:
+        dict nombre -> numpy array float32 (height, width) con magnitudes
+
+    Raises:
+        ValueError: Si un operador no existe, band_rows < 1 o la imagen
+                    es mas pequeña que el operador mas grande
+    """
+    specs = [get_kernel(name) for name in kernels]
+    if not specs:
+        raise ValueError("Se necesita al menos un kernel")
+
+    if band_rows < 1:
+        raise ValueError(f"band_rows debe ser positivo. Recibido: {band_rows}")
+
+    height, width = gray_image.shape
+    max_radius = max(spec.radius for spec in specs)
+    min_size = 2 * max_radius + 1
+
+    if height < min_size or width < min_size:
+        raise ValueError(f"Imagen muy pequeña ({height}x{width}). "
+                         f"Minimo: {min_size}x{min_size}")
+
+    # Agrupar por derivada: cada grupo calcula sus derivadas una vez por banda
+    groups = {}
+    for spec in specs:
+        key = spec.diff.tobytes()
+        groups.setdefault(key, (spec.diff, spec.radius, []))[2].append(spec)
+
+    results = {spec.name: np.zeros((height, width), dtype=np.float32) for spec in specs}
+
+    for band_start in range(0, height, band_rows):
+        band_end = min(band_start + band_rows, height)
+        read_start = max(0, band_start - max_radius)
+        read_end = min(height, band_end + max_radius)
+
+        band = gray_image[read_start:read_end].astype(np.float32)
+
+        for diff, radius, members in groups.values():
+            first = max(band_start, radius)
+            last = min(band_end, height - radius)
+            if last <= first:
+                continue
+
+            rows = band[first - radius - read_start:last + radius - read_start]
+            dx = _correlate_1d(rows, diff, axis=1)
+            dy = _correlate_1d(rows, diff, axis=0)
+
+            for spec in members:
+                gx = _correlate_1d(dx, spec.smooth, axis=0)
+                gy = _correlate_1d(dy, spec.smooth, axis=1)
+                np.hypot(gx, gy, out=results[spec.name][first:last, radius:width - radius])
+
+    return results
+
+
+def edge_detection_multi_kernel(image_path, output_pattern, kernels, band_rows=32):
+    """
+    Pipeline que guarda los bordes de varios operadores de una imagen
+
+    Args:
+        image_path: Ruta de imagen de entrada
+        output_pattern: ruta de salida con {kernel}, por ejemplo
+                        'images/output/pikachu_{kernel}.jpg'
+        kernels: nombres de operadores
+        band_rows: filas por banda
+
+    Returns:
+        float: Tiempo de ejecucion en segundos
+    """
+    try:
+        from .utils import load_image, rgb_to_grayscale, save_image
+    except ImportError:
+        from utils import load_image, rgb_to_grayscale, save_image
+
+    print("\n" + "="*60)
+    print("DETECCION DE BORDES - VARIOS OPERADORES EN UNA PASADA")
+    print(f"Operadores: {', '.join(kernels)} | Filas por banda: {band_rows}")
+    print("="*60)
+
+    print(f"\nCargando imagen: {image_path}")
+    rgb_image = load_image(image_path)
+    gray_image = rgb_to_grayscale(rgb_image)
+    print(f"Dimensiones: {gray_image.shape[0]}x{gray_image.shape[1]} pixeles")
+
+    print("\nCalculando gradientes...")
+    with Timer("Operadores en una pasada") as timer:
+        results = compute_gradients(gray_image, kernels, band_rows)
+
+    print("\nNormalizando y guardando resultados...")
+    for name, edges in results.items():
+        output_path = output_pattern.format(kernel=name)
+        save_image(normalize_image(edges), output_path)
+        print(f"  {name}: {output_path}")
+
+    print("\n" + "="*60)
+    print(f"PROCESAMIENTO COMPLETADO")
+    print(f"Tiempo: {timer.elapsed:.4f} segundos")
+    print("="*60 + "\n")
+
+    return timer.elapsed
@@ -0,0 +1,232 @@
+"""
+Piramide de imagenes para deteccion de bordes de grueso a fino
+Los niveles reducidos y sus bordes se calculan solo cuando se piden y
+quedan guardados para las peticiones siguientes
+"""
+import threading
+import numpy as np
+from PIL import Image
+
+# Manejar imports relativos y absolutos
+try:
+    from .utils import load_image, rgb_to_grayscale, normalize_image, DECODE_MODES
+    from .sobel_sequential import apply_sobel_sequential, ENGINES
+except ImportError:
+    from utils import load_image, rgb_to_grayscale, normalize_image, DECODE_MODES
+    from sobel_sequential import apply_sobel_sequential, ENGINES
+
+
+def downsample_2x(gray_image):
+    """
+    Reduce una imagen a la mitad promediando bloques de 2x2
+
+    Si alguna dimension es impar se descarta la ultima fila o columna.
+
+    Args:
+        gray_image: numpy array uint8 (height, width)
+
+    Returns:
+        numpy array uint8 (height // 2, width // 2)
+    """
+    height, width = gray_image.shape
+    even = gray_image[:height - height % 2, :width - width % 2].astype(np.uint16)
+
+    total = even[0::2, 0::2] + even[1::2, 0::2]
+    total += even[0::2, 1::2]
+    total += even[1::2, 1::2]
+    total += 2
+    total >>= 2
+    return total.astype(np.uint8)
+
+
+class ImagePyramid:
+    """
+    Piramide perezosa de una imagen: nivel 0 = resolucion completa,
+    nivel k = nivel k-1 reducido a la mitad
+
+    Nada se decodifica al crearla; las dimensiones de cada nivel salen de
+    la cabecera del archivo. La imagen se decodifica y se pasa a grises
+    una sola vez, la primera vez que se necesita cualquier nivel, y cada
+    nivel en grises y cada mapa de bordes se guarda tras calcularse. Asi
+    una vista previa a baja resolucion seguida de la resolucion completa
+    no repite la decodificacion ni la conversion a grises.
+
+    Uso:
+        pyramid = ImagePyramid("images/input/foto.jpg", engine="separable")
+        preview = pyramid.edges(pyramid.level_for(256))   # miniatura
+        full = pyramid.edges(0)                           # a demanda
+    """
+    def __init__(self, source, engine="separable", min_size=8, decode_mode="RGB"):
+        """
+        Args:
+            source: ruta de la imagen o numpy array RGB (h, w, 3) / grises (h, w)
+            engine: motor de calculo de Sobel
+            min_size: lado minimo del nivel mas reducido
+            decode_mode: 'RGB' (decodificar y convertir con rgb_to_grayscale)
+                         o 'L' (decodificar directamente a grises)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Motor desconocido: {engine}. Opciones: {', '.join(ENGINES)}")
+
+        if decode_mode not in DECODE_MODES:
+            raise ValueError(f"Modo desconocido: {decode_mode}. Opciones: {', '.join(DECODE_MODES)}")
+
+        self.engine = engine
+        self.decode_mode = decode_mode
+        self._source = source
+        self._gray = {}
+        self._edges = {}
+        self._lock = threading.Lock()
+
+        if isinstance(source, np.ndarray):
+            height, width = source.shape[:2]
+        else:
+            with Image.open(source) as img:
+                width, height = img.size
+
+        if height < 3 or width < 3:
+            raise ValueError(f"Imagen muy pequeña ({height}x{width}). Minimo: 3x3")
+
+        self.shapes = [(height, width)]
+        while min(height, width) // 2 >= max(3, min_size):
+            height, width = height // 2, width // 2
+            self.shapes.append((height, width))
+
+    @property
+    def num_levels(self):
+        """Numero de niveles de la piramide"""
+        return len(self.shapes)
+
+    def level_for(self, max_side):
+        """
+        Nivel mas fino cuyo lado mayor no supera max_side
+
+        Returns:
+            indice de nivel (el mas reducido si ninguno cabe)
+        """
+        for level, shape in enumerate(self.shapes):
+            if max(shape) <= max_side:
+                return level
+        return self.num_levels - 1
+
+    def _check_level(self, level):
+        if not 0 <= level < self.num_levels:
+            raise ValueError(f"Nivel fuera de rango: {level}. Niveles: 0..{self.num_levels - 1}")
+
+    def _load_gray(self):
+        """Decodifica la fuente y la convierte a grises uint8 (nivel 0)"""
+        source = self._source
+        if not isinstance(source, np.ndarray):
+            source = load_image(source, mode=self.decode_mode)
+        if source.ndim == 3:
+            return rgb_to_grayscale(source)
+        return source.astype(np.uint8, copy=False)
+
+    def gray(self, level=0):
+        """
+        Imagen en grises de un nivel, calculandola si hace falta
+
+        Returns:
+            numpy array uint8 con la forma de shapes[level]
+        """
+        self._check_level(level)
+        with self._lock:
+            if 0 not in self._gray:
+                self._gray[0] = self._load_gray()
+                # La fuente ya no hace falta una vez decodificada
+                self._source = None
+
+            finest = max(k for k in self._gray if k <= level)
+            for k in range(finest + 1, level + 1):
+                self._gray[k] = downsample_2x(self._gray[k - 1])
+
+            return self._gray[level]
+
+    def edges(self, level=0):
+        """
+        Magnitudes Sobel float32 de un nivel, calculandolas si hace falta
+
+        Returns:
+            numpy array float32 con la forma de shapes[level]
+        """
+        self._check_level(level)
+        with self._lock:
+            cached = self._edges.get(level)
+        if cached is not None:
+            return cached
+
+        edges = apply_sobel_sequential(self.gray(level), self.engine)
+        with self._lock:
+            return self._edges.setdefault(level, edges)
+
+    def edges_normalized(self, level=0):
+        """Bordes de un nivel normalizados a uint8"""
+        return normalize_image(self.edges(level))
+
+    def cached_levels(self):
+        """
+        Niveles ya calculados
+
+        Returns:
+            dict con listas 'gray' y 'edges' de niveles guardados
+        """
+        with self._lock:
+            return {'gray': sorted(self._gray), 'edges': sorted(self._edges)}
+
+    def drop_edges(self, levels=None):
+        """Libera los bordes guardados (de todos los niveles o de los indicados)"""
+        with self._lock:
+            for level in list(self._edges if levels is None else levels):
+                self._edges.pop(level, None)
+
+
+def sobel_edge_detection_pyramid(image_path, output_pattern, max_side=256, engine="separable",
+                                 decode_mode="RGB"):
+    """
+    Pipeline de grueso a fino: primero la vista previa, despues la
+    resolucion completa reutilizando la imagen ya decodificada
+
+    Args:
+        image_path: Ruta de imagen de entrada
+        output_pattern: ruta de salida con {level}, por ejemplo
+                        'images/output/pikachu_edges_level{level}.jpg'
+        max_side: lado mayor maximo de la vista previa
+        engine: motor de calculo de Sobel
+        decode_mode: 'RGB' o 'L' (decodificar directamente a grises)
+
+    Returns:
+        dict con los tiempos 'preview' y 'full' en segundos
+    """
+    try:
+        from .utils import save_image, Timer
+    except ImportError:
+        from utils import save_image, Timer
+
+    print("\n" + "="*60)
+    print("SOBEL EDGE DETECTION - PIRAMIDE (GRUESO A FINO)")
+    print(f"Motor: {engine} | Vista previa: lado <= {max_side} | Decodificacion: {decode_mode}")
+    print("="*60)
+
+    pyramid = ImagePyramid(image_path, engine=engine, decode_mode=decode_mode)
+    level = pyramid.level_for(max_side)
+    height, width = pyramid.shapes[level]
+    print(f"\nImagen: {pyramid.shapes[0][0]}x{pyramid.shapes[0][1]} pixeles, "
+          f"{pyramid.num_levels} niveles")
+
+    print(f"\nVista previa (nivel {level}, {height}x{width})...")
+    with Timer("Vista previa (decodificacion + grises + bordes)") as preview_timer:
+        preview = pyramid.edges_normalized(level)
+    save_image(preview, output_pattern.format(level=level))
+
+    print("\nResolucion completa (nivel 0)...")
+    with Timer("Resolucion completa (solo bordes)") as full_timer:
+        full = pyramid.edges_normalized(0)
+    save_image(full, output_pattern.format(level=0))
+
+    print("\n" + "="*60)
+    print(f"PROCESAMIENTO COMPLETADO")
+    print(f"Vista previa: {preview_timer.elapsed:.4f} s | "
+          f"Completa: {full_timer.elapsed:.4f} s")
+    print("="*60 + "\n")
+
+    return {'preview': preview_timer.elapsed, 'full': full_timer.elapsed}
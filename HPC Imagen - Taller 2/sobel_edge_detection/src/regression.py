@@ -0,0 +1,295 @@
+"""
+Pruebas de regresion de los motores Sobel contra referencias doradas
+Las referencias se calculan una vez con el motor 'loops' (Python puro) y se
+guardan comprimidas (.npz) junto con su imagen de entrada; despues cada
+motor rapido se compara contra ellas en paralelo
+"""
+import os
+import glob
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# Manejar imports relativos y absolutos
+try:
+    from .utils import load_image, rgb_to_grayscale
+    from .sobel_sequential import apply_sobel_sequential
+    from .sobel_parallel import apply_sobel_parallel, apply_sobel_threaded
+    from .sobel_numba import compile_numba, NUMBA_AVAILABLE
+    from .kernels import compute_gradients
+except ImportError:
+    from utils import load_image, rgb_to_grayscale
+    from sobel_sequential import apply_sobel_sequential
+    from sobel_parallel import apply_sobel_parallel, apply_sobel_threaded
+    from sobel_numba import compile_numba, NUMBA_AVAILABLE
+    from kernels import compute_gradients
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "tests", "fixtures", "golden")
+
+# Diferencia absoluta maxima admitida frente a la referencia; la misma
+# tolerancia que usa validate_results para secuencial vs paralelo
+TOLERANCE = 1e-3
+
+# Casos de referencia: nombre -> (forma, origen). El origen es 'noise'
+# (ruido uniforme), 'pattern' (figuras geometricas, que comprimen bien en
+# los casos grandes) o la ruta de una imagen
+GOLDEN_CASES = {
+    "min_3x3": ((3, 3), "noise"),
+    "odd_5x7": ((5, 7), "noise"),
+    "odd_17x31": ((17, 31), "noise"),
+    "odd_101x99": ((101, 99), "noise"),
+    "strip_3x257": ((3, 257), "noise"),
+    "strip_257x3": ((257, 3), "noise"),
+    "prime_61x251": ((61, 251), "noise"),
+    "pikachu": (None, "images/input/pikachu.jpg"),
+    "big_1536x2048": ((1536, 2048), "pattern"),
+}
+
+# Motores que se validan: nombre -> funcion(gray_image) -> magnitudes
+REGRESSION_ENGINES = {
+    "vectorized": lambda gray: apply_sobel_sequential(gray, "vectorized"),
+    "separable": lambda gray: apply_sobel_sequential(gray, "separable"),
+    "parallel_strips": lambda gray: apply_sobel_parallel(gray, 2, "separable"),
+    "parallel_tiles": lambda gray: apply_sobel_parallel(gray, 2, "separable",
+                                                        schedule="tiles"),
+    "threads": lambda gray: apply_sobel_threaded(gray, 2, "separable"),
+    "multi_kernel": lambda gray: compute_gradients(gray, ("sobel3",))["sobel3"],
+}
+
+if NUMBA_AVAILABLE:
+    REGRESSION_ENGINES["numba"] = lambda gray: apply_sobel_sequential(gray, "numba")
+
+# Motores que crean un Pool de procesos: se ejecutan antes de arrancar los
+# hilos de los demas motores, porque hacer fork mientras otros hilos
+# trabajan puede dejar al hijo con locks tomados (malloc, NumPy) y bloquearlo
+PROCESS_ENGINES = ("parallel_strips", "parallel_tiles")
+
+
+def case_image(name, seed=0):
+    """
+    Imagen de entrada uint8 de un caso de GOLDEN_CASES
+
+    Args:
+        name: nombre del caso
+        seed: semilla del ruido
+
+    Returns:
+        numpy array uint8 (height, width)
+
+    Raises:
+        ValueError: Si el caso no existe
+    """
+    if name not in GOLDEN_CASES:
+        raise ValueError(f"Caso desconocido: {name}. Opciones: {', '.join(GOLDEN_CASES)}")
+
+    shape, source = GOLDEN_CASES[name]
+
+    if source == "noise":
+        rng = np.random.default_rng(seed)
+        return rng.integers(0, 256, shape, dtype=np.uint8)
+
+    if source == "pattern":
+        # Bloques constantes y discos con una rampa dentro: bordes rectos,
+        # curvos (todas las orientaciones) y zonas de gradiente constante
+        rows, cols = np.indices(shape)
+        blocks = ((rows // 96) * 37 + (cols // 128) * 53) % 256
+        ramp = (cols * 255) // shape[1]
+        disks = np.hypot(rows % 384 - 192, cols % 512 - 256) < 150
+        return np.where(disks, ramp, blocks).astype(np.uint8)
+
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), source)
+    return rgb_to_grayscale(load_image(path))
+
+
+def fixture_path(name, fixtures_dir=FIXTURES_DIR):
+    """Ruta del archivo .npz de un caso"""
+    return os.path.join(fixtures_dir, f"{name}.npz")
+
+
+def generate_fixtures(fixtures_dir=FIXTURES_DIR, names=None, overwrite=False, verbose=True):
+    """
+    Calcula y guarda las referencias doradas con el motor 'loops'
+
+    Cada archivo guarda la imagen de entrada ('gray') y la referencia
+    ('edges') con np.savez_compressed. Los casos ya generados se saltan
+    salvo con overwrite=True.
+
+    Args:
+        fixtures_dir: directorio de las referencias
+        names: casos a generar (None = todos los de GOLDEN_CASES)
+        overwrite: regenerar aunque el archivo exista
+        verbose: imprimir el progreso
+
+    Returns:
+        lista de rutas generadas
+    """
+    os.makedirs(fixtures_dir, exist_ok=True)
+    generated = []
+
+    for name in names or GOLDEN_CASES:
+        path = fixture_path(name, fixtures_dir)
+        if os.path.exists(path) and not overwrite:
+            continue
+
+        gray_image = case_image(name)
+        start = time.perf_counter()
+        edges = apply_sobel_sequential(gray_image, "loops")
+        elapsed = time.perf_counter() - start
+
+        np.savez_compressed(path, gray=gray_image, edges=edges)
+        generated.append(path)
+        if verbose:
+            print(f"   {name}: {gray_image.shape[0]}x{gray_image.shape[1]} "
+                  f"({elapsed:.2f} s) -> {path}")
+
+    return generated
+
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR, names=None):
+    """
+    Carga las referencias doradas guardadas
+
+    Args:
+        fixtures_dir: directorio de las referencias
+        names: casos a cargar (None = todos los archivos .npz del directorio)
+
+    Returns:
+        dict nombre -> (gray, edges)
+
+    Raises:
+        FileNotFoundError: Si falta alguno de los casos pedidos
+    """
+    if names is None:
+        paths = sorted(glob.glob(os.path.join(fixtures_dir, "*.npz")))
+    else:
+        paths = [fixture_path(name, fixtures_dir) for name in names]
+
+    fixtures = {}
+    for path in paths:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No se encontro la referencia: {path} "
+                                    f"(generarla con validate_results.py --regenerate)")
+        with np.load(path) as data:
+            name = os.path.splitext(os.path.basename(path))[0]
+            fixtures[name] = (data["gray"], data["edges"])
+    return fixtures
+
+
+def check_engine(engine, fixtures, tolerance=TOLERANCE):
+    """
+    Compara un motor contra todas las referencias
+
+    Args:
+        engine: nombre en REGRESSION_ENGINES
+        fixtures: dict de load_fixtures
+        tolerance: diferencia absoluta maxima admitida
+
+    Returns:
+        dict con engine, cases, max_error, worst_case, failed (casos fuera
+        de tolerancia), seconds, megapixels_per_s, ok y error (excepcion)
+    """
+    function = REGRESSION_ENGINES[engine]
+    result = {
+        'engine': engine, 'cases': 0, 'max_error': 0.0, 'worst_case': None,
+        'failed': [], 'seconds': 0.0, 'megapixels_per_s': 0.0, 'ok': False, 'error': None,
+    }
+    pixels = 0
+
+    try:
+        for name, (gray_image, golden) in fixtures.items():
+            start = time.perf_counter()
+            edges = function(gray_image)
+            result['seconds'] += time.perf_counter() - start
+            pixels += gray_image.size
+
+            if edges.shape != golden.shape:
+                error = float("inf")
+            else:
+                error = float(np.max(np.abs(edges.astype(np.float64) - golden)))
+
+            result['cases'] += 1
+            if error > tolerance:
+                result['failed'].append(name)
+            if result['worst_case'] is None or error > result['max_error']:
+                result['max_error'] = error
+                result['worst_case'] = name
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+
+    if result['seconds'] > 0:
+        result['megapixels_per_s'] = pixels / result['seconds'] / 1e6
+    result['ok'] = not result['failed']
+    return result
+
+
+def run_regression(engines=None, fixtures=None, jobs=None, tolerance=TOLERANCE):
+    """
+    Valida varios motores contra las referencias, en paralelo
+
+    Los motores de PROCESS_ENGINES se ejecutan primero, uno a uno y sin
+    otros hilos vivos; despues los de hilos y de NumPy se reparten entre un
+    ThreadPoolExecutor (NumPy libera el GIL). Como los motores comparten la CPU, el
+    throughput es comparable entre motores de la misma corrida pero no es
+    un benchmark: para medir con precision usar jobs=1 o benchmark.py.
+
+    Args:
+        engines: nombres de REGRESSION_ENGINES (None = todos)
+        fixtures: dict de load_fixtures (None = cargar todas)
+        jobs: hilos para los motores que no usan procesos (None = uno por motor)
+        tolerance: diferencia absoluta maxima admitida
+
+    Returns:
+        lista de dicts de check_engine, en el orden de engines
+
+    Raises:
+        ValueError: Si un motor no existe
+    """
+    engines = list(engines or REGRESSION_ENGINES)
+    for engine in engines:
+        if engine not in REGRESSION_ENGINES:
+            raise ValueError(f"Motor desconocido: {engine}. "
+                             f"Opciones: {', '.join(REGRESSION_ENGINES)}")
+
+    if fixtures is None:
+        fixtures = load_fixtures()
+
+    if "numba" in engines:
+        # Compilar (o cargar de la cache) antes de medir
+        compile_numba()
+
+    threaded = [engine for engine in engines if engine not in PROCESS_ENGINES]
+    in_process = [engine for engine in engines if engine in PROCESS_ENGINES]
+    results = {}
+
+    # Los Pool de procesos hacen fork: antes de que exista ningun hilo de trabajo
+    for engine in in_process:
+        results[engine] = check_engine(engine, fixtures, tolerance)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs or len(threaded))) as executor:
+        futures = {engine: executor.submit(check_engine, engine, fixtures, tolerance)
+                   for engine in threaded}
+        for engine, future in futures.items():
+            results[engine] = future.result()
+
+    return [results[engine] for engine in engines]
+
+
+def print_report(results, fixtures, tolerance=TOLERANCE):
+    """Imprime el reporte por motor de run_regression"""
+    pixels = sum(gray.size for gray, _ in fixtures.values())
+    print(f"\n   Casos: {len(fixtures)} ({', '.join(fixtures)})")
+    print(f"   Pixeles por motor: {pixels:,} | Tolerancia: {tolerance:g}\n")
+    print(f"   {'MOTOR':<18} {'ERROR MAX':>12} {'PEOR CASO':>16} {'MP/s':>9}  ESTADO")
+    print("   " + "-" * 66)
+    for result in results:
+        if result['error']:
+            print(f"   {result['engine']:<18} {'-':>12} {'-':>16} {'-':>9}  "
+                  f"[ERROR] {result['error']}")
+            continue
+        status = "[OK]" if result['ok'] else f"[FALLA] {', '.join(result['failed'])}"
+        worst = result['worst_case'] if result['max_error'] > 0 else "-"
+        print(f"   {result['engine']:<18} {result['max_error']:>12.2e} "
+              f"{worst:>16} {result['megapixels_per_s']:>9.2f}  {status}")
+    print("   " + "-" * 66)
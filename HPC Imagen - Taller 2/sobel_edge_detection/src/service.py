@@ -0,0 +1,588 @@
+"""
+Servicio HTTP asincrono de deteccion de bordes
+Recibe imagenes por POST, agrupa las peticiones concurrentes del mismo tamaño
+en una sola llamada al pool de Sobel y expone metricas de latencia.
+Solo usa la biblioteca estandar (asyncio) ademas de NumPy y Pillow.
+"""
+import io
+import json
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import cpu_count
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+from PIL import Image
+
+# Manejar imports relativos y absolutos
+try:
+    from .utils import load_image, rgb_to_grayscale, normalize_image, DECODE_MODES
+    from .sobel_sequential import ENGINES
+    from .sobel_parallel import SobelExecutor, apply_sobel_threaded, BACKENDS
+except ImportError:
+    from utils import load_image, rgb_to_grayscale, normalize_image, DECODE_MODES
+    from sobel_sequential import ENGINES
+    from sobel_parallel import SobelExecutor, apply_sobel_threaded, BACKENDS
+
+OUTPUT_FORMATS = ("png", "npy")
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+# Latencias que se guardan para los percentiles de /metrics
+_LATENCY_WINDOW = 2048
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """
+    Percentiles de una lista de valores
+
+    Returns:
+        dict 'p50', 'p90'... -> valor (0.0 si no hay valores)
+    """
+    if not values:
+        return {f"p{point}": 0.0 for point in points}
+    result = np.percentile(np.asarray(values, dtype=np.float64), points)
+    return {f"p{point}": float(value) for point, value in zip(points, result)}
+
+
+def stack_sobel(images, compute):
+    """
+    Aplica Sobel a varias imagenes del mismo tamaño con una sola llamada
+
+    Las imagenes se apilan verticalmente en una imagen alta. Cada fila
+    interior de una imagen solo usa sus filas vecinas, que son de la misma
+    imagen; las unicas filas que mezclan dos imagenes son la primera y la
+    ultima de cada una, que forman parte del marco y se ponen en cero.
+    El resultado es identico a procesarlas por separado.
+
+    Args:
+        images: lista de numpy arrays (height, width) con la misma forma
+        compute: funcion(gray_image) -> magnitudes float32
+
+    Returns:
+        lista de numpy arrays float32 (height, width), en el mismo orden
+    """
+    height = images[0].shape[0]
+    edges = compute(np.concatenate(images) if len(images) > 1 else images[0])
+
+    results = []
+    for index in range(len(images)):
+        block = edges[index * height:(index + 1) * height]
+        block[0, :] = 0
+        block[-1, :] = 0
+        results.append(block)
+    return results
+
+
+class SobelService:
+    """
+    Servicio HTTP de deteccion de bordes sobre asyncio
+
+    Endpoints:
+        POST /edges[?format=png|npy]  cuerpo = archivo de imagen; responde
+                                      los bordes normalizados en PNG o las
+                                      magnitudes float32 en .npy
+        GET  /metrics                 contadores y percentiles de latencia (JSON)
+        GET  /health                  'ok'
+
+    La decodificacion y codificacion corren en un ThreadPoolExecutor
+    (Pillow libera el GIL) y el calculo en un unico hilo que alimenta el
+    pool de Sobel, asi que el bucle de eventos nunca se bloquea. Mientras
+    un lote se calcula, las peticiones nuevas del mismo tamaño se acumulan
+    y salen juntas en el siguiente (hasta max_batch, o tras batch_window
+    segundos). Con mas de max_pending peticiones en curso las nuevas se
+    rechazan con 503 y Retry-After en lugar de encolarse sin limite.
+
+    Uso:
+        service = SobelService(engine="separable", workers=4)
+        asyncio.run(service.serve_forever("127.0.0.1", 8080))
+    """
+    def __init__(self, engine="separable", workers=None, backend="processes",
+                 max_batch=8, batch_window=0.005, max_pending=64,
+                 max_body_bytes=32 * 1024**2, io_threads=4, decode_mode="RGB"):
+        """
+        Args:
+            engine: motor de calculo de Sobel
+            workers: procesos (o hilos) del pool de calculo (None = todos los cores)
+            backend: 'processes' (SobelExecutor) o 'threads' (apply_sobel_threaded)
+            max_batch: imagenes maximas por llamada al pool
+            batch_window: segundos que espera un lote incompleto
+            max_pending: peticiones en curso a partir de las cuales se responde 503
+            max_body_bytes: tamaño maximo del cuerpo (413 si se supera)
+            io_threads: hilos de decodificacion y codificacion
+            decode_mode: 'RGB' o 'L' (ver load_image)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Motor desconocido: {engine}. Opciones: {', '.join(ENGINES)}")
+
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconocido: {backend}. Opciones: {', '.join(BACKENDS)}")
+
+        if decode_mode not in DECODE_MODES:
+            raise ValueError(f"Modo desconocido: {decode_mode}. Opciones: {', '.join(DECODE_MODES)}")
+
+        for name, value in (("max_batch", max_batch), ("max_pending", max_pending),
+                            ("io_threads", io_threads)):
+            if value < 1:
+                raise ValueError(f"{name} debe ser positivo. Recibido: {value}")
+
+        self.engine = engine
+        self.workers = workers if workers is not None else cpu_count()
+        self.backend = backend
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+        self.max_body_bytes = max_body_bytes
+        self.io_threads = io_threads
+        self.decode_mode = decode_mode
+
+        self.host = None
+        self.port = None
+        self._server = None
+        self._executor = None
+        self._io_pool = None
+        self._compute_pool = None
+        self._pending = {}
+        self._timers = {}
+        # El loop solo guarda referencias debiles a las tareas: sin este
+        # conjunto un lote en curso podria recolectarse sin responder
+        self._tasks = set()
+        # Conexiones keep-alive esperando la siguiente peticion
+        self._idle_writers = set()
+        self._closing = False
+        self._in_flight = 0
+        self._started = None
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        self._counts = {'requests': 0, 'rejected': 0, 'batches': 0, 'images': 0}
+        self._statuses = {}
+        self._latencies = deque(maxlen=_LATENCY_WINDOW)
+        self._batch_times = deque(maxlen=_LATENCY_WINDOW)
+        self._max_batch_seen = 0
+
+    # --- ciclo de vida -------------------------------------------------
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """
+        Crea los pools y empieza a aceptar conexiones
+
+        Args:
+            host: direccion de escucha
+            port: puerto (0 = elegir uno libre; queda en self.port)
+        """
+        # El pool de procesos se crea antes que los hilos: hacer fork con
+        # otros hilos activos puede dejar locks tomados en los hijos
+        if self.backend == "processes":
+            self._executor = SobelExecutor(self.workers, self.engine)
+        self._compute_pool = ThreadPoolExecutor(max_workers=1,
+                                                thread_name_prefix="sobel-compute")
+        self._io_pool = ThreadPoolExecutor(max_workers=self.io_threads,
+                                           thread_name_prefix="sobel-io")
+
+        self._closing = False
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        self._started = time.perf_counter()
+
+    async def close(self):
+        """
+        Deja de aceptar conexiones y libera los pools
+
+        Los lotes pendientes se mandan a calcular sin esperar su ventana y
+        se esperan todos los lotes en curso antes de cerrar los pools, asi
+        que ninguna peticion aceptada queda sin respuesta. Despues se cierran
+        las conexiones keep-alive inactivas; las que estaban atendiendo una
+        peticion responden con Connection: close y terminan solas. Solo
+        entonces se espera wait_closed(), que desde Python 3.12 espera a
+        todos los manejadores de conexion.
+        """
+        self._closing = True
+        if self._server is not None:
+            self._server.close()
+
+        for key in list(self._pending):
+            self._flush(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        for writer in list(self._idle_writers):
+            writer.close()
+        self._idle_writers.clear()
+
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+        for pool in (self._io_pool, self._compute_pool):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self._io_pool = self._compute_pool = None
+
+        if self._executor is not None:
+            self._executor.close()
+            self._executor = None
+
+    async def serve_forever(self, host="127.0.0.1", port=8080):
+        """Arranca el servicio y atiende hasta que se cancele"""
+        await self.start(host, port)
+        print(f"Servicio Sobel en http://{self.host}:{self.port} "
+              f"(motor {self.engine}, {self.backend}, {self.workers} workers, "
+              f"lotes de hasta {self.max_batch})")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    # --- calculo por lotes ---------------------------------------------
+
+    def _compute(self, gray_image):
+        """Llamada bloqueante al pool de Sobel (hilo de calculo)"""
+        if self._executor is not None:
+            return self._executor.apply(gray_image)
+        return apply_sobel_threaded(gray_image, self.workers, self.engine)
+
+    def _run_batch_blocking(self, images):
+        start = time.perf_counter()
+        results = stack_sobel(images, self._compute)
+        return results, time.perf_counter() - start
+
+    async def edges(self, gray_image):
+        """
+        Magnitudes Sobel de una imagen, agrupandola con otras del mismo tamaño
+
+        Args:
+            gray_image: numpy array (height, width) en escala de grises
+
+        Returns:
+            numpy array float32 (height, width)
+
+        Raises:
+            ValueError: Si la imagen es menor que 3x3
+            RuntimeError: Si el servicio se esta cerrando
+        """
+        if self._closing:
+            raise RuntimeError("El servicio se esta cerrando")
+
+        height, width = gray_image.shape
+        if height < 3 or width < 3:
+            raise ValueError(f"Imagen muy pequeña ({height}x{width}). Minimo: 3x3")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (gray_image.shape, gray_image.dtype.str)
+        batch = self._pending.setdefault(key, [])
+        batch.append((gray_image, future))
+
+        if len(batch) >= self.max_batch:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self.batch_window, self._flush, key)
+
+        return await future
+
+    def _flush(self, key):
+        """Saca el lote pendiente de un tamaño y lo manda a calcular"""
+        handle = self._timers.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch):
+        images = [image for image, _ in batch]
+        futures = [future for _, future in batch]
+        loop = asyncio.get_running_loop()
+
+        try:
+            results, elapsed = await loop.run_in_executor(
+                self._compute_pool, self._run_batch_blocking, images)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._counts['batches'] += 1
+        self._counts['images'] += len(images)
+        self._max_batch_seen = max(self._max_batch_seen, len(images))
+        self._batch_times.append(elapsed)
+
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    # --- decodificacion y codificacion ---------------------------------
+
+    def _decode(self, body):
+        image = load_image(io.BytesIO(body), mode=self.decode_mode)
+        return image if image.ndim == 2 else rgb_to_grayscale(image)
+
+    @staticmethod
+    def _encode(edges, output_format):
+        buffer = io.BytesIO()
+        if output_format == "npy":
+            np.save(buffer, edges)
+        else:
+            Image.fromarray(normalize_image(edges)).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    async def process(self, body, output_format="png"):
+        """
+        Pipeline completo de una peticion: decodificar, Sobel, codificar
+
+        Args:
+            body: bytes del archivo de imagen
+            output_format: 'png' o 'npy'
+
+        Returns:
+            bytes de la respuesta
+        """
+        loop = asyncio.get_running_loop()
+        gray_image = await loop.run_in_executor(self._io_pool, self._decode, body)
+        edges = await self.edges(gray_image)
+        return await loop.run_in_executor(self._io_pool, self._encode, edges, output_format)
+
+    # --- HTTP ----------------------------------------------------------
+
+    def metrics(self):
+        """
+        Contadores y percentiles de latencia (en milisegundos)
+
+        Returns:
+            dict serializable a JSON
+        """
+        latencies_ms = [value * 1e3 for value in self._latencies]
+        batch_ms = [value * 1e3 for value in self._batch_times]
+        batches = self._counts['batches']
+        return {
+            'uptime_s': time.perf_counter() - self._started if self._started else 0.0,
+            'engine': self.engine,
+            'backend': self.backend,
+            'workers': self.workers,
+            'requests': self._counts['requests'],
+            'rejected': self._counts['rejected'],
+            'in_flight': self._in_flight,
+            'statuses': {str(code): count for code, count in sorted(self._statuses.items())},
+            'batches': batches,
+            'images': self._counts['images'],
+            'batch_size_mean': self._counts['images'] / batches if batches else 0.0,
+            'batch_size_max': self._max_batch_seen,
+            'latency_ms': dict(percentiles(latencies_ms, (50, 90, 95, 99)),
+                               max=max(latencies_ms, default=0.0),
+                               samples=len(latencies_ms)),
+            'batch_compute_ms': percentiles(batch_ms),
+        }
+
+    async def _route(self, method, target, body):
+        """Devuelve (status, content_type, payload, headers extra)"""
+        url = urlsplit(target)
+
+        if url.path == "/health":
+            return 200, "text/plain", b"ok", {}
+
+        if url.path == "/metrics":
+            payload = json.dumps(self.metrics(), indent=1).encode()
+            return 200, "application/json", payload, {}
+
+        if url.path != "/edges":
+            return 404, "text/plain", b"not found", {}
+
+        if method != "POST":
+            return 405, "text/plain", b"use POST", {"Allow": "POST"}
+
+        output_format = parse_qs(url.query).get("format", ["png"])[0]
+        if output_format not in OUTPUT_FORMATS:
+            return 400, "text/plain", f"format: {', '.join(OUTPUT_FORMATS)}".encode(), {}
+
+        if self._closing or self._in_flight >= self.max_pending:
+            self._counts['rejected'] += 1
+            return 503, "text/plain", b"busy", {"Retry-After": "1"}
+
+        self._in_flight += 1
+        try:
+            payload = await self.process(body, output_format)
+        except (IOError, ValueError) as e:
+            return 400, "text/plain", str(e).encode(), {}
+        finally:
+            self._in_flight -= 1
+
+        content_type = "image/png" if output_format == "png" else "application/octet-stream"
+        return 200, content_type, payload, {}
+
+    async def _handle_connection(self, reader, writer):
+        """Atiende una conexion HTTP/1.1 (con keep-alive)"""
+        try:
+            while not self._closing:
+                self._idle_writers.add(writer)
+                try:
+                    request_line = await reader.readline()
+                finally:
+                    self._idle_writers.discard(writer)
+                if not request_line:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                start = time.perf_counter()
+                request = _parse_request(request_line, headers)
+                if request is None:
+                    # Sin una peticion valida no se sabe donde empieza la siguiente
+                    writer.write(_http_response(400, "text/plain", b"bad request", {},
+                                                keep_alive=False))
+                    self._statuses[400] = self._statuses.get(400, 0) + 1
+                    await writer.drain()
+                    break
+
+                method, target, version, length = request
+                keep_alive = (version == "HTTP/1.1" and not self._closing and
+                              headers.get("connection", "").lower() != "close")
+
+                if length > self.max_body_bytes:
+                    # El cuerpo no se lee, asi que la conexion no se puede reutilizar
+                    response = (413, "text/plain", b"payload too large", {})
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    self._counts['requests'] += 1
+                    try:
+                        response = await self._route(method, target, body)
+                    except Exception as e:
+                        response = (500, "text/plain", f"{type(e).__name__}: {e}".encode(), {})
+
+                status = response[0]
+                self._statuses[status] = self._statuses.get(status, 0) + 1
+                if target.startswith("/edges") and status == 200:
+                    self._latencies.append(time.perf_counter() - start)
+
+                writer.write(_http_response(*response, keep_alive=keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def _parse_request(request_line, headers):
+    """
+    Valida la linea de peticion y Content-Length
+
+    Returns:
+        (method, target, version, length), o None si la peticion es invalida
+    """
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3:
+        return None
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        return None
+    if length < 0:
+        return None
+
+    method, target, version = parts
+    return method, target, version, length
+
+
+def _http_response(status, content_type, payload, extra_headers, keep_alive=True):
+    """Serializa una respuesta HTTP/1.1"""
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+             f"Content-Type: {content_type}",
+             f"Content-Length: {len(payload)}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines += [f"{name}: {value}" for name, value in extra_headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload
+
+
+async def http_request(reader, writer, method, target, body=b"", host="localhost"):
+    """
+    Envia una peticion por una conexion abierta y lee la respuesta
+
+    Returns:
+        tupla (status, headers, body)
+    """
+    head = (f"{method} {target} HTTP/1.1\r\nHost: {host}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("El servidor cerro la conexion")
+    status = int(status_line.split()[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    payload = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, payload
+
+
+async def load_test(host, port, payload, requests=200, concurrency=16, output_format="png"):
+    """
+    Prueba de carga: concurrency clientes con keep-alive envian requests
+    peticiones en total
+
+    Args:
+        host, port: direccion del servicio
+        payload: bytes de la imagen a enviar
+        requests: numero total de peticiones
+        concurrency: conexiones simultaneas
+        output_format: 'png' o 'npy'
+
+    Returns:
+        dict con requests, statuses, elapsed_s, requests_per_second y
+        latency_ms (percentiles de las respuestas 200)
+    """
+    remaining = [requests]
+    latencies = []
+    statuses = {}
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                start = time.perf_counter()
+                status, _, _ = await http_request(reader, writer, "POST",
+                                                  f"/edges?format={output_format}", payload)
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append((time.perf_counter() - start) * 1e3)
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'elapsed_s': elapsed,
+        'requests_per_second': requests / elapsed if elapsed > 0 else 0.0,
+        'latency_ms': dict(percentiles(latencies, (50, 90, 99)),
+                           max=max(latencies, default=0.0)),
+    }
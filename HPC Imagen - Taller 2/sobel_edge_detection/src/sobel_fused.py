@@ -0,0 +1,141 @@
+"""
+Pipeline fusionado: RGB uint8 -> grises -> Sobel -> bordes normalizados uint8
+Recorre la imagen por bandas y reduce al minimo las copias de tamaño completo
+"""
+import numpy as np
+
+# Manejar imports relativos y absolutos
+try:
+    from .utils import Timer, PeakMemory, format_bytes, rgb_to_grayscale
+    from .sobel_sequential import compute_sobel_block, SobelBuffers, ENGINES
+except ImportError:
+    from utils import Timer, PeakMemory, format_bytes, rgb_to_grayscale
+    from sobel_sequential import compute_sobel_block, SobelBuffers, ENGINES
+
+
+def fused_sobel_edges(rgb_image, out=None, band_rows=64, engine="separable"):
+    """
+    Calcula los bordes normalizados uint8 de una imagen RGB en una sola pasada
+
+    Tambien acepta una imagen ya en grises (height, width), por ejemplo la
+    de load_image(path, mode='L'); en ese caso no hay conversion.
+
+    Produce exactamente lo mismo que
+    normalize_image(apply_sobel_sequential(rgb_to_grayscale(rgb_image))),
+    pero la conversion a grises y los temporales de Sobel solo existen a
+    nivel de banda. El unico array de tamaño completo ademas de la salida
+    es el de magnitudes float32, que se normaliza en sitio tras una pasada
+    de reduccion de minimo y maximo.
+
+    Args:
+        rgb_image: numpy array uint8 (height, width, 3) o (height, width)
+        out: numpy array uint8 (height, width) para el resultado (opcional)
+        band_rows: filas por banda
+        engine: motor de calculo de cada banda
+
+    Returns:
+        numpy array uint8 (height, width) con los bordes normalizados
+
+    Raises:
+        ValueError: Si la imagen no es RGB, es muy pequeña o el motor no existe
+    """
+    is_gray = rgb_image.ndim == 2
+    if not is_gray and (rgb_image.ndim != 3 or rgb_image.shape[2] != 3):
+        raise ValueError(f"La imagen debe tener 3 canales RGB. Forma actual: {rgb_image.shape}")
+
+    if engine not in ENGINES:
+        raise ValueError(f"Motor desconocido: {engine}. Opciones: {', '.join(ENGINES)}")
+
+    height, width = rgb_image.shape[:2]
+
+    if height < 3 or width < 3:
+        raise ValueError(f"Imagen muy pequeña ({height}x{width}). Minimo: 3x3")
+
+    if out is None:
+        out = np.empty((height, width), dtype=np.uint8)
+    elif out.shape != (height, width) or out.dtype != np.uint8:
+        raise ValueError(f"out debe ser uint8 de forma {(height, width)}. "
+                         f"Recibido: {out.dtype} {out.shape}")
+
+    edges = np.empty((height, width), dtype=np.float32)
+    edges[0, :] = 0
+    edges[-1, :] = 0
+    edges[:, 0] = 0
+    edges[:, -1] = 0
+
+    buffers = {}
+    for start_row in range(1, height - 1, band_rows):
+        end_row = min(start_row + band_rows, height - 1)
+
+        # Grises solo de la banda y su halo de una fila
+        band = rgb_image[start_row - 1:end_row + 1]
+        gray_band = band if is_gray else rgb_to_grayscale(band)
+
+        if engine == "separable" and gray_band.shape not in buffers:
+            buffers[gray_band.shape] = SobelBuffers(gray_band.shape)
+        compute_sobel_block(gray_band, edges[start_row:end_row, 1:-1], engine,
+                            buffers.get(gray_band.shape))
+
+    # Pasada de reduccion
+    min_val = edges.min()
+    max_val = edges.max()
+
+    if max_val - min_val == 0:
+        out[:] = 0
+        return out
+
+    # Mismas operaciones que normalize_image, pero en sitio
+    edges -= min_val
+    edges /= (max_val - min_val)
+    edges *= 255.0
+    np.copyto(out, edges, casting='unsafe')
+
+    return out
+
+
+def sobel_edge_detection_fused(image_path, output_path, engine="separable",
+                               band_rows=64, measure_memory=True):
+    """
+    Pipeline completo de deteccion de bordes con el camino fusionado
+
+    Args:
+        image_path: Ruta de imagen de entrada
+        output_path: Ruta donde guardar resultado
+        engine: motor de calculo de cada banda
+        band_rows: filas por banda
+        measure_memory: reportar la memoria pico de grises + Sobel + normalizacion
+
+    Returns:
+        float: Tiempo de ejecucion en segundos
+    """
+    try:
+        from .utils import load_image, save_image
+    except ImportError:
+        from utils import load_image, save_image
+
+    print("\n" + "="*60)
+    print("SOBEL EDGE DETECTION - PIPELINE FUSIONADO")
+    print(f"Motor: {engine} | Filas por banda: {band_rows}")
+    print("="*60)
+
+    print(f"\nCargando imagen: {image_path}")
+    rgb_image = load_image(image_path)
+    print(f"Dimensiones: {rgb_image.shape[0]}x{rgb_image.shape[1]} pixeles")
+
+    print("\nAplicando grises + Sobel + normalizacion en una pasada...")
+    with PeakMemory("Grises + Sobel + normalizacion", enabled=measure_memory) as memory:
+        with Timer("Procesamiento Sobel Fusionado") as timer:
+            edges_normalized = fused_sobel_edges(rgb_image, band_rows=band_rows,
+                                                 engine=engine)
+
+    print("\nGuardando resultado...")
+    save_image(edges_normalized, output_path)
+
+    print("\n" + "="*60)
+    print(f"PROCESAMIENTO COMPLETADO")
+    print(f"Tiempo: {timer.elapsed:.4f} segundos")
+    if memory.peak is not None:
+        print(f"Memoria pico: {format_bytes(memory.peak)}")
+    print("="*60 + "\n")
+
+    return timer.elapsed
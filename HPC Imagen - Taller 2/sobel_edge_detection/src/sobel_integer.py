@@ -0,0 +1,207 @@
+"""
+Sobel con aritmetica entera: entrada uint8, gradientes int16, magnitud uint16
+Usa la mitad de memoria que el camino float32 y ufuncs enteras de NumPy
+"""
+import numpy as np
+
+# Manejar imports relativos y absolutos
+try:
+    from .utils import Timer
+except ImportError:
+    from utils import Timer
+
+MAGNITUDES = ("l1", "l2approx")
+
+# Cota del error relativo de cada magnitud frente a sqrt(gx^2 + gy^2)
+# calculado en float, como (minimo, maximo) de magnitud_entera / magnitud_float.
+#   l1:       |gx| + |gy| esta entre L2 y sqrt(2) * L2 (exacta en los ejes)
+#   l2approx: max + 3/8 * min (alpha-max-beta-min); el cociente va de
+#             (1 + 3/8) / sqrt(2) = 0.9723 en la diagonal a
+#             sqrt(1 + (3/8)^2) = 1.0680 cuando min/max = 3/8.
+#             El desplazamiento >> 3 trunca, restando menos de 1 unidad.
+ACCURACY_BOUNDS = {
+    "l1": (1.0, 1.41422),
+    "l2approx": (0.97227, 1.06801),
+}
+
+# Unidades absolutas que puede restar el truncamiento entero
+_TRUNCATION = {"l1": 0.0, "l2approx": 1.0}
+
+
+def sobel_gradients_int16(src):
+    """
+    Gradientes Sobel Gx y Gy con acumulacion int16
+
+    Con entrada uint8 |Gx|, |Gy| <= 4 * 255 = 1020, asi que int16 no
+    desborda. Se usan las dos pasadas 1-D del motor separable.
+
+    Args:
+        src: numpy array uint8 (h, w) con el bloque de entrada y su halo
+
+    Returns:
+        tupla (gx, gy) de arrays int16 (h-2, w-2)
+    """
+    img = src.astype(np.int16)
+
+    # Gx: [1, 2, 1] en vertical, luego [-1, 0, 1] en horizontal
+    tmp = img[1:-1] + img[1:-1]
+    tmp += img[:-2]
+    tmp += img[2:]
+    gx = tmp[:, 2:] - tmp[:, :-2]
+
+    # Gy: [-1, 0, 1] en vertical, luego [1, 2, 1] en horizontal
+    np.subtract(img[2:], img[:-2], out=tmp)
+    gy = tmp[:, 1:-1] + tmp[:, 1:-1]
+    gy += tmp[:, :-2]
+    gy += tmp[:, 2:]
+
+    return gx, gy
+
+
+def compute_sobel_block_integer(src, out, magnitude="l1"):
+    """
+    Calcula la magnitud entera de los pixeles interiores de un bloque
+
+    Args:
+        src: numpy array uint8 (h, w) con el bloque y su halo de 1 pixel
+        out: numpy array uint16 (h-2, w-2) donde se escribe el resultado
+        magnitude: 'l1' (|gx| + |gy|) o 'l2approx' (max + 3/8 min)
+
+    Raises:
+        ValueError: Si la magnitud no existe
+    """
+    if magnitude not in MAGNITUDES:
+        raise ValueError(f"Magnitud desconocida: {magnitude}. Opciones: {', '.join(MAGNITUDES)}")
+
+    gx, gy = sobel_gradients_int16(src)
+    np.abs(gx, out=gx)
+    np.abs(gy, out=gy)
+
+    if magnitude == "l1":
+        # Maximo 2040: cabe en int16 y se reinterpreta como uint16
+        gx += gy
+        out[:] = gx.view(np.uint16)
+        return
+
+    high = np.maximum(gx, gy)
+    low = np.minimum(gx, gy, out=gy)
+    low *= 3
+    low >>= 3
+    high += low
+    out[:] = high.view(np.uint16)
+
+
+def apply_sobel_integer(gray_image, magnitude="l1", out=None):
+    """
+    Aplica Sobel con aritmetica entera
+
+    Args:
+        gray_image: numpy array uint8 (height, width) en escala de grises
+        magnitude: 'l1' o 'l2approx' (ver ACCURACY_BOUNDS)
+        out: numpy array uint16 (height, width) donde escribir el resultado
+             (None = reservar uno nuevo)
+
+    Returns:
+        numpy array uint16 (height, width) con magnitudes y marco en cero
+
+    Raises:
+        ValueError: Si la imagen no es uint8, es muy pequeña, out no es
+                    valido o la magnitud no existe
+    """
+    if gray_image.dtype != np.uint8:
+        raise ValueError(f"El modo entero requiere una imagen uint8. Recibido: {gray_image.dtype}")
+
+    height, width = gray_image.shape
+
+    if height < 3 or width < 3:
+        raise ValueError(f"Imagen muy pequeña ({height}x{width}). Minimo: 3x3")
+
+    if out is None:
+        out = np.empty((height, width), dtype=np.uint16)
+    elif out.shape != (height, width) or out.dtype != np.uint16:
+        raise ValueError(f"out debe ser uint16 de forma {(height, width)}. "
+                         f"Recibido: {out.dtype} {out.shape}")
+
+    out[0, :] = 0
+    out[-1, :] = 0
+    out[:, 0] = 0
+    out[:, -1] = 0
+
+    compute_sobel_block_integer(gray_image, out[1:-1, 1:-1], magnitude)
+    return out
+
+
+def check_accuracy(edges_integer, edges_float, magnitude):
+    """
+    Comprueba que la magnitud entera respeta ACCURACY_BOUNDS
+
+    Args:
+        edges_integer: resultado de apply_sobel_integer
+        edges_float: resultado del camino float (apply_sobel_sequential)
+        magnitude: magnitud usada en edges_integer
+
+    Returns:
+        dict con within_bound, min_ratio, max_ratio (sobre pixeles con
+        magnitud > 0) y max_abs_difference
+    """
+    low, high = ACCURACY_BOUNDS[magnitude]
+    truncation = _TRUNCATION[magnitude]
+
+    reference = edges_float.astype(np.float64)
+    value = edges_integer.astype(np.float64)
+
+    # Tolerancia para el redondeo de float32 en la referencia
+    eps = 1e-3
+    within = np.all((value >= reference * low - truncation - eps) &
+                    (value <= reference * high + eps))
+
+    nonzero = reference > 0
+    ratios = value[nonzero] / reference[nonzero]
+    return {
+        'within_bound': bool(within),
+        'min_ratio': float(ratios.min()) if ratios.size else 1.0,
+        'max_ratio': float(ratios.max()) if ratios.size else 1.0,
+        'max_abs_difference': float(np.max(np.abs(value - reference))),
+    }
+
+
+def sobel_edge_detection_integer(image_path, output_path, magnitude="l1"):
+    """
+    Pipeline completo de deteccion de bordes con aritmetica entera
+
+    Args:
+        image_path: Ruta de imagen de entrada
+        output_path: Ruta donde guardar resultado
+        magnitude: 'l1' o 'l2approx'
+
+    Returns:
+        float: Tiempo de ejecucion en segundos
+    """
+    try:
+        from .utils import load_image, rgb_to_grayscale, save_image, normalize_image
+    except ImportError:
+        from utils import load_image, rgb_to_grayscale, save_image, normalize_image
+
+    print("\n" + "="*60)
+    print("SOBEL EDGE DETECTION - VERSION ENTERA (int16)")
+    print(f"Magnitud: {magnitude}")
+    print("="*60)
+
+    print(f"\nCargando imagen: {image_path}")
+    rgb_image = load_image(image_path)
+    gray_image = rgb_to_grayscale(rgb_image)
+    print(f"Dimensiones: {gray_image.shape[0]}x{gray_image.shape[1]} pixeles")
+
+    print("\nAplicando deteccion de bordes Sobel...")
+    with Timer("Procesamiento Sobel Entero") as timer:
+        edges = apply_sobel_integer(gray_image, magnitude)
+
+    print("\nNormalizando y guardando resultado...")
+    save_image(normalize_image(edges), output_path)
+
+    print("\n" + "="*60)
+    print(f"PROCESAMIENTO COMPLETADO")
+    print(f"Tiempo: {timer.elapsed:.4f} segundos")
+    print("="*60 + "\n")
+
+    return timer.elapsed
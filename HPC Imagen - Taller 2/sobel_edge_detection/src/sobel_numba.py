@@ -0,0 +1,106 @@
+"""
+Motor Sobel compilado con Numba
+El stencil se compila con parallel=True (prange sobre filas) y el codigo
+compilado se guarda en disco (cache=True) para no recompilar en cada arranque.
+Numba es opcional: si no esta instalado NUMBA_AVAILABLE es False.
+"""
+import os
+import threading
+import multiprocessing
+import numpy as np
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE and "NUMBA_THREADING_LAYER" not in os.environ \
+        and "NUMBA_THREADING_LAYER_PRIORITY" not in os.environ:
+    # Con la capa TBB, un proceso que ya lanzo hilos de Numba y despues
+    # crea un Pool con fork se queda bloqueado al terminar; omp y
+    # workqueue no tienen ese problema
+    numba.config.THREADING_LAYER_PRIORITY = ["omp", "workqueue", "tbb"]
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True, inline="always")
+    def _sobel_row(src, out, i):
+        """Magnitud Sobel de la fila interior i (fila i de out)"""
+        for j in range(src.shape[1] - 2):
+            gx = ((src[i, j + 2] - src[i, j]) +
+                  2.0 * (src[i + 1, j + 2] - src[i + 1, j]) +
+                  (src[i + 2, j + 2] - src[i + 2, j]))
+            gy = ((src[i + 2, j] - src[i, j]) +
+                  2.0 * (src[i + 2, j + 1] - src[i, j + 1]) +
+                  (src[i + 2, j + 2] - src[i, j + 2]))
+            out[i, j] = np.sqrt(gx * gx + gy * gy)
+
+    @numba.njit(parallel=True, cache=True)
+    def _sobel_stencil_parallel(src, out):
+        """Stencil con una fila por iteracion de prange, repartidas entre hilos"""
+        for i in numba.prange(src.shape[0] - 2):
+            _sobel_row(src, out, i)
+
+    @numba.njit(cache=True)
+    def _sobel_stencil_serial(src, out):
+        """Stencil en un solo hilo, para workers de procesos o hilos"""
+        for i in range(src.shape[0] - 2):
+            _sobel_row(src, out, i)
+
+
+def _use_prange():
+    """
+    True si se puede usar el stencil con prange
+
+    Los hilos de Numba no sobreviven a un fork: un worker de
+    multiprocessing que los usara tras heredarlos se bloquea. Tampoco
+    admiten lanzamientos concurrentes desde varios hilos. Ademas, dentro
+    de un pool el paralelismo ya lo ponen los workers, asi que alli (y en
+    cualquier hilo que no sea el principal) se usa la version serial.
+    """
+    return (multiprocessing.parent_process() is None and
+            threading.current_thread() is threading.main_thread())
+
+
+def sobel_block_numba(src, out):
+    """
+    Calcula la magnitud Sobel de un bloque con el stencil compilado
+
+    Args:
+        src: numpy array (h, w) con el bloque de entrada y su halo
+        out: numpy array float32 (h-2, w-2) donde se escribe el resultado
+
+    Raises:
+        RuntimeError: Si Numba no esta instalado
+    """
+    if not NUMBA_AVAILABLE:
+        raise RuntimeError("Numba no esta instalado (pip install numba)")
+
+    src = np.ascontiguousarray(src, dtype=np.float32)
+    if _use_prange():
+        _sobel_stencil_parallel(src, out)
+    else:
+        _sobel_stencil_serial(src, out)
+
+
+def compile_numba():
+    """
+    Fuerza la compilacion (o la carga desde la cache en disco) del stencil
+
+    Sirve para sacar el tiempo de compilacion de las mediciones.
+
+    Returns:
+        True si Numba esta disponible
+    """
+    if not NUMBA_AVAILABLE:
+        return False
+
+    # Los motores escriben en vistas del interior (no contiguas), que Numba
+    # compila como una especializacion distinta de la de arrays contiguos
+    src = np.zeros((3, 3), dtype=np.float32)
+    out = np.zeros((3, 3), dtype=np.float32)[1:-1, 1:-1]
+    _sobel_stencil_parallel(src, out)
+    _sobel_stencil_serial(src, out)
+    return True
@@ -2,97 +2,648 @@
 Implementacion paralela del algoritmo de deteccion de bordes Sobel
 Utiliza multiprocessing para distribuir el trabajo entre multiples cores
 """
+import os
+import time
+import pickle
+import threading
+import functools
 import numpy as np
-from multiprocessing import Pool, cpu_count
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool, cpu_count, shared_memory, resource_tracker
 
 # Manejar imports relativos y absolutos
 try:
-    from .utils import Timer
-    from .sobel_sequential import SOBEL_KX, SOBEL_KY
+    from .utils import Timer, PeakMemory, format_bytes
+    from .sobel_sequential import (compute_sobel_block, prepare_output,
+                                   SobelBuffers, ENGINES)
+    from .instrumentation import get_tracer, traced_call
 except ImportError:
-    from utils import Timer
-    from sobel_sequential import SOBEL_KX, SOBEL_KY
+    from utils import Timer, PeakMemory, format_bytes
+    from sobel_sequential import (compute_sobel_block, prepare_output,
+                                  SobelBuffers, ENGINES)
+    from instrumentation import get_tracer, traced_call
+
+
+BACKENDS = ("processes", "threads")
+
+# Buffers de trabajo del motor separable, reutilizados entre chunks del
+# mismo tamaño dentro de cada worker (proceso o hilo)
+_worker_local = threading.local()
+
+
+def _get_worker_buffers(shape):
+    """Devuelve los SobelBuffers del worker actual para un tamaño de bloque"""
+    cache = getattr(_worker_local, "buffers", None)
+    if cache is None:
+        cache = _worker_local.buffers = {}
+
+    buffers = cache.get(shape)
+    if buffers is None:
+        if len(cache) >= 8:
+            cache.clear()
+        buffers = SobelBuffers(shape)
+        cache[shape] = buffers
+    return buffers
+
+
+def _sobel_rows(gray_image, out_rows, start_row, end_row, engine):
+    """
+    Calcula las filas [start_row, end_row) de la imagen de bordes
+
+    Solo se leen las filas del rango mas una fila de halo arriba y abajo.
+
+    Args:
+        gray_image: numpy array (height, width) con la imagen completa
+        out_rows: numpy array float32 (end_row - start_row, width) de salida
+        start_row: primera fila del rango
+        end_row: fila siguiente a la ultima del rango
+        engine: motor de calculo
+    """
+    height = gray_image.shape[0]
+
+    # Filas interiores del rango; las filas y columnas del marco valen cero
+    first = max(1, start_row)
+    last = min(end_row, height - 1)
+
+    out_rows[:first - start_row] = 0
+    out_rows[max(last, first) - start_row:] = 0
+    out_rows[:, 0] = 0
+    out_rows[:, -1] = 0
+
+    if last > first:
+        src = gray_image[first - 1:last + 1]
+        buffers = _get_worker_buffers(src.shape) if engine == "separable" else None
+        compute_sobel_block(src, out_rows[first - start_row:last - start_row, 1:-1],
+                            engine, buffers)
 
 
 def process_image_chunk(args):
     """
-    Procesa un fragmento de la imagen (funcion worker para multiprocessing)
+    Procesa un fragmento de la imagen y devuelve una copia del resultado
 
     Args:
-        args: tupla con (gray_image, start_row, end_row)
+        args: tupla con (gray_image, start_row, end_row) o
+              (gray_image, start_row, end_row, engine)
 
     Returns:
         tupla (start_row, end_row, chunk_edges)
     """
-    gray_image, start_row, end_row = args
-    height, width = gray_image.shape
+    gray_image, start_row, end_row = args[:3]
+    engine = args[3] if len(args) > 3 else "loops"
+    width = gray_image.shape[1]
 
-    chunk_edges = np.zeros((end_row - start_row, width), dtype=np.float32)
+    chunk_edges = np.empty((end_row - start_row, width), dtype=np.float32)
+    _sobel_rows(gray_image, chunk_edges, start_row, end_row, engine)
 
-    for i in range(max(1, start_row), min(end_row, height-1)):
-        for j in range(1, width-1):
-            window = gray_image[i-1:i+2, j-1:j+2]
+    return (start_row, end_row, chunk_edges)
 
-            gx = 0.0
-            gy = 0.0
-            for m in range(3):
-                for n in range(3):
-                    gx += window[m, n] * SOBEL_KX[m, n]
-                    gy += window[m, n] * SOBEL_KY[m, n]
 
-            magnitude = np.sqrt(gx**2 + gy**2)
-            chunk_edges[i - start_row, j] = magnitude
+# Bloques de memoria compartida abiertos por cada worker. Un SobelExecutor
+# reutiliza los mismos bloques entre llamadas, asi que se mapean una sola vez
+_worker_shared = {}
 
-    return (start_row, end_row, chunk_edges)
 
+def _attach_shared_array(name, shape, dtype):
+    """
+    Abre (o reutiliza) un bloque de memoria compartida como array numpy
 
-def apply_sobel_parallel(gray_image, num_processes=None):
+    Returns:
+        numpy array que usa el buffer del bloque
     """
-    Aplica Sobel usando multiples procesos en paralelo
+    shm = _worker_shared.get(name)
+    if shm is None:
+        if len(_worker_shared) >= 4:
+            for old in _worker_shared.values():
+                old.close()
+            _worker_shared.clear()
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_shared[name] = shm
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def process_shared_chunk(args):
+    """
+    Procesa un rango de filas sobre memoria compartida (funcion worker)
+
+    La entrada y la salida viven en bloques de shared_memory; el worker
+    solo recibe sus nombres y el rango de filas, y escribe el resultado
+    directamente en la salida, sin devolver datos al proceso principal.
+
+    Args:
+        args: tupla con (input_name, output_name, shape, dtype,
+                         start_row, end_row, engine)
+
+    Returns:
+        tupla (start_row, end_row)
+    """
+    input_name, output_name, shape, dtype, start_row, end_row, engine = args
+
+    gray_image = _attach_shared_array(input_name, shape, dtype)
+    edges = _attach_shared_array(output_name, shape, np.float32)
+    _sobel_rows(gray_image, edges[start_row:end_row], start_row, end_row, engine)
+
+    return (start_row, end_row)
+
+
+def split_rows(height, num_chunks):
+    """
+    Divide las filas en num_chunks rangos; el ultimo absorbe el residuo
+
+    Returns:
+        lista de tuplas (start_row, end_row)
+    """
+    rows_per_chunk = height // num_chunks
+
+    ranges = []
+    for i in range(num_chunks):
+        start_row = i * rows_per_chunk
+
+        if i < num_chunks - 1:
+            end_row = (i + 1) * rows_per_chunk
+        else:
+            end_row = height
+
+        ranges.append((start_row, end_row))
+
+    return ranges
+
+
+SCHEDULES = ("strips", "tiles")
+
+# Bytes de memoria de trabajo por pixel de un tile con el motor separable:
+# entrada uint8, copia float32, intermedio, Gx, Gy y salida float32
+_BYTES_PER_TILE_PIXEL = 21
+
+
+def suggest_tile_shape(shape, num_workers, cache_bytes=256 * 1024):
+    """
+    Propone un tamaño de tile cuya memoria de trabajo quepa en cache
+
+    Los tiles son anchos (filas completas o casi) para recorrer la memoria
+    en orden, y se reducen en altura hasta tener al menos 4 tiles por
+    worker para que el reparto dinamico pueda equilibrar la carga.
+
+    Args:
+        shape: tupla (height, width) de la imagen
+        num_workers: numero de procesos que consumen los tiles
+        cache_bytes: presupuesto de cache por tile (por defecto L2 de 256 KiB)
+
+    Returns:
+        tupla (tile_height, tile_width)
+    """
+    interior_h = max(1, shape[0] - 2)
+    interior_w = max(1, shape[1] - 2)
+
+    area = max(64, cache_bytes // _BYTES_PER_TILE_PIXEL)
+    tile_w = min(interior_w, 512)
+    tile_h = min(interior_h, max(8, area // tile_w))
+
+    min_tiles = 4 * num_workers
+    while tile_h > 8 and -(-interior_h // tile_h) * -(-interior_w // tile_w) < min_tiles:
+        tile_h //= 2
+
+    return (max(1, tile_h), tile_w)
+
+
+def split_tiles(height, width, tile_shape):
+    """
+    Divide el interior de la imagen en tiles 2-D
+
+    Solo se reparte el interior [1, height-1) x [1, width-1); el marco
+    exterior siempre vale cero. Cada tile se lee con un halo de 1 pixel.
+
+    Args:
+        height, width: dimensiones de la imagen
+        tile_shape: tupla (tile_height, tile_width)
+
+    Returns:
+        lista de tuplas (row0, row1, col0, col1)
+    """
+    tile_h, tile_w = tile_shape
+    if tile_h < 1 or tile_w < 1:
+        raise ValueError(f"Tamaño de tile invalido: {tile_shape}")
+
+    tiles = []
+    for row0 in range(1, height - 1, tile_h):
+        row1 = min(row0 + tile_h, height - 1)
+        for col0 in range(1, width - 1, tile_w):
+            col1 = min(col0 + tile_w, width - 1)
+            tiles.append((row0, row1, col0, col1))
+
+    return tiles
+
+
+def process_shared_tile(args):
+    """
+    Procesa un tile 2-D sobre memoria compartida (funcion worker)
+
+    Args:
+        args: tupla con (input_name, output_name, shape, dtype,
+                         row0, row1, col0, col1, engine)
+
+    Returns:
+        tupla (row0, row1, col0, col1)
+    """
+    input_name, output_name, shape, dtype, row0, row1, col0, col1, engine = args
+
+    gray_image = _attach_shared_array(input_name, shape, dtype)
+    edges = _attach_shared_array(output_name, shape, np.float32)
+
+    src = gray_image[row0 - 1:row1 + 1, col0 - 1:col1 + 1]
+    buffers = _get_worker_buffers(src.shape) if engine == "separable" else None
+    compute_sobel_block(src, edges[row0:row1, col0:col1], engine, buffers)
+
+    return (row0, row1, col0, col1)
+
+
+class SobelExecutor:
+    """
+    Pool de procesos persistente para aplicar Sobel muchas veces
+
+    Los procesos se crean una sola vez y los bloques de memoria compartida
+    se reutilizan mientras las imagenes (o tiles) tengan el mismo tamaño,
+    de modo que las llamadas repetidas no pagan el arranque del pool.
+
+    Con schedule="strips" la imagen se reparte en una franja horizontal
+    por proceso. Con schedule="tiles" se corta en tiles 2-D que los
+    workers van tomando dinamicamente (imap_unordered), de modo que los
+    que terminan antes procesan mas tiles.
+
+    Uso:
+        with SobelExecutor(num_processes=4, engine="vectorized") as executor:
+            for gray_image in imagenes:
+                edges = executor.apply(gray_image)
+    """
+    def __init__(self, num_processes=None, engine="loops", schedule="strips",
+                 tile_shape=None):
+        """
+        Args:
+            num_processes: numero de procesos del pool (None = usar todos los cores)
+            engine: motor de calculo por defecto de los workers
+            schedule: reparto por defecto ('strips' o 'tiles')
+            tile_shape: tupla (alto, ancho) de los tiles, None para usar
+                        suggest_tile_shape o 'auto' para medir con autotune
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Motor desconocido: {engine}. Opciones: {', '.join(ENGINES)}")
+
+        if schedule not in SCHEDULES:
+            raise ValueError(f"Reparto desconocido: {schedule}. Opciones: {', '.join(SCHEDULES)}")
+
+        self.num_processes = num_processes if num_processes is not None else cpu_count()
+        self.engine = engine
+        self.schedule = schedule
+        self.tile_shape = tile_shape
+
+        # Los workers deben heredar el resource tracker del proceso principal;
+        # si cada uno arrancara el suyo, al terminar borrarian los bloques
+        # compartidos que abrieron
+        if os.name == "posix":
+            resource_tracker.ensure_running()
+        with get_tracer().span("pool_start", cat="pool", processes=self.num_processes):
+            self._pool = Pool(processes=self.num_processes)
+        self._shm_in = None
+        self._shm_out = None
+        self._shared_key = None
+        self._tuned_tiles = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    @property
+    def closed(self):
+        """True si el pool ya fue cerrado"""
+        return self._pool is None
+
+    def _shared_blocks(self, shape, dtype):
+        """Devuelve bloques de entrada/salida para el tamaño, creandolos si hace falta"""
+        key = (tuple(shape), np.dtype(dtype).str)
+        if self._shared_key != key:
+            self._release_shared()
+            num_pixels = int(np.prod(shape))
+            self._shm_in = shared_memory.SharedMemory(
+                create=True, size=num_pixels * np.dtype(dtype).itemsize)
+            self._shm_out = shared_memory.SharedMemory(
+                create=True, size=num_pixels * np.dtype(np.float32).itemsize)
+            self._shared_key = key
+        return self._shm_in, self._shm_out
+
+    def _release_shared(self):
+        """Cierra y elimina los bloques de memoria compartida actuales"""
+        for shm in (self._shm_in, self._shm_out):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._shm_in = None
+        self._shm_out = None
+        self._shared_key = None
+
+    def _resolve_tile_shape(self, shape, engine, tile_shape):
+        """Traduce el parametro tile_shape a una tupla concreta"""
+        if tile_shape is None:
+            return suggest_tile_shape(shape, self.num_processes)
+        if tile_shape == "auto":
+            key = (tuple(shape), engine)
+            if key not in self._tuned_tiles:
+                self._tuned_tiles[key] = self._autotune_loaded(shape, engine)
+            return self._tuned_tiles[key]
+        return tuple(tile_shape)
+
+    def _dispatch(self, shape, dtype, engine, schedule, tile_shape):
+        """Reparte el trabajo sobre los bloques compartidos ya cargados"""
+        height, width = shape
+        shm_in, shm_out = self._shm_in, self._shm_out
+
+        if schedule == "strips":
+            # Cada tarea es solo un descriptor: nombres de los bloques y rango de filas
+            function = process_shared_chunk
+            tasks = [
+                (shm_in.name, shm_out.name, shape, dtype.str, start_row, end_row, engine)
+                for start_row, end_row in split_rows(height, self.num_processes)
+            ]
+        else:
+            function = process_shared_tile
+            tasks = [
+                (shm_in.name, shm_out.name, shape, dtype.str, row0, row1, col0, col1, engine)
+                for row0, row1, col0, col1 in split_tiles(height, width, tile_shape)
+            ]
+
+        tracer = get_tracer()
+        if tracer.enabled:
+            self._dispatch_traced(tracer, function, tasks, schedule)
+        elif schedule == "strips":
+            self._pool.map(function, tasks)
+        else:
+            # Reparto dinamico: cada worker pide un tile nuevo al terminar el anterior
+            for _ in self._pool.imap_unordered(function, tasks, chunksize=1):
+                pass
+
+    def _dispatch_traced(self, tracer, function, tasks, schedule):
+        """Como _dispatch, pero registra un span por tarea medido en el worker"""
+        # Bytes que se serializan hacia los workers (solo descriptores)
+        task_bytes = sum(len(pickle.dumps(task)) for task in tasks)
+
+        with tracer.span("dispatch", schedule=schedule, tasks=len(tasks), bytes=task_bytes):
+            submitted = time.perf_counter()
+            results = self._pool.imap_unordered(functools.partial(traced_call, function),
+                                                tasks, chunksize=1)
+            for result, (pid, tid, start, end) in results:
+                # result es el rango (filas o tile) que proceso el worker
+                tracer.add("worker_compute", start, end, cat="worker", pid=pid, tid=tid,
+                           region=list(result), queue_wait_s=start - submitted)
+
+    def _autotune_loaded(self, shape, engine, candidates=None, repeats=3):
+        """Mide candidatos de tile sobre la imagen ya cargada y devuelve el mejor"""
+        base_h, base_w = suggest_tile_shape(shape, self.num_processes)
+        interior_h, interior_w = shape[0] - 2, shape[1] - 2
+
+        if candidates is None:
+            candidates = {(base_h, base_w), (interior_h, interior_w)}
+            for factor in (4, 2):
+                candidates.add((max(1, base_h // factor), base_w))
+                candidates.add((min(interior_h, base_h * factor), base_w))
+                candidates.add((base_h, max(16, base_w // factor)))
+            candidates = sorted(candidates)
+
+        dtype = np.dtype(self._shared_key[1])
+        best_shape, best_time = None, float('inf')
+        for candidate in candidates:
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                self._dispatch(shape, dtype, engine, "tiles", candidate)
+                times.append(time.perf_counter() - start)
+            elapsed = min(times)
+            if elapsed < best_time:
+                best_shape, best_time = tuple(candidate), elapsed
+
+        return best_shape
+
+    def _load(self, gray_image):
+        """Copia la imagen al bloque compartido de entrada"""
+        with get_tracer().span("load", cat="transfer", bytes=gray_image.nbytes):
+            shm_in, _ = self._shared_blocks(gray_image.shape, gray_image.dtype)
+            shared_in = np.ndarray(gray_image.shape, dtype=gray_image.dtype,
+                                   buffer=shm_in.buf)
+            try:
+                shared_in[:] = gray_image
+            finally:
+                del shared_in
+
+    def _check(self, gray_image, engine, schedule):
+        """Valida el estado del executor y los parametros de una llamada"""
+        if self.closed:
+            raise RuntimeError("SobelExecutor cerrado")
+
+        height, width = gray_image.shape
+
+        if height < 3 or width < 3:
+            raise ValueError(f"Imagen muy pequena ({height}x{width}). Minimo: 3x3")
+
+        if engine not in ENGINES:
+            raise ValueError(f"Motor desconocido: {engine}. Opciones: {', '.join(ENGINES)}")
+
+        if schedule not in SCHEDULES:
+            raise ValueError(f"Reparto desconocido: {schedule}. Opciones: {', '.join(SCHEDULES)}")
+
+    def autotune(self, gray_image, engine=None, candidates=None, repeats=3):
+        """
+        Busca el tamaño de tile mas rapido para una imagen y lo recuerda
+
+        El resultado se usa en las siguientes llamadas con tile_shape='auto'
+        para imagenes del mismo tamaño y motor.
+
+        Args:
+            gray_image: numpy array (height, width) representativo
+            engine: motor de calculo (None = el del executor)
+            candidates: lista de tuplas (alto, ancho) a probar
+                        (None = variantes de suggest_tile_shape)
+            repeats: repeticiones por candidato (se toma el minimo)
+
+        Returns:
+            tupla (tile_height, tile_width) ganadora
+        """
+        engine = engine or self.engine
+        self._check(gray_image, engine, "tiles")
+        self._load(gray_image)
+
+        best = self._autotune_loaded(gray_image.shape, engine, candidates, repeats)
+        self._tuned_tiles[(tuple(gray_image.shape), engine)] = best
+        return best
+
+    def apply(self, gray_image, engine=None, out=None, schedule=None, tile_shape=None):
+        """
+        Aplica Sobel a una imagen (o tile con su halo) usando el pool
+
+        Args:
+            gray_image: numpy array (height, width) en escala de grises
+            engine: motor de calculo (None = el del executor)
+            out: numpy array float32 (height, width) donde escribir el resultado
+            schedule: 'strips' o 'tiles' (None = el del executor)
+            tile_shape: tamaño de tile para schedule='tiles'
+                        (None = el del executor)
+
+        Returns:
+            numpy array (height, width) con bordes detectados
+
+        Raises:
+            ValueError: Si la imagen es muy pequeña o el motor no existe
+            RuntimeError: Si el executor ya fue cerrado
+        """
+        engine = engine or self.engine
+        schedule = schedule or self.schedule
+        tile_shape = tile_shape if tile_shape is not None else self.tile_shape
+        self._check(gray_image, engine, schedule)
+
+        edges = prepare_output(gray_image.shape, out)
+        shape = tuple(gray_image.shape)
+
+        self._load(gray_image)
+        if schedule == "tiles":
+            tile_shape = self._resolve_tile_shape(shape, engine, tile_shape)
+        self._dispatch(shape, gray_image.dtype, engine, schedule, tile_shape)
+
+        with get_tracer().span("gather", cat="transfer", bytes=edges[1:-1, 1:-1].nbytes):
+            shared_out = np.ndarray(shape, dtype=np.float32, buffer=self._shm_out.buf)
+            try:
+                # El marco de edges ya esta en cero; los tiles solo cubren el interior
+                edges[1:-1, 1:-1] = shared_out[1:-1, 1:-1]
+            finally:
+                # Liberar la vista para poder cerrar el bloque despues
+                del shared_out
+
+        return edges
+
+    def map(self, images, engine=None):
+        """
+        Aplica Sobel a una secuencia de imagenes, una tras otra
+
+        Args:
+            images: iterable de numpy arrays en escala de grises
+            engine: motor de calculo (None = el del executor)
+
+        Yields:
+            numpy array con los bordes de cada imagen, en el mismo orden
+        """
+        for gray_image in images:
+            yield self.apply(gray_image, engine)
+
+    def close(self):
+        """Espera a que terminen los workers y libera la memoria compartida"""
+        if self._pool is not None:
+            with get_tracer().span("pool_close", cat="pool"):
+                self._pool.close()
+                self._pool.join()
+            self._pool = None
+        self._release_shared()
+
+    def terminate(self):
+        """Detiene los workers de inmediato y libera la memoria compartida"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self._release_shared()
+
+
+def apply_sobel_threaded(gray_image, num_threads=None, engine="vectorized", out=None):
+    """
+    Aplica Sobel repartiendo bloques de filas entre hilos
+
+    Los motores vectorizados de NumPy liberan el GIL, asi que los hilos
+    trabajan en paralelo sobre la misma imagen y escriben en un unico
+    array de salida, sin copiar ni serializar nada. Con engine='loops'
+    los hilos quedan serializados por el GIL.
 
     Args:
         gray_image: numpy array (height, width) en escala de grises
-        num_processes: numero de procesos a usar (None = usar todos los cores)
+        num_threads: numero de hilos (None = usar todos los cores)
+        engine: motor de calculo ('vectorized', 'separable', 'numba' o 'loops')
+        out: numpy array float32 (height, width) donde escribir el resultado
 
     Returns:
         numpy array (height, width) con bordes detectados
     """
-    if num_processes is None:
-        num_processes = cpu_count()
+    if num_threads is None:
+        num_threads = cpu_count()
 
     height, width = gray_image.shape
 
     if height < 3 or width < 3:
         raise ValueError(f"Imagen muy pequena ({height}x{width}). Minimo: 3x3")
 
-    edges = np.zeros_like(gray_image, dtype=np.float32)
+    if engine not in ENGINES:
+        raise ValueError(f"Motor desconocido: {engine}. Opciones: {', '.join(ENGINES)}")
 
-    # Dividir imagen en chunks
-    rows_per_process = height // num_processes
+    edges = prepare_output(gray_image.shape, out)
+    tracer = get_tracer()
 
-    chunks_args = []
-    for i in range(num_processes):
-        start_row = i * rows_per_process
+    def process_rows(row_range):
+        start_row, end_row = row_range
+        start = time.perf_counter() if tracer.enabled else None
+        _sobel_rows(gray_image, edges[start_row:end_row], start_row, end_row, engine)
+        if start is not None:
+            tracer.add("worker_compute", start, time.perf_counter(), cat="worker",
+                       region=[start_row, end_row], queue_wait_s=start - submitted)
 
-        if i < num_processes - 1:
-            end_row = (i + 1) * rows_per_process
-        else:
-            end_row = height
+    with tracer.span("dispatch", schedule="threads", tasks=num_threads):
+        submitted = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            # list() propaga las excepciones de los hilos
+            list(executor.map(process_rows, split_rows(height, num_threads)))
 
-        chunks_args.append((gray_image, start_row, end_row))
+    return edges
 
-    # Procesar en paralelo
-    with Pool(processes=num_processes) as pool:
-        results = pool.map(process_image_chunk, chunks_args)
 
-    # Combinar resultados
-    for start_row, end_row, chunk_edges in results:
-        edges[start_row:end_row, :] = chunk_edges
+def apply_sobel_parallel(gray_image, num_processes=None, engine="loops", out=None,
+                         schedule="strips", tile_shape=None, backend="processes"):
+    """
+    Aplica Sobel usando multiples procesos en paralelo
 
-    return edges
+    La imagen de entrada y la de salida se colocan en memoria compartida,
+    por lo que a cada worker solo se le envia su rango de filas y la
+    imagen no se serializa en ninguna direccion. Para muchas llamadas
+    seguidas conviene usar directamente un SobelExecutor.
 
+    Args:
+        gray_image: numpy array (height, width) en escala de grises
+        num_processes: numero de procesos a usar (None = usar todos los cores)
+        engine: motor de calculo de cada worker ('loops', 'vectorized', 'separable' o 'numba')
+        out: numpy array float32 (height, width) donde escribir el resultado
+             (None = reservar uno nuevo)
+        schedule: 'strips' (una franja por proceso) o 'tiles' (tiles 2-D
+                  con reparto dinamico)
+        tile_shape: tamaño de tile (None = suggest_tile_shape, 'auto' = medir)
+        backend: 'processes' (multiprocessing + memoria compartida) o
+                 'threads' (apply_sobel_threaded; ignora schedule y tile_shape)
 
-def sobel_edge_detection_parallel(image_path, output_path, num_processes=None):
+    Returns:
+        numpy array (height, width) con bordes detectados
+    """
+    height, width = gray_image.shape
+
+    if height < 3 or width < 3:
+        raise ValueError(f"Imagen muy pequena ({height}x{width}). Minimo: 3x3")
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {backend}. Opciones: {', '.join(BACKENDS)}")
+
+    if backend == "threads":
+        return apply_sobel_threaded(gray_image, num_processes, engine, out)
+
+    with SobelExecutor(num_processes, engine, schedule, tile_shape) as executor:
+        return executor.apply(gray_image, out=out)
+
+
+def sobel_edge_detection_parallel(image_path, output_path, num_processes=None,
+                                  engine="loops", backend="processes",
+                                  measure_memory=False, cache=None):
     """
     Pipeline completo de deteccion de bordes paralelo
 
@@ -100,6 +651,11 @@ def sobel_edge_detection_parallel(image_path, output_path, num_processes=None):
         image_path: Ruta de imagen de entrada
         output_path: Ruta donde guardar resultado
         num_processes: numero de procesos paralelos (None = usar todos los cores)
+        engine: motor de calculo de cada worker ('loops', 'vectorized', 'separable' o 'numba')
+        backend: 'processes' o 'threads'
+        measure_memory: reportar la memoria pico de grises + Sobel + normalizacion
+                        (solo del proceso principal)
+        cache: SobelCache donde buscar/guardar las magnitudes (None = sin cache)
 
     Returns:
         float: Tiempo de ejecucion en segundos
@@ -114,27 +670,48 @@ def sobel_edge_detection_parallel(image_path, output_path, num_processes=None):
 
     print("\n" + "="*60)
     print("SOBEL EDGE DETECTION - VERSION PARALELA")
-    print(f"Usando {num_processes} procesos paralelos")
+    if backend == "threads":
+        print(f"Usando {num_processes} hilos")
+    else:
+        print(f"Usando {num_processes} procesos paralelos")
+    print(f"Motor: {engine}")
     print("="*60)
 
     print(f"\nCargando imagen: {image_path}")
-    rgb_image = load_image(image_path)
+    tracer = get_tracer()
+    with tracer.span("load_image"):
+        rgb_image = load_image(image_path)
     print(f"Dimensiones: {rgb_image.shape[0]}x{rgb_image.shape[1]} pixeles")
 
-    print("\nConvirtiendo a escala de grises...")
-    gray_image = rgb_to_grayscale(rgb_image)
-
-    print(f"\nAplicando deteccion de bordes Sobel ({num_processes} cores)...")
-    with Timer("Procesamiento Sobel Paralelo") as timer:
-        edges = apply_sobel_parallel(gray_image, num_processes)
-
-    print("\nNormalizando y guardando resultado...")
-    edges_normalized = normalize_image(edges)
-    save_image(edges_normalized, output_path)
+    with PeakMemory("Grises + Sobel + normalizacion", enabled=measure_memory) as memory:
+        print("\nConvirtiendo a escala de grises...")
+        with tracer.span("grayscale"):
+            gray_image = rgb_to_grayscale(rgb_image)
+
+        print(f"\nAplicando deteccion de bordes Sobel ({num_processes} cores)...")
+        with tracer.span("sobel", engine=engine), Timer("Procesamiento Sobel Paralelo") as timer:
+            if cache is None:
+                edges = apply_sobel_parallel(gray_image, num_processes, engine,
+                                             backend=backend)
+            else:
+                # Misma clave que la version secuencial: el resultado no
+                # depende del numero de procesos ni del backend
+                edges = cache.get_or_compute(
+                    gray_image, lambda: apply_sobel_parallel(gray_image, num_processes,
+                                                             engine, backend=backend),
+                    operator="sobel", engine=engine)
+
+        print("\nNormalizando y guardando resultado...")
+        with tracer.span("normalize"):
+            edges_normalized = normalize_image(edges)
+    with tracer.span("save_image"):
+        save_image(edges_normalized, output_path)
 
     print("\n" + "="*60)
     print(f"PROCESAMIENTO COMPLETADO")
     print(f"Tiempo: {timer.elapsed:.4f} segundos")
+    if memory.peak is not None:
+        print(f"Memoria pico: {format_bytes(memory.peak)}")
     print("="*60 + "\n")
 
     return timer.elapsed
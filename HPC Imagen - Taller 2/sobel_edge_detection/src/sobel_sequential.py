@@ -1,13 +1,18 @@
 """
 Implementacion secuencial del algoritmo de deteccion de bordes Sobel
 """
+import warnings
 import numpy as np
 
 # Manejar imports relativos y absolutos
 try:
-    from .utils import Timer
+    from .utils import Timer, PeakMemory, format_bytes
+    from .instrumentation import get_tracer
+    from .sobel_numba import sobel_block_numba, NUMBA_AVAILABLE
 except ImportError:
-    from utils import Timer
+    from utils import Timer, PeakMemory, format_bytes
+    from instrumentation import get_tracer
+    from sobel_numba import sobel_block_numba, NUMBA_AVAILABLE
 
 SOBEL_KX = np.array([
     [-1, 0, 1],
@@ -21,28 +26,57 @@ SOBEL_KY = np.array([
     [1, 2, 1]
 ], dtype=np.float32)
 
+# Factores 1-D de los kernels: SOBEL_KX = SOBEL_SMOOTH^T * SOBEL_DIFF
+# y SOBEL_KY = SOBEL_DIFF^T * SOBEL_SMOOTH
+SOBEL_SMOOTH = np.array([1, 2, 1], dtype=np.float32)
+SOBEL_DIFF = np.array([-1, 0, 1], dtype=np.float32)
 
-def apply_sobel_sequential(gray_image):
+ENGINES = ("loops", "vectorized", "separable", "numba")
+
+
+class SobelBuffers:
     """
-    Aplica el operador Sobel de forma secuencial
+    Buffers de trabajo reutilizables para el motor separable
 
-    Args:
-        gray_image: numpy array (height, width) en escala de grises
+    Permite procesar un lote de imagenes del mismo tamaño sin volver a
+    reservar memoria en cada llamada.
 
-    Returns:
-        numpy array (height, width) con magnitudes de gradientes
+    Uso:
+        buffers = SobelBuffers(gray_image.shape)
+        edges = np.empty(gray_image.shape, dtype=np.float32)
+        for image in lote:
+            apply_sobel_sequential(image, engine="separable",
+                                   out=edges, buffers=buffers)
     """
-    height, width = gray_image.shape
+    def __init__(self, shape):
+        """
+        Args:
+            shape: tupla (height, width) del bloque de entrada
+        """
+        height, width = shape
+        if height < 3 or width < 3:
+            raise ValueError(f"Bloque muy pequeño ({height}x{width}). Minimo: 3x3")
+
+        self.shape = (height, width)
+        self.src = np.empty((height, width), dtype=np.float32)
+        self.tmp = np.empty((height - 2, width), dtype=np.float32)
+        self.gx = np.empty((height - 2, width - 2), dtype=np.float32)
+        self.gy = np.empty((height - 2, width - 2), dtype=np.float32)
 
-    if height < 3 or width < 3:
-        raise ValueError(f"Imagen muy pequeña ({height}x{width}). Minimo: 3x3")
 
-    edges = np.zeros_like(gray_image, dtype=np.float32)
+def _sobel_block_loops(src, out, buffers=None):
+    """
+    Motor de referencia: recorre cada pixel con ciclos de Python
+
+    Args:
+        src: numpy array (h, w) con el bloque de entrada
+        out: numpy array (h-2, w-2) donde se escriben las magnitudes
+    """
+    height, width = src.shape
 
-    # Procesar cada pixel interior
     for i in range(1, height - 1):
         for j in range(1, width - 1):
-            window = gray_image[i-1:i+2, j-1:j+2]
+            window = src[i-1:i+2, j-1:j+2]
 
             # Calcular gradientes
             gx = 0.0
@@ -53,19 +87,213 @@ def apply_sobel_sequential(gray_image):
                     gy += window[m, n] * SOBEL_KY[m, n]
 
             # Magnitud del gradiente
-            magnitude = np.sqrt(gx**2 + gy**2)
-            edges[i, j] = magnitude
+            out[i-1, j-1] = np.sqrt(gx**2 + gy**2)
+
+
+def _correlate_valid(src, kernel):
+    """
+    Correlacion 'valid' usando aritmetica de slices desplazados
+
+    Cada coeficiente no nulo del kernel suma una vista desplazada de
+    la imagen completa, sin ciclos por pixel. Opera sobre los dos
+    ultimos ejes, por lo que acepta tambien pilas de imagenes.
+
+    Args:
+        src: numpy array float32 (..., h, w)
+        kernel: numpy array (kh, kw)
+
+    Returns:
+        numpy array float32 (..., h-kh+1, w-kw+1)
+    """
+    kh, kw = kernel.shape
+    height = src.shape[-2] - kh + 1
+    width = src.shape[-1] - kw + 1
+
+    result = np.zeros(src.shape[:-2] + (height, width), dtype=np.float32)
+    for m in range(kh):
+        for n in range(kw):
+            weight = kernel[m, n]
+            if weight != 0:
+                result += weight * src[..., m:m+height, n:n+width]
+
+    return result
+
+
+def _sobel_block_vectorized(src, out, buffers=None):
+    """
+    Motor vectorizado: Gx/Gy sobre todo el bloque y un unico hypot
+
+    Args:
+        src: numpy array (..., h, w) con el bloque de entrada
+        out: numpy array float32 (..., h-2, w-2) donde se escriben las magnitudes
+    """
+    src = src.astype(np.float32, copy=False)
+    gx = _correlate_valid(src, SOBEL_KX)
+    gy = _correlate_valid(src, SOBEL_KY)
+    np.hypot(gx, gy, out=out)
+
+
+def _sobel_block_separable(src, out, buffers=None):
+    """
+    Motor separable: dos pasadas 1-D por gradiente sobre buffers reutilizables
+
+    Gx = derivada horizontal de la imagen suavizada en vertical
+    Gy = suavizado horizontal de la derivada vertical
+
+    Args:
+        src: numpy array (h, w) con el bloque de entrada
+        out: numpy array float32 (h-2, w-2) donde se escriben las magnitudes
+        buffers: SobelBuffers del mismo tamaño que src (None = reservar nuevos)
+    """
+    if buffers is None:
+        buffers = SobelBuffers(src.shape)
+    elif buffers.shape != src.shape:
+        raise ValueError(f"Buffers de tamaño {buffers.shape}, se esperaba {src.shape}")
+
+    img = buffers.src
+    tmp = buffers.tmp
+    gx = buffers.gx
+    gy = buffers.gy
+
+    np.copyto(img, src, casting='unsafe')
+
+    # Gx: [1, 2, 1] en vertical, luego [-1, 0, 1] en horizontal
+    np.multiply(img[1:-1], SOBEL_SMOOTH[1], out=tmp)
+    tmp += img[:-2]
+    tmp += img[2:]
+    np.subtract(tmp[:, 2:], tmp[:, :-2], out=gx)
+
+    # Gy: [-1, 0, 1] en vertical, luego [1, 2, 1] en horizontal
+    np.subtract(img[2:], img[:-2], out=tmp)
+    np.multiply(tmp[:, 1:-1], SOBEL_SMOOTH[1], out=gy)
+    gy += tmp[:, :-2]
+    gy += tmp[:, 2:]
+
+    np.hypot(gx, gy, out=out)
+
+
+def _sobel_block_numba(src, out, buffers=None):
+    """
+    Motor compilado con Numba (prange sobre filas)
+
+    Si Numba no esta instalado, o el bloque trae ejes de lote, se usa el
+    motor vectorizado con el mismo resultado y se avisa con un RuntimeWarning.
+
+    Args:
+        src: numpy array (h, w) con el bloque de entrada
+        out: numpy array float32 (h-2, w-2) donde se escriben las magnitudes
+    """
+    if NUMBA_AVAILABLE and src.ndim == 2:
+        sobel_block_numba(src, out)
+        return
+
+    if not NUMBA_AVAILABLE:
+        warnings.warn("Numba no esta instalado; el motor 'numba' usa 'vectorized'",
+                      RuntimeWarning, stacklevel=3)
+    _sobel_block_vectorized(src, out)
+
+
+_BLOCK_ENGINES = {
+    "loops": _sobel_block_loops,
+    "vectorized": _sobel_block_vectorized,
+    "separable": _sobel_block_separable,
+    "numba": _sobel_block_numba,
+}
+
+
+def compute_sobel_block(src, out, engine="loops", buffers=None):
+    """
+    Calcula la magnitud Sobel de los pixeles interiores de un bloque
+
+    El bloque debe incluir el halo de 1 pixel alrededor de la region
+    a calcular, de modo que out tiene 2 filas y 2 columnas menos que src.
+
+    Args:
+        src: numpy array (h, w) con el bloque de entrada
+        out: numpy array float32 (h-2, w-2) donde se escribe el resultado
+        engine: motor de calculo ('loops', 'vectorized', 'separable' o 'numba')
+        buffers: SobelBuffers para el motor separable (opcional)
+
+    Raises:
+        ValueError: Si el motor no existe
+    """
+    if engine not in _BLOCK_ENGINES:
+        raise ValueError(f"Motor desconocido: {engine}. Opciones: {', '.join(ENGINES)}")
+
+    _BLOCK_ENGINES[engine](src, out, buffers)
+
+
+def prepare_output(shape, out=None):
+    """
+    Devuelve el array de salida para una imagen, reutilizando out si se pasa
+
+    Args:
+        shape: tupla (height, width) de la imagen
+        out: numpy array float32 del mismo tamaño o None
+
+    Returns:
+        numpy array float32 (height, width) con los bordes en cero
+
+    Raises:
+        ValueError: Si out no tiene la forma o el tipo esperado
+    """
+    if out is None:
+        return np.zeros(shape, dtype=np.float32)
+
+    if out.shape != tuple(shape) or out.dtype != np.float32:
+        raise ValueError(f"out debe ser float32 de forma {tuple(shape)}. "
+                         f"Recibido: {out.dtype} {out.shape}")
+
+    # Solo el marco exterior necesita limpiarse; el interior se sobreescribe
+    out[0, :] = 0
+    out[-1, :] = 0
+    out[:, 0] = 0
+    out[:, -1] = 0
+    return out
+
+
+def apply_sobel_sequential(gray_image, engine="loops", out=None, buffers=None):
+    """
+    Aplica el operador Sobel de forma secuencial
+
+    Args:
+        gray_image: numpy array (height, width) en escala de grises
+        engine: motor de calculo ('loops' recorre pixel a pixel,
+                'vectorized' opera con slices desplazados de NumPy,
+                'separable' aplica dos pasadas 1-D por gradiente,
+                'numba' compila el stencil con Numba)
+        out: numpy array float32 (height, width) donde escribir el resultado
+             (None = reservar uno nuevo)
+        buffers: SobelBuffers de la forma de la imagen, para reutilizar
+                 la memoria de trabajo del motor separable entre llamadas
+
+    Returns:
+        numpy array (height, width) con magnitudes de gradientes
+    """
+    height, width = gray_image.shape
+
+    if height < 3 or width < 3:
+        raise ValueError(f"Imagen muy pequeña ({height}x{width}). Minimo: 3x3")
+
+    edges = prepare_output(gray_image.shape, out)
+
+    # Procesar cada pixel interior (los bordes quedan en cero)
+    compute_sobel_block(gray_image, edges[1:-1, 1:-1], engine, buffers)
 
     return edges
 
 
-def sobel_edge_detection_sequential(image_path, output_path):
+def sobel_edge_detection_sequential(image_path, output_path, engine="loops",
+                                    measure_memory=False, cache=None):
     """
     Pipeline completo de deteccion de bordes secuencial
 
     Args:
         image_path: Ruta de imagen de entrada
         output_path: Ruta donde guardar resultado
+        engine: motor de calculo ('loops', 'vectorized', 'separable' o 'numba')
+        measure_memory: reportar la memoria pico de grises + Sobel + normalizacion
+        cache: SobelCache donde buscar/guardar las magnitudes (None = sin cache)
 
     Returns:
         float: Tiempo de ejecucion en segundos
@@ -77,26 +305,40 @@ def sobel_edge_detection_sequential(image_path, output_path):
 
     print("\n" + "="*60)
     print("SOBEL EDGE DETECTION - VERSION SECUENCIAL")
+    print(f"Motor: {engine}")
     print("="*60)
 
     print(f"\nCargando imagen: {image_path}")
-    rgb_image = load_image(image_path)
+    tracer = get_tracer()
+    with tracer.span("load_image"):
+        rgb_image = load_image(image_path)
     print(f"Dimensiones: {rgb_image.shape[0]}x{rgb_image.shape[1]} pixeles")
 
-    print("\nConvirtiendo a escala de grises...")
-    gray_image = rgb_to_grayscale(rgb_image)
+    with PeakMemory("Grises + Sobel + normalizacion", enabled=measure_memory) as memory:
+        print("\nConvirtiendo a escala de grises...")
+        with tracer.span("grayscale"):
+            gray_image = rgb_to_grayscale(rgb_image)
 
-    print("\nAplicando deteccion de bordes Sobel...")
-    with Timer("Procesamiento Sobel") as timer:
-        edges = apply_sobel_sequential(gray_image)
+        print("\nAplicando deteccion de bordes Sobel...")
+        with tracer.span("sobel", engine=engine), Timer("Procesamiento Sobel") as timer:
+            if cache is None:
+                edges = apply_sobel_sequential(gray_image, engine)
+            else:
+                edges = cache.get_or_compute(
+                    gray_image, lambda: apply_sobel_sequential(gray_image, engine),
+                    operator="sobel", engine=engine)
 
-    print("\nNormalizando y guardando resultado...")
-    edges_normalized = normalize_image(edges)
-    save_image(edges_normalized, output_path)
+        print("\nNormalizando y guardando resultado...")
+        with tracer.span("normalize"):
+            edges_normalized = normalize_image(edges)
+    with tracer.span("save_image"):
+        save_image(edges_normalized, output_path)
 
     print("\n" + "="*60)
     print(f"PROCESAMIENTO COMPLETADO")
     print(f"Tiempo: {timer.elapsed:.4f} segundos")
+    if memory.peak is not None:
+        print(f"Memoria pico: {format_bytes(memory.peak)}")
     print("="*60 + "\n")
 
     return timer.elapsed
@@ -0,0 +1,301 @@
+"""
+Deteccion de bordes Sobel por franjas (out-of-core)
+Procesa imagenes mas grandes que la RAM leyendo y escribiendo por bandas de filas
+"""
+import os
+import numpy as np
+from PIL import Image
+
+# Manejar imports relativos y absolutos
+try:
+    from .utils import Timer, rgb_to_grayscale
+    from .sobel_sequential import compute_sobel_block, SobelBuffers, ENGINES
+except ImportError:
+    from utils import Timer, rgb_to_grayscale
+    from sobel_sequential import compute_sobel_block, SobelBuffers, ENGINES
+
+
+class RawBandReader:
+    """
+    Lee bandas de filas de un archivo con pixeles uint8 sin comprimir
+
+    Cada lectura hace seek + read de solo las filas pedidas, asi que la
+    memoria usada es la de la banda y no la del archivo completo.
+    """
+    def __init__(self, path, offset, shape):
+        """
+        Args:
+            path: ruta del archivo
+            offset: byte donde empiezan los pixeles
+            shape: (height, width) o (height, width, 3)
+        """
+        self.path = path
+        self.offset = offset
+        self.shape = tuple(shape)
+        self._row_bytes = int(np.prod(self.shape[1:]))
+
+    def read(self, start_row, end_row):
+        """Devuelve las filas [start_row, end_row) como array uint8"""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset + start_row * self._row_bytes)
+            data = np.fromfile(f, dtype=np.uint8, count=(end_row - start_row) * self._row_bytes)
+        return data.reshape((end_row - start_row,) + self.shape[1:])
+
+
+class PILBandReader:
+    """
+    Lee bandas de una imagen con formato comprimido (JPEG, PNG...) via PIL
+
+    PIL decodifica la imagen completa en la primera lectura, por lo que con
+    estos formatos la memoria queda acotada por la imagen decodificada y no
+    por la banda. Para imagenes mas grandes que la RAM conviene convertirlas
+    antes a .npy, PPM/PGM o TIFF sin comprimir.
+    """
+    def __init__(self, path):
+        self._image = Image.open(path)
+        if self._image.mode not in ("L", "RGB"):
+            self._image = self._image.convert("RGB")
+        width, height = self._image.size
+        channels = () if self._image.mode == "L" else (3,)
+        self.shape = (height, width) + channels
+
+    def read(self, start_row, end_row):
+        """Devuelve las filas [start_row, end_row) como array uint8"""
+        band = self._image.crop((0, start_row, self.shape[1], end_row))
+        return np.asarray(band)
+
+
+def open_band_reader(path):
+    """
+    Elige el lector por bandas adecuado para un archivo de entrada
+
+    Los archivos .npy (uint8, orden C) y las imagenes sin comprimir que PIL
+    describe con un unico tile 'raw' (PPM/PGM, TIFF sin compresion) se leen
+    directamente del disco por bandas. El resto de formatos usa PILBandReader.
+
+    Args:
+        path: ruta de la imagen (.npy con forma (h, w) o (h, w, 3), o imagen)
+
+    Returns:
+        lector con atributo shape y metodo read(start_row, end_row)
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+        ValueError: Si el .npy no es uint8 en orden C con 2 o 3 dimensiones
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No se encontró la imagen en: {path}")
+
+    if path.endswith(".npy"):
+        with open(path, "rb") as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+
+        valid_shape = len(shape) == 2 or (len(shape) == 3 and shape[2] == 3)
+        if dtype != np.uint8 or fortran_order or not valid_shape:
+            raise ValueError(f"El .npy debe ser uint8 (h, w) o (h, w, 3) en orden C. "
+                             f"Recibido: {dtype} {shape}")
+        return RawBandReader(path, offset, shape)
+
+    with Image.open(path) as img:
+        tile = img.tile[0] if len(img.tile) == 1 else None
+        if tile is not None and tile[0] == "raw" and img.mode in ("L", "RGB"):
+            args = tile[3] if isinstance(tile[3], tuple) else (tile[3], 0, 1)
+            rawmode, stride, orientation = (tuple(args) + (0, 1))[:3]
+            full_tile = tuple(tile[1]) == (0, 0) + img.size
+            if rawmode == img.mode and stride == 0 and orientation == 1 and full_tile:
+                width, height = img.size
+                channels = () if img.mode == "L" else (3,)
+                return RawBandReader(path, tile[2], (height, width) + channels)
+
+    return PILBandReader(path)
+
+
+class BandWriter:
+    """
+    Escribe una matriz (height, width) fila a fila en un .npy o archivo raw
+
+    El archivo se crea con su tamaño final y cada banda se escribe con
+    seek + write, sin mantener la matriz completa en memoria.
+    """
+    def __init__(self, path, shape, dtype):
+        """
+        Args:
+            path: ruta de salida (.npy incluye cabecera; otra extension = raw)
+            shape: tupla (height, width)
+            dtype: tipo de los pixeles de salida
+        """
+        self.path = path
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._row_bytes = self.shape[1] * self.dtype.itemsize
+
+        if path.endswith(".npy"):
+            header = np.lib.format.open_memmap(path, mode="w+", dtype=self.dtype,
+                                               shape=self.shape)
+            self.offset = header.offset
+            del header
+        else:
+            self.offset = 0
+            with open(path, "wb") as f:
+                f.truncate(self.shape[0] * self._row_bytes)
+
+    def write(self, start_row, band):
+        """Escribe band (filas consecutivas) a partir de start_row"""
+        with open(self.path, "r+b") as f:
+            f.seek(self.offset + start_row * self._row_bytes)
+            np.ascontiguousarray(band, dtype=self.dtype).tofile(f)
+
+
+def _iter_edge_bands(reader, band_rows, engine):
+    """
+    Recorre la imagen por bandas y produce la magnitud Sobel de cada una
+
+    Cada banda se lee con una fila de solapamiento arriba y abajo, se
+    convierte a grises y se calcula con compute_sobel_block. El array
+    producido se reutiliza entre bandas: hay que consumirlo antes de
+    pedir la siguiente.
+
+    Yields:
+        tupla (start_row, edges_band) con edges_band float32 (rows, width)
+    """
+    height, width = reader.shape[:2]
+    band_out = np.empty((band_rows, width), dtype=np.float32)
+    buffers = {}
+
+    for start_row in range(0, height, band_rows):
+        end_row = min(start_row + band_rows, height)
+        read_start = max(start_row - 1, 0)
+        read_end = min(end_row + 1, height)
+
+        band = reader.read(read_start, read_end)
+        gray_band = band if band.ndim == 2 else rgb_to_grayscale(band)
+
+        out = band_out[:end_row - start_row]
+        out[:] = 0
+
+        # Filas interiores de la banda (las filas 0 y height-1 quedan en cero)
+        first = max(1, start_row)
+        last = min(end_row, height - 1)
+        if last > first:
+            src = gray_band[first - 1 - read_start:last + 1 - read_start]
+            if engine == "separable" and src.shape not in buffers:
+                buffers[src.shape] = SobelBuffers(src.shape)
+            compute_sobel_block(src, out[first - start_row:last - start_row, 1:-1],
+                                engine, buffers.get(src.shape))
+
+        yield start_row, out
+
+
+def stream_sobel(input_path, output_path, band_rows=256, engine="vectorized",
+                 normalize=True):
+    """
+    Aplica Sobel a una imagen por bandas, escribiendo la salida en disco
+
+    La memoria maxima depende de band_rows y del ancho de la imagen, no
+    de su altura. Con normalize=True se hacen dos pasadas: la primera
+    solo calcula el minimo y maximo global y la segunda recalcula cada
+    banda y la escribe normalizada a uint8 (mismo resultado que
+    normalize_image). Con normalize=False se escriben las magnitudes float32.
+
+    Args:
+        input_path: imagen de entrada (ver open_band_reader)
+        output_path: archivo de salida (.npy o raw)
+        band_rows: filas por banda
+        engine: motor de calculo ('vectorized', 'separable', 'numba' o 'loops')
+        normalize: escribir uint8 normalizado (True) o float32 (False)
+
+    Returns:
+        dict con shape, min, max y numero de bandas procesadas
+
+    Raises:
+        ValueError: Si la imagen es muy pequeña, band_rows < 1 o el motor no existe
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Motor desconocido: {engine}. Opciones: {', '.join(ENGINES)}")
+
+    if band_rows < 1:
+        raise ValueError(f"band_rows debe ser positivo. Recibido: {band_rows}")
+
+    reader = open_band_reader(input_path)
+    height, width = reader.shape[:2]
+
+    if height < 3 or width < 3:
+        raise ValueError(f"Imagen muy pequeña ({height}x{width}). Minimo: 3x3")
+
+    min_val = np.inf
+    max_val = -np.inf
+    num_bands = 0
+
+    if normalize:
+        # Primera pasada: reduccion de minimo y maximo
+        for _, edges_band in _iter_edge_bands(reader, band_rows, engine):
+            min_val = min(min_val, float(edges_band.min()))
+            max_val = max(max_val, float(edges_band.max()))
+            num_bands += 1
+
+        writer = BandWriter(output_path, (height, width), np.uint8)
+        value_range = np.float32(max_val - min_val)
+        for start_row, edges_band in _iter_edge_bands(reader, band_rows, engine):
+            if value_range == 0:
+                writer.write(start_row, np.zeros(edges_band.shape, dtype=np.uint8))
+                continue
+            # Mismas operaciones que normalize_image, pero en sitio
+            edges_band -= np.float32(min_val)
+            edges_band /= value_range
+            edges_band *= np.float32(255.0)
+            writer.write(start_row, edges_band.astype(np.uint8))
+    else:
+        writer = BandWriter(output_path, (height, width), np.float32)
+        for start_row, edges_band in _iter_edge_bands(reader, band_rows, engine):
+            min_val = min(min_val, float(edges_band.min()))
+            max_val = max(max_val, float(edges_band.max()))
+            writer.write(start_row, edges_band)
+            num_bands += 1
+
+    return {
+        'shape': (height, width),
+        'min': min_val,
+        'max': max_val,
+        'bands': num_bands,
+    }
+
+
+def sobel_edge_detection_streaming(image_path, output_path, band_rows=256,
+                                   engine="vectorized"):
+    """
+    Pipeline de deteccion de bordes por bandas para imagenes grandes
+
+    Args:
+        image_path: Ruta de imagen de entrada
+        output_path: Ruta del .npy (o archivo raw) de salida en uint8
+        band_rows: filas por banda
+        engine: motor de calculo
+
+    Returns:
+        float: Tiempo de ejecucion en segundos
+    """
+    print("\n" + "="*60)
+    print("SOBEL EDGE DETECTION - VERSION POR BANDAS (OUT-OF-CORE)")
+    print(f"Motor: {engine} | Filas por banda: {band_rows}")
+    print("="*60)
+
+    print(f"\nProcesando imagen: {image_path}")
+    with Timer("Procesamiento Sobel por bandas") as timer:
+        stats = stream_sobel(image_path, output_path, band_rows, engine)
+
+    height, width = stats['shape']
+    print(f"Dimensiones: {height}x{width} pixeles")
+    print(f"Bandas procesadas: {stats['bands']}")
+    print(f"Resultado guardado en: {output_path}")
+
+    print("\n" + "="*60)
+    print(f"PROCESAMIENTO COMPLETADO")
+    print(f"Tiempo: {timer.elapsed:.4f} segundos")
+    print("="*60 + "\n")
+
+    return timer.elapsed
@@ -4,31 +4,71 @@ Utilidades para procesamiento de imágenes
 from PIL import Image
 import numpy as np
 import time
+import tracemalloc
 
 
-def load_image(image_path):
+DECODE_MODES = ("RGB", "L")
+
+
+def load_image(image_path, mode="RGB", scale=1):
     """
     Carga una imagen y la convierte a array numpy RGB
 
+    Con mode='L' se decodifica directamente a luminancia: en JPEG el
+    decodificador entrega solo el canal Y (draft), sin reconstruir el
+    color. Con scale > 1 se decodifica reducida a (height // scale,
+    width // scale): en JPEG la reduccion 1/2, 1/4 o 1/8 la hace el propio
+    decodificador (escalado DCT) y el resto se promedia por area.
+
+    El array envuelve los bytes que entrega Pillow (np.asarray), sin la
+    copia adicional de np.array; por eso es de solo lectura. Pillow no
+    expone el buffer interno del decodificador, asi que esa copia a bytes
+    es inevitable.
+
+    La luminancia del decodificador puede diferir en algunos niveles de
+    rgb_to_grayscale(load_image(path)), sobre todo en JPEG con croma
+    submuestreado.
+
     Args:
         image_path: Ruta de la imagen
+        mode: 'RGB' (height, width, 3) o 'L' (height, width)
+        scale: factor entero de reduccion (1 = tamaño original)
 
     Returns:
-        numpy array con la imagen RGB (height, width, 3)
+        numpy array uint8 de solo lectura con la imagen RGB (height, width, 3)
+        o en grises (height, width)
 
     Raises:
         FileNotFoundError: Si la imagen no existe
         IOError: Si hay un error al cargar la imagen
+        ValueError: Si mode o scale no son validos
     """
+    if mode not in DECODE_MODES:
+        raise ValueError(f"Modo desconocido: {mode}. Opciones: {', '.join(DECODE_MODES)}")
+
+    if scale < 1:
+        raise ValueError(f"scale debe ser positivo. Recibido: {scale}")
+
     try:
         # Abrir imagen con PIL
         img = Image.open(image_path)
+        width, height = img.size
+        target = (max(1, width // scale), max(1, height // scale))
 
-        # Convertir a RGB (por si está en otro modo como RGBA o escala de grises)
-        img_rgb = img.convert('RGB')
+        # Solo tiene efecto en JPEG: elige modo y escala del decodificador
+        img.draft(mode, target)
 
-        # Convertir a numpy array
-        img_array = np.array(img_rgb)
+        # Lo que falte (otros formatos, factores que no son 2, 4 u 8 o
+        # redondeos del decodificador) se promedia por area
+        if img.size != target:
+            img = img.resize(target, Image.Resampling.BOX)
+
+        # Convertir al modo pedido (por si está en otro modo como RGBA o paleta)
+        if img.mode != mode:
+            img = img.convert(mode)
+
+        # Convertir a numpy array sin copiar los bytes de Pillow
+        img_array = np.asarray(img)
 
         return img_array
 
@@ -38,25 +78,120 @@ def load_image(image_path):
         raise IOError(f"Error al cargar la imagen: {str(e)}")
 
 
-def rgb_to_grayscale(rgb_image):
+def load_grayscale(image_path, scale=1):
+    """
+    Carga una imagen decodificando directamente a escala de grises
+
+    Atajo de load_image(image_path, mode='L', scale=scale).
+    """
+    return load_image(image_path, mode="L", scale=scale)
+
+
+# Pesos de la formula estandar en punto fijo Q16: enteros que suman 2^16,
+# asi que un pixel blanco da exactamente 255 y no hace falta np.clip.
+# Frente al calculo en float difiere en a lo sumo 1 nivel (en 9918 de las
+# 2^24 combinaciones RGB, comprobado de forma exhaustiva)
+GRAY_WEIGHTS_Q16 = (19595, 38470, 7471)
+GRAY_SHIFT = 16
+
+# Pixeles por bloque en el camino de punto fijo: los temporales uint32
+# (256 KB cada uno) caben en cache y no crecen con la imagen
+_GRAY_BLOCK_PIXELS = 1 << 16
+
+CHANNEL_ORDERS = ("RGB", "BGR")
+GRAY_METHODS = ("float", "fixed")
+
+
+def _grayscale_fixed(pixels, gray, weights):
+    """
+    Conversion en punto fijo sobre pixeles (n, 3) uint8 escribiendo en gray (n,)
+
+    Procesa bloques de _GRAY_BLOCK_PIXELS reutilizando dos buffers uint32.
+    """
+    w0, w1, w2 = weights
+    count = pixels.shape[0]
+    block = min(count, _GRAY_BLOCK_PIXELS)
+    acc = np.empty(block, dtype=np.uint32)
+    tmp = np.empty(block, dtype=np.uint32)
+
+    for start in range(0, count, block):
+        end = min(start + block, count)
+        n = end - start
+        chunk = pixels[start:end]
+        a = acc[:n]
+        t = tmp[:n]
+
+        np.multiply(chunk[:, 0], w0, out=a, dtype=np.uint32)
+        np.multiply(chunk[:, 1], w1, out=t, dtype=np.uint32)
+        a += t
+        np.multiply(chunk[:, 2], w2, out=t, dtype=np.uint32)
+        a += t
+        a >>= GRAY_SHIFT
+        gray[start:end] = a
+
+
+def rgb_to_grayscale(rgb_image, out=None, order="RGB", method="float"):
     """
     Convierte imagen RGB a escala de grises usando fórmula estándar
 
     La fórmula estándar pondera los canales según la percepción humana:
     Grayscale = 0.299*R + 0.587*G + 0.114*B
 
+    Con method='fixed' y entrada uint8 se usan los pesos enteros
+    GRAY_WEIGHTS_Q16 y un desplazamiento de 16 bits, por bloques, sin
+    temporales float64 del tamaño de la imagen. Si la imagen es contigua en
+    el ultimo eje (h, w, 3) se recorre como una lista plana de pixeles. El
+    resultado difiere del de 'float' en a lo sumo 1 nivel, asi que es
+    opcional. Entradas que no son uint8 usan siempre el calculo en float.
+
     Args:
         rgb_image: numpy array (height, width, 3) con valores RGB 0-255
+        out: numpy array uint8 (height, width) donde escribir el resultado
+             (None = reservar uno nuevo)
+        order: orden de los canales, 'RGB' o 'BGR' (frames de OpenCV)
+        method: 'float' (referencia en float64, por defecto) o 'fixed' (enteros)
 
     Returns:
         numpy array (height, width) con valores 0-255 en escala de grises
 
     Raises:
-        ValueError: Si la imagen no tiene 3 canales
+        ValueError: Si la imagen no tiene 3 canales, out no es valido o
+                    order/method no existen
     """
     if len(rgb_image.shape) != 3 or rgb_image.shape[2] != 3:
         raise ValueError(f"La imagen debe tener 3 canales RGB. Forma actual: {rgb_image.shape}")
 
+    if order not in CHANNEL_ORDERS:
+        raise ValueError(f"Orden de canales desconocido: {order}. "
+                         f"Opciones: {', '.join(CHANNEL_ORDERS)}")
+
+    if method not in GRAY_METHODS:
+        raise ValueError(f"Metodo desconocido: {method}. Opciones: {', '.join(GRAY_METHODS)}")
+
+    height, width = rgb_image.shape[:2]
+
+    if out is None:
+        out = np.empty((height, width), dtype=np.uint8)
+    elif out.shape != (height, width) or out.dtype != np.uint8:
+        raise ValueError(f"out debe ser uint8 de forma {(height, width)}. "
+                         f"Recibido: {out.dtype} {out.shape}")
+
+    # Indices de los canales R, G, B dentro del ultimo eje
+    channels = (0, 1, 2) if order == "RGB" else (2, 1, 0)
+
+    if method == "fixed" and rgb_image.dtype == np.uint8:
+        weights = [0, 0, 0]
+        for channel, weight in zip(channels, GRAY_WEIGHTS_Q16):
+            weights[channel] = weight
+
+        if rgb_image.flags.c_contiguous and out.flags.c_contiguous:
+            # Camino rapido: (h, w, 3) contiguo se ve como (h*w, 3) sin copiar
+            _grayscale_fixed(rgb_image.reshape(-1, 3), out.reshape(-1), weights)
+        else:
+            for row in range(height):
+                _grayscale_fixed(rgb_image[row], out[row], weights)
+        return out
+
     # Coeficientes estándar para conversión RGB -> Grayscale
     # Estos valores reflejan la sensibilidad del ojo humano a diferentes colores
     r_weight = 0.299
@@ -64,15 +199,17 @@ def rgb_to_grayscale(rgb_image):
     b_weight = 0.114
 
     # Aplicar la fórmula de conversión
-    gray = (rgb_image[:, :, 0] * r_weight +
-            rgb_image[:, :, 1] * g_weight +
-            rgb_image[:, :, 2] * b_weight)
+    r, g, b = channels
+    gray = (rgb_image[:, :, r] * r_weight +
+            rgb_image[:, :, g] * g_weight +
+            rgb_image[:, :, b] * b_weight)
 
     # Asegurar que los valores estén en el rango 0-255
     gray = np.clip(gray, 0, 255)
 
     # Convertir a uint8 para ahorrar memoria
-    return gray.astype(np.uint8)
+    out[:] = gray
+    return out
 
 
 def save_image(image_array, output_path):
@@ -175,3 +312,70 @@ class Timer:
         self.end = time.time()
         self.elapsed = self.end - self.start
         print(f"{self.name} took {self.elapsed:.4f} seconds")
+
+
+class PeakMemory:
+    """
+    Context manager para medir la memoria pico reservada en un bloque
+
+    Usa tracemalloc, que registra tanto objetos de Python como los
+    buffers de los arrays de NumPy. Solo mide el proceso actual (no los
+    workers de multiprocessing). Con enabled=False no hace nada y no
+    tiene costo.
+
+    Uso:
+        with PeakMemory("Pipeline") as memory:
+            procesar()
+
+        # memory.peak contiene los bytes pico por encima del inicio del bloque
+    """
+    def __init__(self, name="Operation", enabled=True):
+        """
+        Args:
+            name: Nombre descriptivo de la operación a medir
+            enabled: Si es False el bloque no se mide
+        """
+        self.name = name
+        self.enabled = enabled
+        self.peak = None
+        self._baseline = 0
+        self._started = False
+
+    def __enter__(self):
+        """Inicia (o reinicia) el registro de memoria"""
+        if self.enabled:
+            self._started = not tracemalloc.is_tracing()
+            if self._started:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *args):
+        """Calcula e imprime la memoria pico del bloque"""
+        if not self.enabled:
+            return
+
+        _, peak = tracemalloc.get_traced_memory()
+        if self._started:
+            tracemalloc.stop()
+        self.peak = peak - self._baseline
+        print(f"{self.name} peak memory: {format_bytes(self.peak)}")
+
+
+def format_bytes(num_bytes):
+    """
+    Formatea una cantidad de bytes en la unidad mas legible
+
+    Args:
+        num_bytes: cantidad de bytes
+
+    Returns:
+        str, por ejemplo '12.50 MB'
+    """
+    value = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.2f} {unit}"
+        value /= 1024
@@ -3,15 +3,40 @@ Tests unitarios para los algoritmos de deteccion de bordes Sobel
 """
 import sys
 import os
+import csv
+import json
+import warnings
+import asyncio
+import io
 import numpy as np
 import pytest
+from PIL import Image
 
 # Agregar el directorio raiz al path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from src.utils import load_image, rgb_to_grayscale, normalize_image, save_image
-from src.sobel_sequential import apply_sobel_sequential, SOBEL_KX, SOBEL_KY
-from src.sobel_parallel import apply_sobel_parallel, process_image_chunk
+from src.utils import (load_image, load_grayscale, rgb_to_grayscale, normalize_image,
+                       save_image)
+from src.sobel_sequential import (apply_sobel_sequential, compute_sobel_block,
+                                  SobelBuffers, SOBEL_KX, SOBEL_KY, _correlate_valid)
+from src.sobel_parallel import (apply_sobel_parallel, process_image_chunk,
+                                process_shared_chunk, SobelExecutor,
+                                split_tiles, suggest_tile_shape,
+                                apply_sobel_threaded)
+from src.sobel_streaming import stream_sobel, open_band_reader, RawBandReader
+from src.sobel_fused import fused_sobel_edges
+from src.batch import run_batch, find_images
+from src.cache import SobelCache
+from src.pyramid import ImagePyramid, downsample_2x
+from src.service import SobelService, stack_sobel, http_request, load_test
+from src.regression import (GOLDEN_CASES, REGRESSION_ENGINES, generate_fixtures,
+                            load_fixtures, run_regression)
+from src.sobel_numba import NUMBA_AVAILABLE
+from src.sobel_integer import (apply_sobel_integer, check_accuracy, sobel_gradients_int16,
+                               MAGNITUDES)
+from src.kernels import KERNELS, compute_gradients, get_kernel
+from src.instrumentation import Tracer, tracing, get_tracer, NULL_TRACER
+from src.benchmarking import summarize, time_case, run_suite, save_results, compare_results
 
 
 class TestUtils:
@@ -48,6 +73,74 @@ class TestUtils:
         with pytest.raises(ValueError):
             rgb_to_grayscale(invalid_image)
 
+    def test_rgb_to_grayscale_fixed_matches_float(self):
+        """Verifica que el punto fijo difiere a lo sumo en 1 del calculo en float
+        para todas las combinaciones RGB"""
+        values = np.arange(256, dtype=np.uint8)
+        r, g, b = np.meshgrid(values, values, values, indexing="ij")
+        rgb_image = np.stack([r, g, b], axis=-1).reshape(4096, 4096, 3)
+
+        fixed = rgb_to_grayscale(rgb_image, method="fixed").astype(np.int16)
+        reference = rgb_to_grayscale(rgb_image).astype(np.int16)
+
+        assert np.max(np.abs(fixed - reference)) <= 1
+        assert fixed[-1, -1] == 255, "El blanco no da 255"
+        # El metodo por defecto sigue siendo la formula original en float
+        sample = rgb_image[::16]
+        original = np.clip(sample[:, :, 0] * 0.299 + sample[:, :, 1] * 0.587 +
+                           sample[:, :, 2] * 0.114, 0, 255).astype(np.uint8)
+        assert np.array_equal(reference[::16], original)
+
+    def test_rgb_to_grayscale_out_and_bgr(self):
+        """Verifica out=, el orden BGR y las entradas no contiguas"""
+        rgb_image = np.random.randint(0, 256, (40, 60, 3), dtype=np.uint8)
+        bgr_image = np.ascontiguousarray(rgb_image[:, :, ::-1])
+
+        for method in ("float", "fixed"):
+            expected = rgb_to_grayscale(rgb_image, method=method)
+
+            out = np.empty((40, 60), dtype=np.uint8)
+            assert rgb_to_grayscale(rgb_image, out=out, method=method) is out
+            assert np.array_equal(out, expected)
+
+            assert np.array_equal(rgb_to_grayscale(bgr_image, order="BGR", method=method),
+                                  expected)
+            assert np.array_equal(rgb_to_grayscale(rgb_image[:, :, ::-1], order="BGR",
+                                                   method=method), expected)
+            assert np.array_equal(rgb_to_grayscale(rgb_image[::2, 1::3], method=method),
+                                  expected[::2, 1::3])
+
+        with pytest.raises(ValueError):
+            rgb_to_grayscale(rgb_image, out=np.empty((40, 60), dtype=np.float32))
+        with pytest.raises(ValueError):
+            rgb_to_grayscale(rgb_image, order="GBR")
+
+    def test_load_image_gray_and_scale(self, tmp_path):
+        """Verifica la decodificacion directa a grises y a escala reducida"""
+        rgb_image = np.random.randint(0, 256, (64, 90, 3), dtype=np.uint8)
+        png_path = str(tmp_path / "input.png")
+        jpg_path = str(tmp_path / "input.jpg")
+        save_image(rgb_image, png_path)
+        save_image(rgb_image, jpg_path)
+
+        loaded = load_image(png_path)
+        assert np.array_equal(loaded, rgb_image)
+        assert not loaded.flags.writeable, "Se esperaba el buffer de Pillow sin copiar"
+
+        # Luminancia de Pillow: mismos pesos, redondeando en vez de truncar
+        gray = load_grayscale(png_path)
+        assert gray.shape == (64, 90) and gray.dtype == np.uint8
+        assert np.max(np.abs(gray.astype(np.int16) - rgb_to_grayscale(rgb_image))) <= 1
+
+        for path in (png_path, jpg_path):
+            assert load_grayscale(path, scale=4).shape == (16, 22)
+            assert load_image(path, scale=3).shape == (21, 30, 3)
+
+        with pytest.raises(ValueError):
+            load_image(png_path, mode="CMYK")
+        with pytest.raises(ValueError):
+            load_image(png_path, scale=0)
+
     def test_normalize_image_range(self):
         """Verifica que normalize_image produce valores en rango 0-255"""
         # Imagen con valores fuera de rango
@@ -158,6 +251,88 @@ class TestSobelSequential:
             apply_sobel_sequential(gray_image)
 
 
+class TestSobelVectorized:
+    """Tests para el motor vectorizado"""
+
+    def test_vectorized_matches_loops(self):
+        """Verifica que el motor vectorizado coincide con el de ciclos"""
+        gray_image = np.random.randint(0, 255, (37, 53), dtype=np.uint8)
+
+        edges_loops = apply_sobel_sequential(gray_image, engine="loops")
+        edges_vec = apply_sobel_sequential(gray_image, engine="vectorized")
+
+        assert edges_vec.dtype == np.float32, f"Tipo incorrecto: {edges_vec.dtype}"
+        assert np.allclose(edges_loops, edges_vec, rtol=1e-6, atol=0), "Motores difieren"
+
+    def test_vectorized_minimum_size(self):
+        """Verifica que el motor vectorizado funciona con imagen 3x3"""
+        gray_image = np.random.randint(0, 255, (3, 3), dtype=np.uint8)
+
+        edges = apply_sobel_sequential(gray_image, engine="vectorized")
+
+        assert edges.shape == (3, 3), "No funciona con imagen 3x3"
+        assert np.all(edges[0, :] == 0) and np.all(edges[:, 0] == 0), "Bordes no son cero"
+
+    def test_compute_sobel_block_unknown_engine(self):
+        """Verifica que se rechaza un motor desconocido"""
+        gray_image = np.zeros((5, 5), dtype=np.uint8)
+        out = np.zeros((3, 3), dtype=np.float32)
+
+        with pytest.raises(ValueError):
+            compute_sobel_block(gray_image, out, engine="gpu")
+
+
+class TestSobelSeparable:
+    """Tests para el motor separable con buffers preasignados"""
+
+    def test_separable_matches_loops(self):
+        """Verifica que el motor separable coincide con el de ciclos"""
+        gray_image = np.random.randint(0, 255, (41, 29), dtype=np.uint8)
+
+        edges_loops = apply_sobel_sequential(gray_image, engine="loops")
+        edges_sep = apply_sobel_sequential(gray_image, engine="separable")
+
+        assert np.allclose(edges_loops, edges_sep, rtol=1e-6, atol=0), "Motores difieren"
+
+    def test_separable_reuses_buffers(self):
+        """Verifica que un lote reutiliza out y los buffers de trabajo"""
+        shape = (32, 48)
+        out = np.full(shape, -1, dtype=np.float32)
+        buffers = SobelBuffers(shape)
+
+        for _ in range(3):
+            gray_image = np.random.randint(0, 255, shape, dtype=np.uint8)
+            edges = apply_sobel_sequential(gray_image, engine="separable",
+                                           out=out, buffers=buffers)
+
+            assert edges is out, "No se escribio en el buffer de salida"
+            expected = apply_sobel_sequential(gray_image, engine="vectorized")
+            assert np.allclose(edges, expected, rtol=1e-6, atol=0), "Resultado incorrecto"
+
+    def test_separable_rejects_wrong_buffers(self):
+        """Verifica que se rechazan buffers u out de otro tamaño"""
+        gray_image = np.random.randint(0, 255, (20, 20), dtype=np.uint8)
+
+        with pytest.raises(ValueError):
+            apply_sobel_sequential(gray_image, engine="separable",
+                                   buffers=SobelBuffers((10, 10)))
+        with pytest.raises(ValueError):
+            apply_sobel_sequential(gray_image, engine="separable",
+                                   out=np.zeros((10, 10), dtype=np.float32))
+
+    def test_separable_parallel_with_out(self):
+        """Verifica el motor separable en la version paralela con out"""
+        gray_image = np.random.randint(0, 255, (60, 45), dtype=np.uint8)
+        out = np.empty(gray_image.shape, dtype=np.float32)
+
+        edges = apply_sobel_parallel(gray_image, num_processes=2,
+                                     engine="separable", out=out)
+        expected = apply_sobel_sequential(gray_image, engine="vectorized")
+
+        assert edges is out, "No se escribio en el buffer de salida"
+        assert np.allclose(edges, expected, rtol=1e-6, atol=0), "Resultado incorrecto"
+
+
 class TestSobelParallel:
     """Tests para implementacion paralela"""
 
@@ -207,6 +382,837 @@ class TestSobelParallel:
         assert result_end == end_row, "end_row incorrecto"
         assert chunk_edges.shape == (end_row - start_row, 50), f"Shape incorrecto: {chunk_edges.shape}"
 
+    def test_process_shared_chunk_writes_in_place(self):
+        """Verifica que el worker escribe su rango en la memoria compartida"""
+        from multiprocessing import shared_memory
+
+        gray_image = np.random.randint(0, 255, (30, 40), dtype=np.uint8)
+        shm_in = shared_memory.SharedMemory(create=True, size=gray_image.nbytes)
+        shm_out = shared_memory.SharedMemory(create=True, size=gray_image.size * 4)
+        try:
+            shared_in = np.ndarray(gray_image.shape, dtype=np.uint8, buffer=shm_in.buf)
+            shared_out = np.ndarray(gray_image.shape, dtype=np.float32, buffer=shm_out.buf)
+            shared_in[:] = gray_image
+            shared_out[:] = -1
+
+            result = process_shared_chunk((shm_in.name, shm_out.name, gray_image.shape,
+                                           gray_image.dtype.str, 0, 12, "vectorized"))
+
+            expected = apply_sobel_sequential(gray_image, engine="vectorized")
+            assert result == (0, 12), f"Rango devuelto incorrecto: {result}"
+            assert np.array_equal(shared_out[:12], expected[:12]), "Rango mal calculado"
+            assert np.all(shared_out[12:] == -1), "Se escribio fuera del rango"
+            del shared_in, shared_out
+        finally:
+            shm_in.close()
+            shm_in.unlink()
+            shm_out.close()
+            shm_out.unlink()
+
+
+class TestSobelExecutor:
+    """Tests para el pool persistente"""
+
+    def test_executor_reuses_pool_across_images(self):
+        """Verifica varias imagenes (de distintos tamaños) con el mismo pool"""
+        shapes = [(40, 30), (40, 30), (25, 60)]
+
+        with SobelExecutor(num_processes=2, engine="vectorized") as executor:
+            for shape in shapes:
+                gray_image = np.random.randint(0, 255, shape, dtype=np.uint8)
+                edges = executor.apply(gray_image)
+                expected = apply_sobel_sequential(gray_image, engine="vectorized")
+                assert np.array_equal(edges, expected), f"Fallo con forma {shape}"
+
+        assert executor.closed, "El pool no se cerro al salir del bloque with"
+
+    def test_executor_map(self):
+        """Verifica que map devuelve los resultados en orden"""
+        images = [np.random.randint(0, 255, (20, 20), dtype=np.uint8) for _ in range(4)]
+
+        with SobelExecutor(num_processes=2, engine="separable") as executor:
+            results = list(executor.map(images))
+
+        for gray_image, edges in zip(images, results):
+            expected = apply_sobel_sequential(gray_image, engine="vectorized")
+            assert np.allclose(edges, expected, rtol=1e-6, atol=0), "Resultado incorrecto"
+
+    def test_executor_closed(self):
+        """Verifica que no se puede usar un executor cerrado"""
+        executor = SobelExecutor(num_processes=1)
+        executor.close()
+
+        with pytest.raises(RuntimeError):
+            executor.apply(np.zeros((5, 5), dtype=np.uint8))
+
+
+class TestSobelTiles:
+    """Tests para el reparto en tiles 2-D con balanceo dinamico"""
+
+    def test_split_tiles_covers_interior(self):
+        """Verifica que los tiles cubren el interior exactamente una vez"""
+        height, width = 23, 31
+        coverage = np.zeros((height, width), dtype=np.int32)
+
+        for row0, row1, col0, col1 in split_tiles(height, width, (5, 7)):
+            coverage[row0:row1, col0:col1] += 1
+
+        assert np.all(coverage[1:-1, 1:-1] == 1), "Interior mal cubierto"
+        assert coverage[0].sum() == 0 and coverage[:, 0].sum() == 0, "Tiles sobre el marco"
+
+    def test_suggest_tile_shape_bounds(self):
+        """Verifica que el tile sugerido cabe en la imagen"""
+        tile_h, tile_w = suggest_tile_shape((100, 5000), num_workers=4)
+
+        assert 1 <= tile_h <= 98 and 1 <= tile_w <= 4998, f"Tile invalido: {(tile_h, tile_w)}"
+
+    def test_tiles_match_sequential(self):
+        """Verifica que el reparto en tiles produce el mismo resultado"""
+        gray_image = np.random.randint(0, 255, (57, 83), dtype=np.uint8)
+        expected = apply_sobel_sequential(gray_image, engine="vectorized")
+
+        edges = apply_sobel_parallel(gray_image, num_processes=2, engine="separable",
+                                     schedule="tiles", tile_shape=(9, 16))
+
+        assert np.allclose(edges, expected, rtol=1e-6, atol=0), "Tiles difieren"
+
+    def test_autotune_remembers_tile_shape(self):
+        """Verifica que autotune devuelve un candidato y se reutiliza con 'auto'"""
+        gray_image = np.random.randint(0, 255, (64, 64), dtype=np.uint8)
+        candidates = [(8, 62), (31, 31)]
+
+        with SobelExecutor(num_processes=2, engine="vectorized", schedule="tiles",
+                           tile_shape="auto") as executor:
+            best = executor.autotune(gray_image, candidates=candidates, repeats=1)
+            edges = executor.apply(gray_image)
+
+        assert best in candidates, f"Tile fuera de los candidatos: {best}"
+        expected = apply_sobel_sequential(gray_image, engine="vectorized")
+        assert np.array_equal(edges, expected), "Resultado incorrecto con tile auto"
+
+
+class TestSobelThreaded:
+    """Tests para el backend de hilos"""
+
+    def test_threaded_matches_sequential(self):
+        """Verifica que los hilos producen el mismo resultado"""
+        gray_image = np.random.randint(0, 255, (71, 43), dtype=np.uint8)
+        expected = apply_sobel_sequential(gray_image, engine="vectorized")
+
+        for engine in ["vectorized", "separable"]:
+            edges = apply_sobel_threaded(gray_image, num_threads=3, engine=engine)
+            assert np.allclose(edges, expected, rtol=1e-6, atol=0), f"Fallo con {engine}"
+
+    def test_parallel_threads_backend_with_out(self):
+        """Verifica backend='threads' en apply_sobel_parallel con out"""
+        gray_image = np.random.randint(0, 255, (30, 30), dtype=np.uint8)
+        out = np.full(gray_image.shape, -1, dtype=np.float32)
+
+        edges = apply_sobel_parallel(gray_image, num_processes=4, engine="vectorized",
+                                     out=out, backend="threads")
+
+        assert edges is out, "No se escribio en el buffer de salida"
+        expected = apply_sobel_sequential(gray_image, engine="vectorized")
+        assert np.array_equal(edges, expected), "Resultado incorrecto"
+
+    def test_parallel_unknown_backend(self):
+        """Verifica que se rechaza un backend desconocido"""
+        gray_image = np.zeros((10, 10), dtype=np.uint8)
+
+        with pytest.raises(ValueError):
+            apply_sobel_parallel(gray_image, backend="gpu")
+
+
+class TestSobelStreaming:
+    """Tests para el procesamiento por bandas"""
+
+    def test_stream_npy_matches_in_memory(self, tmp_path):
+        """Verifica que el resultado por bandas coincide con el de memoria"""
+        rgb_image = np.random.randint(0, 255, (45, 38, 3), dtype=np.uint8)
+        input_path = str(tmp_path / "entrada.npy")
+        output_path = str(tmp_path / "salida.npy")
+        np.save(input_path, rgb_image)
+
+        stats = stream_sobel(input_path, output_path, band_rows=7, engine="separable")
+
+        gray_image = rgb_to_grayscale(rgb_image)
+        expected = normalize_image(apply_sobel_sequential(gray_image, engine="vectorized"))
+        result = np.load(output_path)
+
+        assert stats['bands'] == 7, f"Numero de bandas incorrecto: {stats['bands']}"
+        assert result.dtype == np.uint8, f"Tipo incorrecto: {result.dtype}"
+        assert np.array_equal(result, expected), "Resultado por bandas difiere"
+
+    def test_stream_raw_float_output(self, tmp_path):
+        """Verifica la salida float32 en archivo raw desde una imagen PPM"""
+        rgb_image = np.random.randint(0, 255, (20, 31, 3), dtype=np.uint8)
+        input_path = str(tmp_path / "entrada.ppm")
+        output_path = str(tmp_path / "salida.raw")
+        save_image(rgb_image, input_path)
+
+        assert isinstance(open_band_reader(input_path), RawBandReader), \
+            "PPM deberia leerse directo del disco"
+
+        stream_sobel(input_path, output_path, band_rows=4, normalize=False)
+
+        expected = apply_sobel_sequential(rgb_to_grayscale(rgb_image), engine="vectorized")
+        result = np.fromfile(output_path, dtype=np.float32).reshape(expected.shape)
+        assert np.array_equal(result, expected), "Resultado raw difiere"
+
+
+class TestSobelFused:
+    """Tests para el pipeline fusionado"""
+
+    def test_fused_matches_staged_pipeline(self):
+        """Verifica que el pipeline fusionado da el mismo uint8 que por etapas"""
+        rgb_image = np.random.randint(0, 255, (53, 47, 3), dtype=np.uint8)
+
+        expected = normalize_image(apply_sobel_sequential(rgb_to_grayscale(rgb_image),
+                                                          engine="vectorized"))
+        for engine in ["vectorized", "separable"]:
+            edges = fused_sobel_edges(rgb_image, band_rows=8, engine=engine)
+            assert edges.dtype == np.uint8, f"Tipo incorrecto: {edges.dtype}"
+            assert np.array_equal(edges, expected), f"Fallo con {engine}"
+
+    def test_fused_uniform_image_with_out(self):
+        """Verifica imagen uniforme y escritura en out"""
+        rgb_image = np.full((12, 12, 3), 200, dtype=np.uint8)
+        out = np.full((12, 12), 7, dtype=np.uint8)
+
+        edges = fused_sobel_edges(rgb_image, out=out)
+
+        assert edges is out, "No se escribio en el buffer de salida"
+        assert np.all(edges == 0), "Imagen uniforme no se normaliza a 0"
+
+    def test_fused_accepts_gray_input(self):
+        """Verifica que el camino fusionado acepta una imagen ya en grises"""
+        rgb_image = np.random.randint(0, 256, (30, 41, 3), dtype=np.uint8)
+        gray_image = rgb_to_grayscale(rgb_image)
+        assert np.array_equal(fused_sobel_edges(gray_image, band_rows=7),
+                              fused_sobel_edges(rgb_image, band_rows=7))
+
+
+class TestBatch:
+    """Tests para el modo lote con etapas solapadas"""
+
+    def test_run_batch_processes_all_images(self, tmp_path):
+        """Verifica que cada imagen del directorio produce su salida"""
+        input_dir = tmp_path / "entrada"
+        output_dir = tmp_path / "salida"
+        input_dir.mkdir()
+
+        images = {}
+        for i in range(5):
+            rgb_image = np.random.randint(0, 255, (20 + i, 30, 3), dtype=np.uint8)
+            path = str(input_dir / f"img{i}.png")
+            save_image(rgb_image, path)
+            images[f"img{i}_edges.png"] = rgb_image
+        (input_dir / "notas.txt").write_text("no es una imagen")
+
+        paths = find_images(str(input_dir))
+        stats = run_batch(paths, str(output_dir), decode_workers=2, compute_workers=2,
+                          encode_workers=1, queue_size=1)
+
+        assert len(paths) == 5, f"Imagenes encontradas: {len(paths)}"
+        assert stats['images'] == 5 and stats['failed'] == 0, f"Estadisticas: {stats}"
+        for name, rgb_image in images.items():
+            saved = load_image(str(output_dir / name))[:, :, 0]
+            assert np.array_equal(saved, fused_sobel_edges(rgb_image)), f"Fallo en {name}"
+
+    def test_run_batch_reports_failures(self, tmp_path):
+        """Verifica que un archivo corrupto no detiene el lote"""
+        bad_path = tmp_path / "rota.jpg"
+        bad_path.write_text("no es un jpeg")
+        good_path = str(tmp_path / "buena.png")
+        save_image(np.random.randint(0, 255, (10, 10, 3), dtype=np.uint8), good_path)
+
+        stats = run_batch([str(bad_path), good_path], str(tmp_path / "salida"))
+
+        assert stats['images'] == 1 and stats['failed'] == 1, f"Estadisticas: {stats}"
+
+    def test_run_batch_keeps_subdirectories(self, tmp_path):
+        """Verifica que imagenes con el mismo nombre en subdirectorios no se pisan"""
+        images = {}
+        for folder in ("a", "b"):
+            (tmp_path / "fotos" / folder).mkdir(parents=True)
+            rgb_image = np.random.randint(0, 255, (16, 16, 3), dtype=np.uint8)
+            save_image(rgb_image, str(tmp_path / "fotos" / folder / "x.png"))
+            images[folder] = rgb_image
+
+        paths = find_images(str(tmp_path / "fotos" / "**" / "*.png"))
+        stats = run_batch(paths, str(tmp_path / "salida"))
+
+        assert stats['images'] == 2 and stats['failed'] == 0, f"Estadisticas: {stats}"
+        for folder, rgb_image in images.items():
+            saved = load_image(str(tmp_path / "salida" / folder / "x_edges.png"))[:, :, 0]
+            assert np.array_equal(saved, fused_sobel_edges(rgb_image)), f"Fallo en {folder}"
+
+    def test_run_batch_uses_cache(self, tmp_path):
+        """Verifica que una segunda pasada lee los bordes de la cache"""
+        rgb_image = np.random.randint(0, 255, (18, 22, 3), dtype=np.uint8)
+        path = str(tmp_path / "x.png")
+        save_image(rgb_image, path)
+        cache = SobelCache(str(tmp_path / "cache"))
+
+        run_batch([path], str(tmp_path / "salida1"), cache=cache)
+        stats = run_batch([path], str(tmp_path / "salida2"), cache=cache)
+
+        assert stats['images'] == 1 and cache.hits == 1 and cache.misses == 1
+        saved = load_image(str(tmp_path / "salida2" / "x_edges.png"))[:, :, 0]
+        assert np.array_equal(saved, fused_sobel_edges(rgb_image))
+
+    def test_run_batch_rejects_duplicate_outputs(self, tmp_path):
+        """Verifica que una entrada repetida se rechaza antes de procesar"""
+        path = str(tmp_path / "x.png")
+        save_image(np.zeros((8, 8, 3), dtype=np.uint8), path)
+
+        with pytest.raises(ValueError):
+            run_batch([path, path], str(tmp_path / "salida"))
+
+
+class TestSobelNumba:
+    """Tests para el motor compilado con Numba (o su alternativa sin Numba)"""
+
+    def _apply(self, gray_image, **kwargs):
+        if NUMBA_AVAILABLE:
+            return apply_sobel_sequential(gray_image, "numba", **kwargs)
+        with pytest.warns(RuntimeWarning):
+            return apply_sobel_sequential(gray_image, "numba", **kwargs)
+
+    def test_numba_matches_loops(self):
+        """Verifica que el motor numba coincide con el de referencia"""
+        gray_image = np.random.rand(40, 50) * 255
+
+        edges = self._apply(gray_image)
+
+        assert edges.dtype == np.float32
+        assert np.allclose(edges, apply_sobel_sequential(gray_image, "loops"), atol=1e-3)
+
+    def test_numba_uint8_and_out_buffer(self):
+        """Verifica entrada uint8 y escritura en un buffer reutilizado"""
+        gray_image = np.random.randint(0, 255, (33, 21), dtype=np.uint8)
+        out = np.full(gray_image.shape, -1, dtype=np.float32)
+
+        edges = self._apply(gray_image, out=out)
+
+        assert edges is out
+        assert np.allclose(edges, apply_sobel_sequential(gray_image, "vectorized"), atol=1e-3)
+
+    def test_numba_parallel_backend(self):
+        """Verifica el motor numba como motor de los workers del pool"""
+        gray_image = np.random.rand(50, 40) * 255
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            edges = apply_sobel_parallel(gray_image, num_processes=2, engine="numba")
+
+        assert np.allclose(edges, apply_sobel_sequential(gray_image, "vectorized"), atol=1e-3)
+
+
+class TestSobelInteger:
+    """Tests para el camino entero con gradientes int16"""
+
+    def test_gradients_match_float_exactly(self):
+        """Verifica que Gx y Gy enteros son exactos, incluso en los extremos"""
+        gray_image = np.random.randint(0, 256, (30, 40), dtype=np.uint8)
+        gray_image[10:20, 10:20] = 255
+        gray_image[10:20, 20:30] = 0
+
+        gx, gy = sobel_gradients_int16(gray_image)
+        src = gray_image.astype(np.float64)
+
+        assert gx.dtype == np.int16 and gy.dtype == np.int16
+        assert np.array_equal(gx, _correlate_valid(src, SOBEL_KX))
+        assert np.array_equal(gy, _correlate_valid(src, SOBEL_KY))
+
+    def test_l1_is_exact(self):
+        """Verifica la magnitud L1 contra |gx| + |gy| en float"""
+        gray_image = np.random.randint(0, 256, (25, 35), dtype=np.uint8)
+        src = gray_image.astype(np.float64)
+
+        edges = apply_sobel_integer(gray_image, "l1")
+        expected = (np.abs(_correlate_valid(src, SOBEL_KX)) +
+                    np.abs(_correlate_valid(src, SOBEL_KY)))
+
+        assert edges.dtype == np.uint16
+        assert np.array_equal(edges[1:-1, 1:-1], expected)
+        assert np.all(edges[0] == 0) and np.all(edges[:, -1] == 0)
+
+    @pytest.mark.parametrize("magnitude", MAGNITUDES)
+    def test_accuracy_bound(self, magnitude):
+        """Verifica la cota de error documentada frente al camino float"""
+        gray_image = np.random.randint(0, 256, (60, 60), dtype=np.uint8)
+
+        accuracy = check_accuracy(apply_sobel_integer(gray_image, magnitude),
+                                  apply_sobel_sequential(gray_image, "vectorized"),
+                                  magnitude)
+
+        assert accuracy['within_bound'], f"Fuera de la cota: {accuracy}"
+
+    def test_requires_uint8(self):
+        """Verifica que se rechaza una entrada que podria desbordar int16"""
+        with pytest.raises(ValueError):
+            apply_sobel_integer(np.zeros((10, 10), dtype=np.float32))
+
+
+class TestKernels:
+    """Tests para el registro de operadores y el motor de varios kernels"""
+
+    @staticmethod
+    def _reference(gray_image, kernel):
+        """Magnitud con correlacion 2-D directa de kx y ky"""
+        kx, ky = kernel.kx, kernel.ky
+        r = kernel.radius
+        height, width = gray_image.shape
+        result = np.zeros((height, width), dtype=np.float64)
+        for i in range(r, height - r):
+            for j in range(r, width - r):
+                window = gray_image[i-r:i+r+1, j-r:j+r+1]
+                result[i, j] = np.hypot(np.sum(window * kx), np.sum(window * ky))
+        return result
+
+    def test_sobel3_matches_constants(self):
+        """Verifica que sobel3 del registro es el Sobel de SOBEL_KX/SOBEL_KY"""
+        assert np.array_equal(get_kernel("sobel3").kx, SOBEL_KX)
+        assert np.array_equal(get_kernel("sobel3").ky, SOBEL_KY)
+
+    def test_all_kernels_one_pass_match_reference(self):
+        """Verifica cada operador calculado en la misma pasada por bandas"""
+        gray_image = np.random.rand(37, 29) * 255
+        results = compute_gradients(gray_image, list(KERNELS), band_rows=8)
+
+        for name, kernel in KERNELS.items():
+            expected = self._reference(gray_image, kernel)
+            assert np.allclose(results[name], expected, rtol=1e-5, atol=1e-2), \
+                f"Fallo en {name}"
+
+    def test_sobel3_matches_sequential(self):
+        """Verifica que sobel3 coincide con apply_sobel_sequential"""
+        gray_image = np.random.randint(0, 255, (50, 40), dtype=np.uint8)
+
+        result = compute_gradients(gray_image, ["sobel3", "scharr"])["sobel3"]
+
+        assert np.allclose(result, apply_sobel_sequential(gray_image, "vectorized"),
+                           atol=1e-3)
+
+    def test_sobel5_frame_is_zero(self):
+        """Verifica que el 5x5 deja un marco de 2 pixeles en cero"""
+        gray_image = np.random.rand(12, 12) * 255
+
+        edges = compute_gradients(gray_image, ["sobel5"])["sobel5"]
+
+        assert np.all(edges[:2] == 0) and np.all(edges[-2:] == 0)
+        assert np.all(edges[:, :2] == 0) and np.all(edges[:, -2:] == 0)
+
+    def test_unknown_kernel(self):
+        """Verifica el error con un operador no registrado"""
+        with pytest.raises(ValueError):
+            compute_gradients(np.zeros((10, 10)), ["laplace"])
+
+
+class TestSobelCache:
+    """Tests para la cache de resultados en disco"""
+
+    def test_hit_returns_stored_result_memory_mapped(self, tmp_path):
+        """Verifica que la segunda llamada no recalcula y lee de disco"""
+        cache = SobelCache(str(tmp_path))
+        gray_image = np.random.rand(40, 50) * 255
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return apply_sobel_sequential(gray_image, "vectorized")
+
+        first = cache.get_or_compute(gray_image, compute, engine="vectorized")
+        second = cache.get_or_compute(gray_image, compute, engine="vectorized")
+
+        assert len(calls) == 1, "El resultado se recalculo"
+        assert isinstance(second, np.memmap), "El acierto no esta mapeado en memoria"
+        assert np.array_equal(first, second)
+        assert np.array_equal(second, apply_sobel_sequential(gray_image, "vectorized"))
+        assert cache.hits == 1 and cache.misses == 1
+
+    def test_key_depends_on_pixels_and_params(self, tmp_path):
+        """Verifica que cambiar un pixel o un parametro cambia la clave"""
+        cache = SobelCache(str(tmp_path))
+        gray_image = np.random.rand(10, 10)
+        changed = gray_image.copy()
+        changed[5, 5] += 1
+
+        key = cache.key(gray_image, engine="loops")
+        assert key == cache.key(gray_image.copy(), engine="loops")
+        assert key != cache.key(changed, engine="loops")
+        assert key != cache.key(gray_image, engine="separable")
+        assert key != cache.key(gray_image.astype(np.float32), engine="loops")
+
+    def test_lru_eviction_respects_size_cap(self, tmp_path):
+        """Verifica que al superar el tamaño se expulsa la entrada menos usada"""
+        entry = np.zeros((64, 64), dtype=np.float32)
+        cache = SobelCache(str(tmp_path), max_bytes=int(2.5 * (entry.nbytes + 128)))
+
+        keys = [cache.key(entry, index=i) for i in range(3)]
+        cache.put(keys[0], entry)
+        cache.put(keys[1], entry)
+        # Usar la primera para que la menos usada sea la segunda
+        os.utime(os.path.join(str(tmp_path), f"{keys[1]}.npy"), (0, 0))
+        assert cache.get(keys[0]) is not None
+        cache.put(keys[2], entry)
+
+        assert cache.get(keys[1]) is None, "No se expulso la entrada menos usada"
+        assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+        assert cache.size() <= cache.max_bytes
+
+
+class TestPyramid:
+    """Tests para la piramide de imagenes de grueso a fino"""
+
+    def test_downsample_averages_2x2_blocks(self):
+        """Verifica el promedio redondeado de bloques 2x2 y el recorte de impares"""
+        image = np.array([[0, 1, 10, 20, 99],
+                          [2, 3, 30, 41, 99],
+                          [99, 99, 99, 99, 99]], dtype=np.uint8)
+        result = downsample_2x(image)
+
+        assert result.shape == (1, 2)
+        assert result.dtype == np.uint8
+        assert result[0, 0] == 2   # (0 + 1 + 2 + 3 + 2) // 4
+        assert result[0, 1] == 25  # (10 + 20 + 30 + 41 + 2) // 4
+
+    def test_levels_are_lazy_and_cached(self, tmp_path):
+        """Verifica que nada se decodifica al crearla y que la resolucion
+        completa reutiliza la imagen decodificada para la vista previa"""
+        rgb_image = (np.random.rand(64, 80, 3) * 255).astype(np.uint8)
+        path = str(tmp_path / "input.png")
+        save_image(rgb_image, path)
+
+        pyramid = ImagePyramid(path, engine="vectorized")
+        assert pyramid.shapes[:3] == [(64, 80), (32, 40), (16, 20)]
+        assert pyramid.cached_levels() == {'gray': [], 'edges': []}
+
+        preview_level = pyramid.level_for(20)
+        assert preview_level == 2
+        preview = pyramid.edges(preview_level)
+        assert preview.shape == (16, 20)
+        assert pyramid.cached_levels() == {'gray': [0, 1, 2], 'edges': [2]}
+
+        gray_before = pyramid.gray(0)
+        full = pyramid.edges(0)
+        assert pyramid.gray(0) is gray_before, "Se repitio la conversion a grises"
+        assert pyramid.edges(0) is full, "Se recalcularon los bordes"
+        assert np.array_equal(full, apply_sobel_sequential(rgb_to_grayscale(rgb_image),
+                                                           "vectorized"))
+
+    def test_levels_match_direct_computation(self):
+        """Verifica cada nivel contra reducir y aplicar Sobel directamente"""
+        gray_image = (np.random.rand(50, 37) * 255).astype(np.uint8)
+        pyramid = ImagePyramid(gray_image, engine="separable", min_size=4)
+
+        expected = gray_image
+        for level in range(pyramid.num_levels):
+            assert np.array_equal(pyramid.gray(level), expected)
+            assert np.array_equal(pyramid.edges(level),
+                                  apply_sobel_sequential(expected, "separable"))
+            expected = downsample_2x(expected)
+
+        assert min(pyramid.shapes[-1]) >= 4
+
+    def test_invalid_level_and_engine(self):
+        """Verifica los errores de nivel fuera de rango y motor desconocido"""
+        gray_image = np.zeros((16, 16), dtype=np.uint8)
+        with pytest.raises(ValueError):
+            ImagePyramid(gray_image, engine="gpu")
+
+        pyramid = ImagePyramid(gray_image)
+        with pytest.raises(ValueError):
+            pyramid.edges(pyramid.num_levels)
+
+
+class TestService:
+    """Tests para el servicio HTTP asincrono"""
+
+    @staticmethod
+    def _png_bytes(rgb_image):
+        buffer = io.BytesIO()
+        Image.fromarray(rgb_image).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def test_stack_sobel_matches_individual_images(self):
+        """Verifica que apilar imagenes da lo mismo que procesarlas por separado"""
+        images = [np.random.randint(0, 256, (13, 17), dtype=np.uint8) for _ in range(4)]
+        compute = lambda gray: apply_sobel_sequential(gray, "separable")
+
+        for image, edges in zip(images, stack_sobel(images, compute)):
+            assert np.array_equal(edges, compute(image))
+
+    def test_concurrent_requests_are_batched(self):
+        """Verifica resultados correctos y que las peticiones del mismo tamaño
+        comparten una llamada al pool"""
+        rgb_images = [np.random.randint(0, 256, (30, 40, 3), dtype=np.uint8) for _ in range(4)]
+
+        async def scenario():
+            service = SobelService(engine="separable", workers=2, backend="threads",
+                                   max_batch=4, batch_window=0.5)
+            await service.start("127.0.0.1", 0)
+            try:
+                async def post(rgb_image):
+                    reader, writer = await asyncio.open_connection(service.host, service.port)
+                    try:
+                        return await http_request(reader, writer, "POST", "/edges?format=npy",
+                                                  self._png_bytes(rgb_image))
+                    finally:
+                        writer.close()
+
+                responses = await asyncio.gather(*(post(image) for image in rgb_images))
+                return responses, service.metrics()
+            finally:
+                await service.close()
+
+        responses, metrics = asyncio.run(scenario())
+
+        for rgb_image, (status, _, body) in zip(rgb_images, responses):
+            assert status == 200
+            expected = apply_sobel_sequential(rgb_to_grayscale(rgb_image), "separable")
+            assert np.array_equal(np.load(io.BytesIO(body)), expected)
+
+        assert metrics['batches'] == 1 and metrics['batch_size_max'] == 4
+        assert metrics['latency_ms']['samples'] == 4
+
+    def test_back_pressure_and_errors(self):
+        """Verifica 503 al superar max_pending y los errores 400/404/413"""
+        payload = self._png_bytes(np.random.randint(0, 256, (20, 20, 3), dtype=np.uint8))
+
+        async def scenario():
+            service = SobelService(backend="threads", workers=1, max_pending=1,
+                                   batch_window=0.2, max_body_bytes=len(payload))
+            await service.start("127.0.0.1", 0)
+            try:
+                report = await load_test(service.host, service.port, payload,
+                                         requests=2, concurrency=2)
+
+                reader, writer = await asyncio.open_connection(service.host, service.port)
+                bad_image = await http_request(reader, writer, "POST", "/edges", b"no es imagen")
+                missing = await http_request(reader, writer, "GET", "/nada")
+                metrics = await http_request(reader, writer, "GET", "/metrics")
+                too_large = await http_request(reader, writer, "POST", "/edges", payload + b"x")
+                writer.close()
+                return report, bad_image, missing, metrics, too_large
+            finally:
+                await service.close()
+
+        report, bad_image, missing, metrics, too_large = asyncio.run(scenario())
+
+        assert report['statuses'] == {'200': 1, '503': 1}
+        assert bad_image[0] == 400
+        assert missing[0] == 404
+        assert too_large[0] == 413
+        assert metrics[0] == 200
+        assert json.loads(metrics[2])['rejected'] == 1
+
+    def test_close_flushes_pending_batches(self):
+        """Verifica que close() responde los lotes que aun esperaban su ventana"""
+        gray_image = np.random.randint(0, 256, (20, 30), dtype=np.uint8)
+
+        async def scenario():
+            service = SobelService(engine="separable", workers=1, backend="threads",
+                                   batch_window=60)
+            await service.start("127.0.0.1", 0)
+            request = asyncio.ensure_future(service.edges(gray_image))
+            await asyncio.sleep(0)
+            await service.close()
+            return await asyncio.wait_for(request, timeout=5), service._tasks
+
+        edges, tasks = asyncio.run(scenario())
+
+        assert np.array_equal(edges, apply_sobel_sequential(gray_image, "separable"))
+        assert not tasks
+
+    def test_close_with_idle_keep_alive_connection(self):
+        """Verifica que close() no espera a un cliente keep-alive inactivo"""
+        async def scenario():
+            service = SobelService(backend="threads", workers=1)
+            await service.start("127.0.0.1", 0)
+            reader, writer = await asyncio.open_connection(service.host, service.port)
+            health = await http_request(reader, writer, "GET", "/health")
+            await asyncio.wait_for(service.close(), timeout=5)
+            closed_by_server = await asyncio.wait_for(reader.read(), timeout=5) == b""
+            writer.close()
+            return health, closed_by_server
+
+        health, closed_by_server = asyncio.run(scenario())
+
+        assert health[0] == 200
+        assert closed_by_server
+
+    def test_malformed_requests_get_400(self):
+        """Verifica 400 para lineas de peticion y Content-Length invalidos"""
+        requests = [b"BASURA\r\n\r\n",
+                    b"POST /edges HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+                    b"POST /edges HTTP/1.1\r\nContent-Length: -5\r\n\r\n"]
+
+        async def scenario():
+            service = SobelService(backend="threads", workers=1)
+            await service.start("127.0.0.1", 0)
+            try:
+                responses = []
+                for raw in requests:
+                    reader, writer = await asyncio.open_connection(service.host, service.port)
+                    writer.write(raw)
+                    await writer.drain()
+                    responses.append(await asyncio.wait_for(reader.read(), timeout=5))
+                    writer.close()
+                return responses
+            finally:
+                await service.close()
+
+        for response in asyncio.run(scenario()):
+            assert response.startswith(b"HTTP/1.1 400 "), response
+
+
+class TestRegression:
+    """Tests de regresion contra las referencias doradas de tests/fixtures/golden"""
+
+    def test_fixtures_cover_all_cases(self):
+        """Verifica que hay una referencia guardada por cada caso"""
+        fixtures = load_fixtures(names=list(GOLDEN_CASES))
+        for name, (gray_image, edges) in fixtures.items():
+            assert gray_image.dtype == np.uint8, f"Entrada no uint8 en {name}"
+            assert edges.shape == gray_image.shape, f"Forma incorrecta en {name}"
+
+    def test_all_engines_match_golden(self):
+        """Verifica que todos los motores rapidos reproducen las referencias"""
+        results = run_regression(fixtures=load_fixtures(names=list(GOLDEN_CASES)), jobs=2)
+
+        assert [result['engine'] for result in results] == list(REGRESSION_ENGINES)
+        for result in results:
+            assert result['error'] is None, f"{result['engine']}: {result['error']}"
+            assert result['ok'], f"{result['engine']} fuera de tolerancia en {result['failed']}"
+            assert result['cases'] == len(GOLDEN_CASES)
+
+    def test_generate_and_detect_regression(self, tmp_path):
+        """Verifica que una referencia alterada se reporta como falla"""
+        paths = generate_fixtures(str(tmp_path), names=["odd_17x31", "strip_3x257"],
+                                  verbose=False)
+        assert len(paths) == 2
+        assert generate_fixtures(str(tmp_path), names=["odd_17x31"], verbose=False) == []
+
+        fixtures = load_fixtures(str(tmp_path))
+        gray_image, edges = fixtures["odd_17x31"]
+        edges = edges.copy()
+        edges[5, 5] += 1.0
+        fixtures["odd_17x31"] = (gray_image, edges)
+
+        result, = run_regression(["separable"], fixtures)
+        assert not result['ok']
+        assert result['failed'] == ["odd_17x31"]
+        assert result['max_error'] == pytest.approx(1.0)
+
+
+class TestBenchmarking:
+    """Tests para las utilidades de medicion de benchmarks"""
+
+    def test_summarize_median_and_iqr(self):
+        """Verifica mediana e IQR de una lista conocida"""
+        stats = summarize([1.0, 2.0, 3.0, 4.0, 100.0])
+
+        assert stats['median'] == 3.0
+        assert stats['q1'] == 2.0 and stats['q3'] == 4.0
+        assert stats['iqr'] == 2.0
+        assert stats['n'] == 5
+
+    def test_time_case_separates_phases(self):
+        """Verifica que setup y teardown se ejecutan una vez y el calculo se repite"""
+        calls = {'setup': 0, 'compute': 0, 'teardown': 0}
+
+        def setup():
+            calls['setup'] += 1
+            return "estado"
+
+        def compute(state):
+            assert state == "estado"
+            calls['compute'] += 1
+
+        def teardown(state):
+            calls['teardown'] += 1
+
+        result = time_case(setup, compute, teardown, repeats=4, warmup=2)
+
+        assert calls == {'setup': 1, 'compute': 6, 'teardown': 1}
+        assert result['compute']['n'] == 4
+
+    def test_run_suite_writes_json_and_csv(self, tmp_path):
+        """Verifica el barrido y los archivos que permiten comparar resultados"""
+        rows = run_suite(["vectorized"], sizes=[32], processes=[1, 2],
+                         repeats=2, warmup=0, verbose=False)
+
+        assert [(r['backend'], r['processes']) for r in rows] == \
+            [("sequential", 1), ("processes", 1), ("processes", 2)]
+        assert rows[0]['speedup'] == 1.0
+
+        json_path = str(tmp_path / "suite.json")
+        csv_path = str(tmp_path / "suite.csv")
+        save_results(rows, json_path, csv_path, metadata={'commit': None})
+
+        with open(json_path, encoding="utf-8") as f:
+            saved = json.load(f)
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            csv_rows = list(csv.DictReader(f))
+
+        assert len(saved['results']) == 3 and len(csv_rows) == 3
+        comparison = compare_results(csv_rows, saved['results'])
+        assert all(abs(c['ratio'] - 1.0) < 1e-9 for c in comparison)
+
+
+class TestInstrumentation:
+    """Tests para la traza de etapas y workers"""
+
+    def test_disabled_tracer_records_nothing(self):
+        """Verifica que sin traza activa no se registran spans"""
+        assert get_tracer() is NULL_TRACER
+
+        with get_tracer().span("etapa", bytes=10) as span:
+            span.set(filas=3)
+        get_tracer().add("etapa", 0.0, 1.0)
+
+        assert NULL_TRACER.spans == []
+
+    def test_executor_records_worker_spans(self):
+        """Verifica spans de etapas, workers y bytes transferidos"""
+        gray_image = np.random.randint(0, 255, (60, 70), dtype=np.uint8)
+
+        with tracing() as tracer:
+            with SobelExecutor(num_processes=2, engine="vectorized") as executor:
+                edges = executor.apply(gray_image, schedule="tiles", tile_shape=(16, 32))
+
+        assert get_tracer() is NULL_TRACER
+        assert np.allclose(edges, apply_sobel_sequential(gray_image), atol=1e-3)
+
+        summary = tracer.summary()
+        for name in ("pool_start", "load", "dispatch", "worker_compute", "gather", "pool_close"):
+            assert name in summary, f"Falta el span {name}"
+
+        workers = [s for s in tracer.spans if s['name'] == "worker_compute"]
+        assert len(workers) == len(split_tiles(60, 70, (16, 32)))
+        assert all(s['pid'] != os.getpid() for s in workers)
+        assert all(s['args']['queue_wait_s'] >= 0 for s in workers)
+        assert summary['load']['bytes'] == gray_image.nbytes
+
+    def test_threaded_spans_and_chrome_export(self, tmp_path):
+        """Verifica los spans del backend de hilos y el formato de Chrome"""
+        gray_image = np.random.rand(40, 40) * 255
+        tracer = Tracer()
+
+        with tracing(tracer):
+            apply_sobel_threaded(gray_image, num_threads=3)
+
+        path = str(tmp_path / "traza.json")
+        tracer.save(path, format="chrome")
+        with open(path, encoding="utf-8") as f:
+            events = json.load(f)['traceEvents']
+
+        workers = [e for e in events if e['name'] == "worker_compute"]
+        assert len(workers) == 3
+        assert all(e['ph'] == "X" and e['dur'] >= 0 for e in events)
+
 
 class TestIntegration:
     """Tests de integracion del pipeline completo"""
@@ -4,6 +4,7 @@ Verifica que ambas implementaciones producen resultados identicos
 """
 import sys
 import os
+import argparse
 import numpy as np
 from PIL import Image
 
@@ -12,6 +13,10 @@ sys.path.insert(0, os.path.dirname(__file__))
 from src.utils import load_image, rgb_to_grayscale
 from src.sobel_sequential import apply_sobel_sequential
 from src.sobel_parallel import apply_sobel_parallel
+from src.sobel_integer import apply_sobel_integer, check_accuracy, MAGNITUDES, ACCURACY_BOUNDS
+from src.cache import SobelCache
+from src.regression import (REGRESSION_ENGINES, FIXTURES_DIR, fixture_path, generate_fixtures,
+                            load_fixtures, run_regression, print_report)
 
 
 def compare_images_pixel_by_pixel(image1, image2):
@@ -47,10 +52,40 @@ def compare_images_pixel_by_pixel(image1, image2):
     return stats
 
 
-def validate_algorithms():
+def validate_regression(engines=None, jobs=None):
+    """
+    Compara los motores rapidos contra las referencias doradas de
+    tests/fixtures/golden (varios tamaños, tiras de 3 pixeles e imagenes
+    grandes), en paralelo
+
+    Args:
+        engines: motores de REGRESSION_ENGINES (None = todos)
+        jobs: hilos para los motores (None = uno por motor)
+
+    Returns:
+        True si todos los motores quedan dentro de la tolerancia
+    """
+    fixtures = load_fixtures()
+    if not fixtures:
+        print(f"   [SKIP] No hay referencias en {FIXTURES_DIR} (usar --regenerate)\n")
+        return True
+
+    results = run_regression(engines, fixtures, jobs)
+    print_report(results, fixtures)
+    print("   Los motores corren a la vez: MP/s compara motores entre si, no es un benchmark\n")
+    return all(result['ok'] for result in results)
+
+
+def validate_algorithms(cache=None, engines=None, jobs=None):
     """
     Valida que las implementaciones secuencial y paralela producen
     resultados identicos
+
+    Args:
+        cache: SobelCache para la referencia secuencial (None = recalcularla).
+               La version paralela siempre se recalcula, que es lo que se valida.
+        engines: motores a comparar contra las referencias doradas (None = todos)
+        jobs: hilos de la comparacion contra las referencias doradas
     """
     print("\n" + "="*70)
     print("=" + "  VALIDACION DE RESULTADOS  ".center(68) + "=")
@@ -72,7 +107,22 @@ def validate_algorithms():
 
     # Procesar con algoritmo secuencial
     print("2. Procesando con algoritmo SECUENCIAL...")
-    edges_sequential = apply_sobel_sequential(gray_image)
+    golden = None
+    if os.path.exists(fixture_path("pikachu")):
+        golden_gray, golden = load_fixtures(names=["pikachu"])["pikachu"]
+        if not np.array_equal(golden_gray, gray_image):
+            golden = None
+
+    if golden is not None:
+        edges_sequential = golden
+        print("   Referencia leida de tests/fixtures/golden/pikachu.npz")
+    elif cache is None:
+        edges_sequential = apply_sobel_sequential(gray_image)
+    else:
+        edges_sequential = cache.get_or_compute(
+            gray_image, lambda: apply_sobel_sequential(gray_image),
+            operator="sobel", engine="loops")
+        print(f"   Referencia {'leida de la cache' if cache.hits else 'calculada y guardada en cache'}")
     print(f"   Rango: [{np.min(edges_sequential):.2f}, {np.max(edges_sequential):.2f}]\n")
 
     # Procesar con algoritmo paralelo (diferentes numeros de procesos)
@@ -109,8 +159,27 @@ def validate_algorithms():
                 print(f"      [ERROR] Diferencias significativas detectadas!")
                 all_valid = False
 
+    # Validar el modo entero contra su cota de error documentada
+    print("4. Validando modo ENTERO (int16) contra la cota de error...\n")
+
+    for magnitude in MAGNITUDES:
+        edges_integer = apply_sobel_integer(gray_image, magnitude)
+        accuracy = check_accuracy(edges_integer, edges_sequential, magnitude)
+        low, high = ACCURACY_BOUNDS[magnitude]
+
+        print(f"   Magnitud {magnitude}: cota [{low:.4f}, {high:.4f}] x float")
+        print(f"      Cociente observado:    [{accuracy['min_ratio']:.4f}, "
+              f"{accuracy['max_ratio']:.4f}]")
+        print(f"      Diferencia maxima:     {accuracy['max_abs_difference']:.2f}")
+
+        if accuracy['within_bound']:
+            print(f"      [OK] Dentro de la cota\n")
+        else:
+            print(f"      [ERROR] Fuera de la cota documentada!\n")
+            all_valid = False
+
     # Validar que las imagenes guardadas son identicas
-    print("4. Validando imagenes guardadas en disco...\n")
+    print("5. Validando imagenes guardadas en disco...\n")
 
     seq_path = "images/output/pikachu_edges_sequential.jpg"
     par_path = "images/output/pikachu_edges_parallel.jpg"
@@ -136,6 +205,12 @@ def validate_algorithms():
     else:
         print("   [SKIP] Imagenes guardadas no encontradas\n")
 
+    # Validar los motores rapidos contra las referencias doradas
+    print("6. Validando motores contra las referencias doradas...")
+
+    if not validate_regression(engines, jobs):
+        all_valid = False
+
     # Resultado final
     print("="*70)
     if all_valid:
@@ -151,7 +226,31 @@ def validate_algorithms():
 
 def main():
     """Ejecuta la validacion"""
-    success = validate_algorithms()
+    parser = argparse.ArgumentParser(description="Validacion secuencial vs paralelo")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Directorio de cache para la referencia secuencial")
+    parser.add_argument("--regression", action="store_true",
+                        help="Solo compara los motores contra las referencias doradas")
+    parser.add_argument("--regenerate", action="store_true",
+                        help="Recalcula las referencias doradas con el motor 'loops'")
+    parser.add_argument("--engines", nargs="+", choices=list(REGRESSION_ENGINES),
+                        help="Motores a comparar contra las referencias (por defecto todos)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Hilos de la comparacion (por defecto uno por motor)")
+    args = parser.parse_args()
+
+    if args.regenerate:
+        print("\nGenerando referencias doradas (motor 'loops')...")
+        generate_fixtures(overwrite=True)
+
+    if args.regression:
+        print("\nValidando motores contra las referencias doradas...")
+        success = validate_regression(args.engines, args.jobs)
+        print("[OK] VALIDACION EXITOSA\n" if success else "[ERROR] VALIDACION FALLIDA\n")
+        sys.exit(0 if success else 1)
+
+    cache = SobelCache(args.cache_dir) if args.cache_dir else None
+    success = validate_algorithms(cache, args.engines, args.jobs)
     sys.exit(0 if success else 1)
 
 
@@ -0,0 +1,88 @@
+import itertools
+import math
+import time
+import numpy as np
+
+# Permutaciones por bloque en la evaluación vectorizada
+TAMANO_BLOQUE = 20000
+
+def matriz_distancias(ciudades):
+    """Calcula una sola vez la matriz n x n de distancias euclidianas."""
+    n = len(ciudades)
+    matriz = np.zeros((n, n))
+    for i in range(n):
+        for j in range(n):
+            # Misma fórmula que distancia(), para obtener los mismos valores
+            matriz[i, j] = math.sqrt((ciudades[i][0] - ciudades[j][0])**2 +
+                                     (ciudades[i][1] - ciudades[j][1])**2)
+    return matriz
+
+def distancia_total_matriz(ruta, distancias):
+    """Evalúa una ruta con búsquedas en la matriz (distancias = matriz.tolist())."""
+    total = 0
+    for i in range(len(ruta) - 1):
+        total += distancias[ruta[i]][ruta[i+1]]
+    # Regresa a la ciudad inicial
+    total += distancias[ruta[-1]][ruta[0]]
+    return total
+
+def distancias_bloque(perms, matriz):
+    """Distancia total de cada fila de un arreglo 2-D de permutaciones.
+
+    Se suman las aristas en el mismo orden que distancia_total, así que
+    los valores son idénticos a los de la versión con math.sqrt.
+    """
+    aristas = matriz[perms[:, :-1], perms[:, 1:]]
+    # Empieza en cero como distancia_total; con n = 1 no hay aristas intermedias
+    total = np.zeros(len(perms))
+    for k in range(aristas.shape[1]):
+        total += aristas[:, k]
+    total += matriz[perms[:, -1], perms[:, 0]]
+    return total
+
+def mejor_de_bloque(perms, matriz):
+    """Mejor ruta de un bloque; en empate gana la primera, como en la búsqueda secuencial."""
+    totales = distancias_bloque(perms, matriz)
+    mejor = int(np.argmin(totales))
+    return tuple(int(c) for c in perms[mejor]), float(totales[mejor])
+
+def bloques(permutaciones, n, tamano=TAMANO_BLOQUE):
+    """Agrupa un iterador de permutaciones en arreglos (tamano, n)."""
+    while True:
+        plano = np.fromiter(itertools.chain.from_iterable(itertools.islice(permutaciones, tamano)),
+                            dtype=np.intp)
+        if plano.size == 0:
+            return
+        yield plano.reshape(-1, n)
+
+def mejor_ruta_matriz(permutaciones, n, matriz, tamano=TAMANO_BLOQUE):
+    """Recorre las permutaciones por bloques y devuelve la mejor (ruta, distancia)."""
+    mejor_ruta = None
+    mejor_distancia = float('inf')
+
+    for perms in bloques(permutaciones, n, tamano):
+        ruta, d = mejor_de_bloque(perms, matriz)
+        if d < mejor_distancia:
+            mejor_distancia = d
+            mejor_ruta = ruta
+
+    return mejor_ruta, mejor_distancia
+
+def tsp_matriz(ciudades, tamano=TAMANO_BLOQUE):
+    """Fuerza bruta con matriz de distancias y evaluación vectorizada por bloques."""
+    n = len(ciudades)
+    matriz = matriz_distancias(ciudades)
+    return mejor_ruta_matriz(itertools.permutations(range(n)), n, matriz, tamano)
+
+if __name__ == "__main__":
+    ciudades = [(0,0), (2,3), (5,2), (6,6), (8,3), (3,8), (1,5), (7,1), (9,6), (4,4)]
+    print("Número de ciudades:", len(ciudades))
+
+    inicio = time.time()
+    ruta, dist = tsp_matriz(ciudades)
+    fin = time.time()
+
+    print("\n--- RESULTADOS (MATRIZ DE DISTANCIAS) ---")
+    print("Mejor ruta:", ruta)
+    print("Distancia mínima:", round(dist, 2))
+    print("Tiempo de ejecución:", round(fin - inicio, 4), "segundos")
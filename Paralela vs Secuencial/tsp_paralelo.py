@@ -1,7 +1,23 @@
 import itertools
 import math
+import sys
 import time
 from multiprocessing import Pool, cpu_count
+from tsp_matriz import (matriz_distancias, distancia_total_matriz, mejor_de_bloque, bloques,
+                        mejor_ruta_matriz)
+from tsp_simetria import (pares_extremos, permutaciones_canonicas, candidatos_escalar,
+                          candidatos_bloques, resolver)
+
+MOTORES = ("sqrt", "matriz", "bloques")
+
+# Matriz de distancias de cada worker, enviada una sola vez por el initializer
+_matriz = None
+_distancias = None
+
+# Estado de cada worker en el modo streaming
+_ciudades = None
+_largo_prefijo = None
+_motor = None
 
 def distancia(ciudad1, ciudad2):
     return math.sqrt((ciudad1[0] - ciudad2[0])**2 + (ciudad1[1] - ciudad2[1])**2)
@@ -17,10 +33,161 @@ def evaluar_ruta(args):
     perm, ciudades = args
     return (perm, distancia_total(perm, ciudades))
 
-def tsp_paralelo(ciudades):
+def iniciar_worker(matriz):
+    global _matriz, _distancias
+    _matriz = matriz
+    _distancias = matriz.tolist()
+
+def evaluar_ruta_matriz(perm):
+    return (perm, distancia_total_matriz(perm, _distancias))
+
+def evaluar_bloque(perms):
+    return mejor_de_bloque(perms, _matriz)
+
+def iniciar_streaming(ciudades, matriz, largo_prefijo, motor):
+    global _ciudades, _largo_prefijo, _motor
+    iniciar_worker(matriz)
+    _ciudades = ciudades
+    _largo_prefijo = largo_prefijo
+    _motor = motor
+
+def permutaciones_de_rango(n, largo_prefijo, inicio, fin):
+    """Genera, en orden lexicográfico, las permutaciones cuyos prefijos de
+    largo_prefijo ciudades tienen rango [inicio, fin)."""
+    prefijos = itertools.islice(itertools.permutations(range(n), largo_prefijo), inicio, fin)
+    for prefijo in prefijos:
+        resto = [c for c in range(n) if c not in prefijo]
+        for sufijo in itertools.permutations(resto):
+            yield prefijo + sufijo
+
+def evaluar_rango(rango):
+    """Worker del modo streaming: genera sus permutaciones y devuelve solo su mejor ruta."""
+    inicio, fin = rango
+    n = len(_ciudades)
+    permutaciones = permutaciones_de_rango(n, _largo_prefijo, inicio, fin)
+
+    if _motor == "bloques":
+        return mejor_ruta_matriz(permutaciones, n, _matriz)
+
+    mejor_ruta = None
+    mejor_distancia = float('inf')
+    for perm in permutaciones:
+        if _motor == "matriz":
+            d = distancia_total_matriz(perm, _distancias)
+        else:
+            d = distancia_total(perm, _ciudades)
+        if d < mejor_distancia:
+            mejor_distancia = d
+            mejor_ruta = perm
+    return mejor_ruta, mejor_distancia
+
+def evaluador(motor, ciudades, distancias):
+    """Función ruta -> distancia del motor escalar correspondiente."""
+    if motor == "sqrt":
+        return lambda perm: distancia_total(perm, ciudades)
+    return lambda perm: distancia_total_matriz(perm, distancias)
+
+def evaluar_par(par):
+    """Worker del modo simetría: candidatos de las rutas canónicas con extremos par."""
+    n = len(_ciudades)
+    permutaciones = permutaciones_canonicas(n, [par])
+    if _motor == "bloques":
+        return candidatos_bloques(permutaciones, n, _matriz)
+    return candidatos_escalar(permutaciones, evaluador(_motor, _ciudades, _distancias))
+
+def tsp_paralelo_simetria(ciudades, motor="bloques", procesos=None):
+    """Versión paralela sobre las (n-1)!/2 rutas canónicas (ver tsp_simetria).
+
+    Cada tarea es solo un par (ruta[1], ruta[-1]); el worker genera sus
+    rutas y devuelve la mejor distancia y los candidatos casi empatados.
+    El resultado es el mismo que el de tsp_fuerza_bruta.
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor desconocido: {motor}. Opciones: {', '.join(MOTORES)}")
+
+    n = len(ciudades)
+    matriz = matriz_distancias(ciudades)
+    # Con menos de 3 ciudades hay una sola ruta canónica
+    pares = pares_extremos(n) or [None]
+
+    with Pool(processes=procesos or cpu_count(), initializer=iniciar_streaming,
+              initargs=(ciudades, matriz, None, motor)) as pool:
+        resultados = pool.map(evaluar_par, pares, chunksize=1)
+
+    mejor = min(m for m, _ in resultados)
+    candidatos = [c for _, lista in resultados for c in lista]
+    return resolver(candidatos, mejor, evaluador(motor, ciudades, matriz.tolist()))
+
+def tsp_paralelo_streaming(ciudades, motor="bloques", procesos=None, tareas_por_proceso=4,
+                           simetria=False):
+    """Versión paralela sin materializar las n! permutaciones.
+
+    Las permutaciones se reparten por prefijos: cada tarea es solo un par
+    (inicio, fin) de rangos de prefijos en orden lexicográfico. Cada worker
+    genera localmente sus permutaciones y devuelve solo su mejor ruta, así
+    que la memoria y la comunicación son O(procesos). El resultado es el
+    mismo que el de tsp_fuerza_bruta (incluidos los empates).
+
+    simetria: reparte solo las rutas canónicas (tsp_paralelo_simetria).
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor desconocido: {motor}. Opciones: {', '.join(MOTORES)}")
+    if simetria:
+        return tsp_paralelo_simetria(ciudades, motor, procesos)
+
+    n = len(ciudades)
+    procesos = procesos or cpu_count()
+    tareas = procesos * tareas_por_proceso
+
+    # Prefijo más corto con al menos una tarea por rango
+    largo_prefijo = 0
+    num_prefijos = 1
+    while num_prefijos < tareas and largo_prefijo < n:
+        num_prefijos *= n - largo_prefijo
+        largo_prefijo += 1
+
+    tareas = min(tareas, num_prefijos)
+    rangos = [(num_prefijos * i // tareas, num_prefijos * (i + 1) // tareas)
+              for i in range(tareas)]
+
+    with Pool(processes=procesos, initializer=iniciar_streaming,
+              initargs=(ciudades, matriz_distancias(ciudades), largo_prefijo, motor)) as pool:
+        resultados = pool.map(evaluar_rango, rangos)
+
+    # Los rangos estan en orden, asi que min conserva la primera ruta en empate
+    return min(resultados, key=lambda x: x[1])
+
+def tsp_paralelo(ciudades, motor="sqrt", simetria=False):
+    """Evalúa todas las permutaciones en paralelo.
+
+    motor: "sqrt" (distancia_total), "matriz" (búsquedas en la matriz de
+    distancias) o "bloques" (cada tarea es un arreglo 2-D de permutaciones
+    que el worker evalúa vectorizado y del que devuelve solo su mejor ruta).
+
+    simetria: evalúa solo las rutas canónicas (tsp_paralelo_simetria).
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor desconocido: {motor}. Opciones: {', '.join(MOTORES)}")
+    if simetria:
+        return tsp_paralelo_simetria(ciudades, motor)
+
     indices = list(range(len(ciudades)))
     permutaciones = list(itertools.permutations(indices))
 
+    if motor != "sqrt":
+        matriz = matriz_distancias(ciudades)
+        with Pool(processes=cpu_count(), initializer=iniciar_worker,
+                  initargs=(matriz,)) as pool:
+            if motor == "matriz":
+                resultados = pool.map(evaluar_ruta_matriz, permutaciones,
+                                      chunksize=max(1, len(permutaciones) // (4 * cpu_count())))
+            else:
+                tamano = max(1, -(-len(permutaciones) // (4 * cpu_count())))
+                resultados = pool.map(evaluar_bloque,
+                                      bloques(iter(permutaciones), len(ciudades), tamano))
+        # min conserva la primera ruta en caso de empate, y map respeta el orden
+        return min(resultados, key=lambda x: x[1])
+
     with Pool(processes=cpu_count()) as pool:
         resultados = pool.map(evaluar_ruta, [(p, ciudades) for p in permutaciones])
 
@@ -28,15 +195,26 @@ def tsp_paralelo(ciudades):
     return mejor_ruta, mejor_distancia
 
 if __name__ == "__main__":
+    # Uso: python tsp_paralelo.py [motor] [streaming] [simetria]
+    streaming = "streaming" in sys.argv[1:]
+    simetria = "simetria" in sys.argv[1:]
+    argumentos = [a for a in sys.argv[1:] if a not in ("streaming", "simetria")]
+    motor = argumentos[0] if argumentos else ("bloques" if streaming else "sqrt")
+
     ciudades = [(0,0), (2,3), (5,2), (6,6), (8,3), (3,8), (1,5), (7,1), (9,6), (4,4)]
     print("Número de ciudades:", len(ciudades))
     print("Usando", cpu_count(), "núcleos")
+    print("Motor:", motor, "(streaming)" if streaming else "",
+          "(rutas canónicas)" if simetria else "")
 
     inicio = time.time()
-    ruta, dist = tsp_paralelo(ciudades)
+    if streaming:
+        ruta, dist = tsp_paralelo_streaming(ciudades, motor, simetria=simetria)
+    else:
+        ruta, dist = tsp_paralelo(ciudades, motor, simetria)
     fin = time.time()
 
     print("\n--- RESULTADOS PARALELOS ---")
     print("Mejor ruta:", ruta)
     print("Distancia mínima:", round(dist, 2))
-    print("Tiempo de ejecución:", round(fin - inicio, 4), "segundos")
\ No newline at end of file
+    print("Tiempo de ejecución:", round(fin - inicio, 4), "segundos")
@@ -0,0 +1,192 @@
+import random
+import sys
+import time
+from multiprocessing import Pool, Value, cpu_count
+from tsp_matriz import matriz_distancias, distancia_total_matriz
+
+# Nodos entre lecturas de la mejor distancia compartida
+SINCRONIZAR = 64
+
+# Estado de cada worker, enviado una sola vez por el initializer
+_distancias = None
+_incumbente = None
+
+def vecino_mas_cercano(distancias):
+    """Ruta inicial: desde la ciudad 0, siempre a la ciudad libre más cercana."""
+    n = len(distancias)
+    ruta = [0]
+    libres = set(range(1, n))
+    while libres:
+        fila = distancias[ruta[-1]]
+        siguiente = min(libres, key=fila.__getitem__)
+        ruta.append(siguiente)
+        libres.remove(siguiente)
+    return ruta
+
+def dos_opt(ruta, distancias):
+    """Mejora la ruta invirtiendo tramos mientras alguno la acorte."""
+    n = len(ruta)
+    mejora = True
+    while mejora:
+        mejora = False
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                a, b = ruta[i - 1], ruta[i]
+                c, d = ruta[j], ruta[(j + 1) % n]
+                if distancias[a][c] + distancias[b][d] < distancias[a][b] + distancias[c][d] - 1e-12:
+                    ruta[i:j + 1] = reversed(ruta[i:j + 1])
+                    mejora = True
+    return ruta
+
+def ruta_inicial(distancias):
+    """Cota superior inicial: vecino más cercano mejorado con 2-opt."""
+    ruta = tuple(dos_opt(vecino_mas_cercano(distancias), distancias))
+    return ruta, distancia_total_matriz(ruta, distancias)
+
+def cota_inferior(distancias, actual, restantes):
+    """Costo mínimo para ir de actual por todas las restantes y volver a 0.
+
+    El camino restante, sin su primera y su última arista, es un árbol
+    que cubre las ciudades restantes, así que cuesta al menos su árbol de
+    expansión mínima (Prim). Se suman la arista más barata que sale de
+    actual y la más barata que llega a 0.
+    """
+    fila_actual = distancias[actual]
+    fila_inicio = distancias[0]
+    entrada = min(fila_actual[c] for c in restantes)
+    salida = min(fila_inicio[c] for c in restantes)
+
+    fila = distancias[restantes[0]]
+    resto = restantes[1:]
+    clave = [fila[c] for c in resto]
+    arbol = 0
+    while resto:
+        i = min(range(len(resto)), key=clave.__getitem__)
+        arbol += clave.pop(i)
+        fila = distancias[resto.pop(i)]
+        clave = [min(k, fila[c]) for k, c in zip(clave, resto)]
+
+    return arbol + entrada + salida
+
+def ramificar(distancias, ruta, costo, restantes, estado, incumbente=None):
+    """Búsqueda en profundidad con poda; actualiza estado con la mejor ruta.
+
+    estado["limite"] es la distancia a superar: la mejor local o, si hay
+    incumbente, la mejor de todos los workers.
+    """
+    estado["nodos"] += 1
+    if incumbente is not None and estado["nodos"] % SINCRONIZAR == 0:
+        estado["limite"] = min(estado["limite"], incumbente.value)
+
+    actual = ruta[-1]
+    if not restantes:
+        # Mismo orden de suma que distancia_total_matriz
+        total = costo + distancias[actual][0]
+        if total < estado["limite"]:
+            estado.update(limite=total, distancia=total, ruta=tuple(ruta))
+            if incumbente is not None:
+                with incumbente.get_lock():
+                    if total < incumbente.value:
+                        incumbente.value = total
+        return
+
+    # Reflexiones: solo rutas con ruta[1] < ruta[-1]
+    if len(ruta) > 1 and max(restantes) < ruta[1]:
+        return
+    if costo + cota_inferior(distancias, actual, restantes) >= estado["limite"]:
+        return
+
+    fila = distancias[actual]
+    for c in sorted(restantes, key=fila.__getitem__):
+        ruta.append(c)
+        ramificar(distancias, ruta, costo + fila[c], [x for x in restantes if x != c],
+                  estado, incumbente)
+        ruta.pop()
+
+def subarboles(distancias):
+    """Prefijos (0, a, b) de la búsqueda, los más prometedores primero."""
+    n = len(distancias)
+    prefijos = []
+    for a in range(1, n):
+        for b in range(1, n):
+            if a != b:
+                restantes = [c for c in range(1, n) if c != a and c != b]
+                costo = distancias[0][a] + distancias[a][b]
+                cota = costo + (cota_inferior(distancias, b, restantes) if restantes
+                                else distancias[b][0])
+                prefijos.append((cota, (0, a, b)))
+    prefijos.sort()
+    return [prefijo for _, prefijo in prefijos]
+
+def tsp_ramificacion(ciudades):
+    """Solución exacta por ramificación y poda (secuencial)."""
+    distancias = matriz_distancias(ciudades).tolist()
+    n = len(ciudades)
+    ruta, distancia = ruta_inicial(distancias)
+    if n <= 3:
+        return ruta, distancia
+
+    estado = {"limite": distancia, "distancia": distancia, "ruta": ruta, "nodos": 0}
+    ramificar(distancias, [0], 0, list(range(1, n)), estado)
+    return estado["ruta"], estado["distancia"]
+
+def iniciar_worker(distancias, incumbente):
+    global _distancias, _incumbente
+    _distancias = distancias
+    _incumbente = incumbente
+
+def explorar_subarbol(prefijo):
+    """Worker: explora un subárbol podando con la mejor distancia global."""
+    n = len(_distancias)
+    costo = 0
+    for i in range(len(prefijo) - 1):
+        costo += _distancias[prefijo[i]][prefijo[i+1]]
+    restantes = [c for c in range(1, n) if c not in prefijo]
+
+    estado = {"limite": _incumbente.value, "distancia": None, "ruta": None, "nodos": 0}
+    ramificar(_distancias, list(prefijo), costo, restantes, estado, _incumbente)
+    return estado["ruta"], estado["distancia"]
+
+def tsp_ramificacion_paralela(ciudades, procesos=None):
+    """Ramificación y poda repartiendo los subárboles (0, a, b) en un Pool.
+
+    La mejor distancia se comparte entre workers con un Value, así que
+    cada uno poda con la cota global.
+    """
+    distancias = matriz_distancias(ciudades).tolist()
+    n = len(ciudades)
+    ruta, distancia = ruta_inicial(distancias)
+    if n <= 3:
+        return ruta, distancia
+
+    incumbente = Value('d', distancia)
+    with Pool(processes=procesos or cpu_count(), initializer=iniciar_worker,
+              initargs=(distancias, incumbente)) as pool:
+        for r, d in pool.imap_unordered(explorar_subarbol, subarboles(distancias)):
+            if r is not None and d < distancia:
+                ruta, distancia = r, d
+
+    return ruta, distancia
+
+if __name__ == "__main__":
+    # Uso: python tsp_ramificacion.py [n_ciudades] [paralelo]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    paralelo = "paralelo" in sys.argv[2:]
+
+    random.seed(42)
+    ciudades = [(random.uniform(0, 100), random.uniform(0, 100)) for _ in range(n)]
+    print("Número de ciudades:", len(ciudades))
+    if paralelo:
+        print("Usando", cpu_count(), "núcleos")
+
+    inicio = time.time()
+    if paralelo:
+        ruta, dist = tsp_ramificacion_paralela(ciudades)
+    else:
+        ruta, dist = tsp_ramificacion(ciudades)
+    fin = time.time()
+
+    print("\n--- RESULTADOS (RAMIFICACIÓN Y PODA) ---")
+    print("Mejor ruta:", ruta)
+    print("Distancia mínima:", round(dist, 2))
+    print("Tiempo de ejecución:", round(fin - inicio, 4), "segundos")
@@ -1,6 +1,26 @@
 import itertools
 import math
+import random
+import sys
 import time
+from multiprocessing import Pool, cpu_count, shared_memory
+import numpy as np
+from tsp_matriz import matriz_distancias, distancia_total_matriz, mejor_ruta_matriz
+from tsp_simetria import permutaciones_canonicas, candidatos_escalar, candidatos_bloques, resolver
+
+MOTORES = ("sqrt", "matriz", "bloques")
+SOLUCIONADORES = ("fuerza_bruta", "held_karp", "ramificacion")
+
+# Subconjuntos por barrido vectorizado de Held-Karp (acota los temporales)
+TAMANO_BARRIDO = 1 << 15
+# Memoria máxima que puede pedir tsp_held_karp
+MEMORIA_MAXIMA = 4 * 1024**3
+
+# Estado de cada worker de Held-Karp, enviado una sola vez por el initializer
+_memoria = None
+_tabla = None
+_aristas = None
+_orden = None
 
 def distancia(ciudad1, ciudad2):
     """Calcula la distancia euclidiana entre dos ciudades."""
@@ -15,28 +35,189 @@ def distancia_total(ruta, ciudades):
     total += distancia(ciudades[ruta[-1]], ciudades[ruta[0]])
     return total
 
-def tsp_fuerza_bruta(ciudades):
-    indices = list(range(len(ciudades)))
+def tsp_fuerza_bruta(ciudades, motor="sqrt", simetria=False):
+    """Evalúa todas las permutaciones.
+
+    motor: "sqrt" (distancia_total), "matriz" (búsquedas en la matriz de
+    distancias) o "bloques" (matriz + evaluación vectorizada por bloques).
+    Los tres devuelven la misma ruta y distancia.
+
+    simetria: evalúa solo las (n-1)!/2 rutas canónicas (ver tsp_simetria),
+    con el mismo resultado.
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor desconocido: {motor}. Opciones: {', '.join(MOTORES)}")
+
+    n = len(ciudades)
+    indices = list(range(n))
     mejor_ruta = None
     mejor_distancia = float('inf')
 
+    if motor == "sqrt":
+        evaluar = lambda perm: distancia_total(perm, ciudades)
+    else:
+        matriz = matriz_distancias(ciudades)
+        distancias = matriz.tolist()
+        evaluar = lambda perm: distancia_total_matriz(perm, distancias)
+
+    if simetria:
+        if motor == "bloques":
+            mejor, candidatos = candidatos_bloques(permutaciones_canonicas(n), n, matriz)
+        else:
+            mejor, candidatos = candidatos_escalar(permutaciones_canonicas(n), evaluar)
+        return resolver(candidatos, mejor, evaluar)
+
+    if motor == "bloques":
+        return mejor_ruta_matriz(itertools.permutations(indices), n, matriz)
+
     for perm in itertools.permutations(indices):
-        d = distancia_total(perm, ciudades)
+        d = evaluar(perm)
         if d < mejor_distancia:
             mejor_distancia = d
             mejor_ruta = perm
 
     return mejor_ruta, mejor_distancia
 
+def memoria_held_karp(n):
+    """Bytes aproximados que necesita tsp_held_karp con n ciudades."""
+    m = max(n - 1, 0)
+    tabla = (1 << m) * m * 8       # costos float64 por (subconjunto, última ciudad)
+    orden = (1 << m) * 8 * 2       # subconjuntos ordenados por tamaño y su popcount
+    temporales = 3 * TAMANO_BARRIDO * m * 8
+    return tabla + orden + temporales
+
+def subconjuntos_por_capa(m):
+    """Máscaras de 0 a 2^m - 1 ordenadas por número de ciudades, y el inicio de cada capa."""
+    mascaras = np.arange(1 << m, dtype=np.int64)
+    tamanos = np.zeros(1 << m, dtype=np.int64)
+    for b in range(m):
+        tamanos += (mascaras >> b) & 1
+    orden = np.argsort(tamanos, kind="stable")
+    inicios = np.searchsorted(tamanos[orden], np.arange(m + 2))
+    return orden, inicios
+
+def barrer_subconjuntos(tabla, aristas, mascaras):
+    """Calcula tabla[S, j] para las máscaras S de una misma capa.
+
+    tabla[S, j] es el costo mínimo de salir de 0, visitar S y terminar en j;
+    es infinito si j no está en S. Para cada j se resuelven todas las
+    máscaras con un gather tabla[S - {j}] + aristas[:, j] y un mínimo por fila.
+    """
+    for inicio in range(0, len(mascaras), TAMANO_BARRIDO):
+        bloque = mascaras[inicio:inicio + TAMANO_BARRIDO]
+        for j in range(aristas.shape[0]):
+            con_j = bloque[(bloque >> j) & 1 == 1]
+            if con_j.size:
+                tabla[con_j, j] = (tabla[con_j ^ (1 << j)] + aristas[:, j]).min(axis=1)
+
+def iniciar_held_karp(nombre, forma, aristas):
+    global _memoria, _tabla, _aristas, _orden
+    _memoria = shared_memory.SharedMemory(name=nombre)
+    _tabla = np.ndarray(forma, dtype=np.float64, buffer=_memoria.buf)
+    _aristas = aristas
+    _orden, _ = subconjuntos_por_capa(aristas.shape[0])
+
+def barrer_rango(rango):
+    """Worker: barre las máscaras _orden[inicio:fin] de la capa actual."""
+    inicio, fin = rango
+    barrer_subconjuntos(_tabla, _aristas, _orden[inicio:fin])
+
+def tsp_held_karp(ciudades, procesos=1, memoria_maxima=MEMORIA_MAXIMA):
+    """Solución exacta por programación dinámica de Held-Karp, O(n²·2ⁿ).
+
+    La tabla es un arreglo (2^(n-1), n-1) indexado por la máscara de
+    ciudades visitadas (sin la 0) y la última ciudad. Las capas de igual
+    número de ciudades se calculan en orden, cada una con barridos
+    vectorizados; con procesos > 1 cada capa se reparte entre workers que
+    escriben en la tabla compartida.
+
+    Los costos se suman en el mismo orden que distancia_total, así que la
+    distancia es la mínima entre las rutas que empiezan en la ciudad 0.
+    """
+    n = len(ciudades)
+    memoria = memoria_held_karp(n)
+    if memoria > memoria_maxima:
+        raise MemoryError(f"Held-Karp con {n} ciudades necesita ~{memoria / 1024**3:.1f} GB "
+                          f"(máximo {memoria_maxima / 1024**3:.1f} GB)")
+
+    matriz = matriz_distancias(ciudades)
+    if n < 2:
+        return tuple(range(n)), distancia_total_matriz(tuple(range(n)), matriz.tolist())
+
+    m = n - 1
+    aristas = np.ascontiguousarray(matriz[1:, 1:])
+    forma = (1 << m, m)
+    memoria_tabla = shared_memory.SharedMemory(create=True, size=forma[0] * forma[1] * 8)
+    tabla = None
+    try:
+        tabla = np.ndarray(forma, dtype=np.float64, buffer=memoria_tabla.buf)
+        tabla[:] = np.inf
+        ciudades_bits = np.arange(m)
+        tabla[1 << ciudades_bits, ciudades_bits] = matriz[0, 1:]
+
+        orden, inicios = subconjuntos_por_capa(m)
+        if procesos > 1:
+            with Pool(processes=procesos, initializer=iniciar_held_karp,
+                      initargs=(memoria_tabla.name, forma, aristas)) as pool:
+                for capa in range(2, m + 1):
+                    a, b = inicios[capa], inicios[capa + 1]
+                    partes = min(4 * procesos, b - a)
+                    pool.map(barrer_rango, [(a + (b - a) * i // partes, a + (b - a) * (i + 1) // partes)
+                                            for i in range(partes)])
+        else:
+            for capa in range(2, m + 1):
+                barrer_subconjuntos(tabla, aristas, orden[inicios[capa]:inicios[capa + 1]])
+
+        # Cierre hacia 0 y reconstrucción hacia atrás, en empate gana la primera
+        mascara = (1 << m) - 1
+        totales = tabla[mascara] + matriz[1:, 0]
+        j = int(np.argmin(totales))
+        distancia_minima = float(totales[j])
+        ruta = []
+        while True:
+            ruta.append(j + 1)
+            anterior = mascara ^ (1 << j)
+            if anterior == 0:
+                break
+            j = int(np.argmin(tabla[anterior] + aristas[:, j]))
+            mascara = anterior
+    finally:
+        # El arreglo debe soltar el buffer antes de cerrar la memoria compartida
+        tabla = None
+        memoria_tabla.close()
+        memoria_tabla.unlink()
+
+    return (0,) + tuple(reversed(ruta)), distancia_minima
+
 if __name__ == "__main__":
-    ciudades = [(0,0), (2,3), (5,2), (6,6), (8,3), (3,8), (1,5), (7,1), (9,6), (4,4)]
+    # Uso: python tsp_secuencial.py [solucionador] [motor] [simetria] [n_ciudades]
+    argumentos = sys.argv[1:]
+    solucionador = next((a for a in argumentos if a in SOLUCIONADORES), "fuerza_bruta")
+    simetria = "simetria" in argumentos
+    n = next((int(a) for a in argumentos if a.isdigit()), None)
+    motor = next((a for a in argumentos if a in MOTORES), "sqrt")
+
+    if n is None:
+        ciudades = [(0,0), (2,3), (5,2), (6,6), (8,3), (3,8), (1,5), (7,1), (9,6), (4,4)]
+    else:
+        random.seed(42)
+        ciudades = [(random.uniform(0, 100), random.uniform(0, 100)) for _ in range(n)]
     print("Número de ciudades:", len(ciudades))
+    print("Solucionador:", solucionador)
 
     inicio = time.time()
-    ruta, dist = tsp_fuerza_bruta(ciudades)
+    if solucionador == "held_karp":
+        print(f"Memoria estimada: {memoria_held_karp(len(ciudades)) / 1024**2:.1f} MB")
+        ruta, dist = tsp_held_karp(ciudades, cpu_count())
+    elif solucionador == "ramificacion":
+        from tsp_ramificacion import tsp_ramificacion
+        ruta, dist = tsp_ramificacion(ciudades)
+    else:
+        print("Motor:", motor, "(rutas canónicas)" if simetria else "")
+        ruta, dist = tsp_fuerza_bruta(ciudades, motor, simetria)
     fin = time.time()
 
     print("\n--- RESULTADOS ---")
     print("Mejor ruta:", ruta)
     print("Distancia mínima:", round(dist, 2))
-    print("Tiempo de ejecución:", round(fin - inicio, 4), "segundos")
\ No newline at end of file
+    print("Tiempo de ejecución:", round(fin - inicio, 4), "segundos")
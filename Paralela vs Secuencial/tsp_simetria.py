@@ -0,0 +1,94 @@
+import itertools
+import time
+import numpy as np
+from tsp_matriz import matriz_distancias, distancia_total_matriz, distancias_bloque, bloques
+
+# Tolerancia relativa para conservar candidatos casi empatados con el mejor
+TOLERANCIA = 1e-9
+
+def pares_extremos(n):
+    """Pares (a, b), a < b, de segunda y última ciudad de las rutas canónicas."""
+    return list(itertools.combinations(range(1, n), 2))
+
+def permutaciones_canonicas(n, pares=None):
+    """Un representante por cada ruta cerrada: (n-1)!/2 en lugar de n!.
+
+    Se fija la ciudad 0 al inicio (rotaciones) y se exige ruta[1] < ruta[-1]
+    (reflexiones). pares limita la enumeración a algunos (ruta[1], ruta[-1]).
+    """
+    if n < 3:
+        yield tuple(range(n))
+        return
+    for a, b in pares or pares_extremos(n):
+        resto = [c for c in range(1, n) if c != a and c != b]
+        for medio in itertools.permutations(resto):
+            yield (0, a) + medio + (b,)
+
+def variantes(ruta):
+    """Las rotaciones y reflexiones de una ruta cerrada."""
+    for r in (ruta, ruta[::-1]):
+        for i in range(len(r)):
+            yield r[i:] + r[:i]
+
+def umbral(mejor):
+    return mejor + abs(mejor) * TOLERANCIA
+
+def candidatos_escalar(permutaciones, evaluar):
+    """Mejor distancia y rutas casi empatadas con ella, evaluando una a una."""
+    mejor = float('inf')
+    limite = mejor
+    candidatos = []
+    for perm in permutaciones:
+        d = evaluar(perm)
+        if d <= limite:
+            candidatos.append((d, perm))
+            if d < mejor:
+                mejor = d
+                limite = umbral(mejor)
+    return mejor, candidatos
+
+def candidatos_bloques(permutaciones, n, matriz):
+    """Como candidatos_escalar, pero con la evaluación vectorizada por bloques."""
+    mejor = float('inf')
+    candidatos = []
+    for perms in bloques(permutaciones, n):
+        totales = distancias_bloque(perms, matriz)
+        mejor = min(mejor, float(totales.min()))
+        for i in np.flatnonzero(totales <= umbral(mejor)):
+            candidatos.append((float(totales[i]), tuple(int(c) for c in perms[i])))
+    return mejor, candidatos
+
+def resolver(candidatos, mejor, evaluar):
+    """Ruta que devolvería la búsqueda sobre las n! permutaciones.
+
+    Cada rotación suma las mismas aristas en otro orden, así que su
+    distancia puede diferir en el último bit. Se evalúan todas las
+    variantes de los candidatos y se toma la menor distancia y, en empate,
+    la primera en orden lexicográfico, como itertools.permutations.
+    """
+    limite = umbral(mejor)
+    d, ruta = min((evaluar(v), v)
+                  for dc, r in candidatos if dc <= limite
+                  for v in variantes(r))
+    return ruta, d
+
+def tsp_simetria(ciudades):
+    """Fuerza bruta por bloques sobre las (n-1)!/2 rutas canónicas."""
+    n = len(ciudades)
+    matriz = matriz_distancias(ciudades)
+    distancias = matriz.tolist()
+    mejor, candidatos = candidatos_bloques(permutaciones_canonicas(n), n, matriz)
+    return resolver(candidatos, mejor, lambda perm: distancia_total_matriz(perm, distancias))
+
+if __name__ == "__main__":
+    ciudades = [(0,0), (2,3), (5,2), (6,6), (8,3), (3,8), (1,5), (7,1), (9,6), (4,4)]
+    print("Número de ciudades:", len(ciudades))
+
+    inicio = time.time()
+    ruta, dist = tsp_simetria(ciudades)
+    fin = time.time()
+
+    print("\n--- RESULTADOS (RUTAS CANÓNICAS) ---")
+    print("Mejor ruta:", ruta)
+    print("Distancia mínima:", round(dist, 2))
+    print("Tiempo de ejecución:", round(fin - inicio, 4), "segundos")
@@ -0,0 +1,67 @@
+import math
+import random
+import sys
+from tsp_secuencial import MOTORES, tsp_fuerza_bruta, tsp_held_karp
+from tsp_paralelo import tsp_paralelo, tsp_paralelo_streaming
+from tsp_ramificacion import tsp_ramificacion, tsp_ramificacion_paralela
+
+def instancias(tamanos=(1, 2, 3, 4, 5)):
+    """Instancias pequeñas por tamaño: aleatorias, con ciudades repetidas y colineales."""
+    random.seed(0)
+    for n in tamanos:
+        yield [(random.uniform(0, 10), random.uniform(0, 10)) for _ in range(n)]
+        yield [(1, 1)] * n
+        yield [(i, 0) for i in range(n)]
+
+def verificar_motores(tamanos=(1, 2, 3, 4, 5)):
+    """Compara todos los motores y solucionadores con tsp_fuerza_bruta (motor sqrt).
+
+    Los motores de fuerza bruta deben devolver exactamente la misma ruta y
+    distancia; Held-Karp y ramificación y poda, la misma distancia.
+    Devuelve la lista de fallas.
+    """
+    fallas = []
+    for ciudades in instancias(tamanos):
+        referencia = tsp_fuerza_bruta(ciudades, "sqrt")
+
+        exactos = {}
+        for motor in MOTORES:
+            for simetria in (False, True):
+                exactos[f"fuerza_bruta {motor} simetria={simetria}"] = \
+                    lambda c, m=motor, s=simetria: tsp_fuerza_bruta(c, m, s)
+                exactos[f"paralelo {motor} simetria={simetria}"] = \
+                    lambda c, m=motor, s=simetria: tsp_paralelo(c, m, s)
+                exactos[f"streaming {motor} simetria={simetria}"] = \
+                    lambda c, m=motor, s=simetria: tsp_paralelo_streaming(c, m, 2, simetria=s)
+
+        solo_distancia = {
+            "held_karp": tsp_held_karp,
+            "held_karp 2 procesos": lambda c: tsp_held_karp(c, 2),
+            "ramificacion": tsp_ramificacion,
+            "ramificacion paralela": lambda c: tsp_ramificacion_paralela(c, 2),
+        }
+
+        for nombre, solucionador in list(exactos.items()) + list(solo_distancia.items()):
+            try:
+                resultado = solucionador(ciudades)
+            except Exception as e:
+                fallas.append((nombre, ciudades, f"{type(e).__name__}: {e}"))
+                continue
+            if nombre in exactos:
+                correcto = resultado == referencia
+            else:
+                correcto = (sorted(resultado[0]) == list(range(len(ciudades))) and
+                            math.isclose(resultado[1], referencia[1], rel_tol=1e-12, abs_tol=1e-12))
+            if not correcto:
+                fallas.append((nombre, ciudades, f"{resultado} != {referencia}"))
+    return fallas
+
+if __name__ == "__main__":
+    # Uso: python verificar_motores.py [n_maximo]
+    n_maximo = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    fallas = verificar_motores(range(1, n_maximo + 1))
+
+    for nombre, ciudades, detalle in fallas:
+        print(f"[FALLA] {nombre} con {len(ciudades)} ciudades: {detalle}")
+    print("Fallas:", len(fallas))
+    sys.exit(1 if fallas else 0)